@@ -0,0 +1,25 @@
+"""Add inference_backend to analysis_results
+
+Revision ID: 3c1d9a7e5b42
+Revises: 7f73aedb8924
+Create Date: 2026-10-18 10:12:41.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '3c1d9a7e5b42'
+down_revision: Union[str, None] = '7f73aedb8924'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('analysis_results', sa.Column('inference_backend', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('analysis_results', 'inference_backend')
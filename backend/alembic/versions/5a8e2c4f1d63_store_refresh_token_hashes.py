@@ -0,0 +1,66 @@
+"""Store refresh token hashes with expires_at
+
+Revision ID: 5a8e2c4f1d63
+Revises: 3c1d9a7e5b42
+Create Date: 2026-10-18 13:40:07.518302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '5a8e2c4f1d63'
+down_revision: Union[str, None] = '3c1d9a7e5b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Срок жизни уже выданных токенов (ACCESS_TOKEN_EXPIRE_MINUTES в auth_service)
+LEGACY_TOKEN_TTL = "180 minutes"
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('refresh_tokens'):
+        # Таблица была удалена ревизией 7f73aedb8924 — создаём заново в новом формате
+        op.create_table('refresh_tokens',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('token_hash', sa.String(length=64), nullable=False),
+        sa.Column('expires_at', sa.TIMESTAMP(), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='refresh_tokens_user_id_fkey', ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id', name='refresh_tokens_pkey'),
+        sa.UniqueConstraint('token_hash', name='refresh_tokens_token_hash_key')
+        )
+    else:
+        # Существующие сессии сохраняем: хеш считается из токена, срок — от created_at
+        op.add_column('refresh_tokens', sa.Column('token_hash', sa.String(length=64), nullable=True))
+        op.add_column('refresh_tokens', sa.Column('expires_at', sa.TIMESTAMP(), nullable=True))
+        op.execute(
+            "UPDATE refresh_tokens SET "
+            "token_hash = encode(sha256(convert_to(token, 'UTF8')), 'hex'), "
+            f"expires_at = coalesce(created_at, now() AT TIME ZONE 'UTC') + interval '{LEGACY_TOKEN_TTL}'"
+        )
+        op.alter_column('refresh_tokens', 'token_hash', nullable=False)
+        op.alter_column('refresh_tokens', 'expires_at', nullable=False)
+        op.create_unique_constraint('refresh_tokens_token_hash_key', 'refresh_tokens', ['token_hash'])
+        op.drop_constraint('refresh_tokens_token_key', 'refresh_tokens', type_='unique')
+        op.drop_column('refresh_tokens', 'token')
+
+    op.create_index('ix_refresh_tokens_expires_at', 'refresh_tokens', ['expires_at'])
+    op.create_index('ix_refresh_tokens_user_id_created_at', 'refresh_tokens', ['user_id', 'created_at'])
+
+
+def downgrade() -> None:
+    # Исходные токены из хешей не восстановить — активные сессии сбрасываются
+    op.drop_index('ix_refresh_tokens_user_id_created_at', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_expires_at', table_name='refresh_tokens')
+    op.execute("DELETE FROM refresh_tokens")
+    op.add_column('refresh_tokens', sa.Column('token', sa.String(), nullable=False))
+    op.create_unique_constraint('refresh_tokens_token_key', 'refresh_tokens', ['token'])
+    op.drop_constraint('refresh_tokens_token_hash_key', 'refresh_tokens', type_='unique')
+    op.drop_column('refresh_tokens', 'expires_at')
+    op.drop_column('refresh_tokens', 'token_hash')
@@ -0,0 +1,39 @@
+"""Add GIN and btree indexes for matching filters
+
+Revision ID: 8b1f0d2e6c97
+Revises: 5a8e2c4f1d63
+Create Date: 2026-10-18 15:02:33.871940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '8b1f0d2e6c97'
+down_revision: Union[str, None] = '5a8e2c4f1d63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_startups_industry_gin', 'startups', ['industry'], postgresql_using='gin')
+    op.create_index('ix_startups_stage_gin', 'startups', ['stage'], postgresql_using='gin')
+    op.create_index('ix_startups_region_gin', 'startups', ['region'], postgresql_using='gin')
+    op.create_index('ix_startups_min_check', 'startups', ['min_check'])
+    op.create_index('ix_users_industry_gin', 'users', ['industry'], postgresql_using='gin')
+    op.create_index('ix_users_investment_stage_gin', 'users', ['investment_stage'], postgresql_using='gin')
+    op.create_index('ix_users_region_gin', 'users', ['region'], postgresql_using='gin')
+    op.create_index('ix_users_investor_min_check', 'users', ['min_check'], postgresql_where=sa.text("role = 'investor'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_investor_min_check', table_name='users')
+    op.drop_index('ix_users_region_gin', table_name='users')
+    op.drop_index('ix_users_investment_stage_gin', table_name='users')
+    op.drop_index('ix_users_industry_gin', table_name='users')
+    op.drop_index('ix_startups_min_check', table_name='startups')
+    op.drop_index('ix_startups_region_gin', table_name='startups')
+    op.drop_index('ix_startups_stage_gin', table_name='startups')
+    op.drop_index('ix_startups_industry_gin', table_name='startups')
@@ -0,0 +1,29 @@
+"""Add (startup_id, created_at DESC) index on analysis_results
+
+Revision ID: a7d4e1c9f306
+Revises: f3c6d9a2b584
+Create Date: 2026-10-18 17:58:41.226073
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'a7d4e1c9f306'
+down_revision: Union[str, None] = 'f3c6d9a2b584'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_analysis_results_startup_id_created_at',
+        'analysis_results',
+        ['startup_id', sa.text('created_at DESC NULLS LAST')],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_analysis_results_startup_id_created_at', table_name='analysis_results')
@@ -0,0 +1,36 @@
+"""Make startups.created_at and investor_startup_matches.startup_created_at NOT NULL
+
+Revision ID: b9e3f5a2c710
+Revises: a7d4e1c9f306
+Create Date: 2026-10-18 18:42:07.518904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'b9e3f5a2c710'
+down_revision: Union[str, None] = 'a7d4e1c9f306'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keyset-пагинация сравнивает (created_at, id) < cursor — строки с NULL из неё выпадали
+    op.execute("UPDATE startups SET created_at = now() WHERE created_at IS NULL")
+    op.alter_column('startups', 'created_at', existing_type=sa.TIMESTAMP(),
+                    nullable=False, existing_server_default=sa.text('now()'))
+
+    op.execute(
+        "UPDATE investor_startup_matches m SET startup_created_at = s.created_at "
+        "FROM startups s WHERE s.id = m.startup_id AND m.startup_created_at IS NULL"
+    )
+    op.alter_column('investor_startup_matches', 'startup_created_at', existing_type=sa.TIMESTAMP(), nullable=False)
+
+
+def downgrade() -> None:
+    op.alter_column('investor_startup_matches', 'startup_created_at', existing_type=sa.TIMESTAMP(), nullable=True)
+    op.alter_column('startups', 'created_at', existing_type=sa.TIMESTAMP(),
+                    nullable=True, existing_server_default=sa.text('now()'))
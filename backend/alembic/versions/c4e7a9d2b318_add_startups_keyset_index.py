@@ -0,0 +1,25 @@
+"""Add (created_at, id) index on startups for keyset pagination
+
+Revision ID: c4e7a9d2b318
+Revises: 8b1f0d2e6c97
+Create Date: 2026-10-18 16:21:45.093112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'c4e7a9d2b318'
+down_revision: Union[str, None] = '8b1f0d2e6c97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_startups_created_at_id', 'startups', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_startups_created_at_id', table_name='startups')
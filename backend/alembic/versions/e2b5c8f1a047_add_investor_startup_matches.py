@@ -0,0 +1,38 @@
+"""Add investor_startup_matches
+
+Revision ID: e2b5c8f1a047
+Revises: c4e7a9d2b318
+Create Date: 2026-10-18 17:05:12.640385
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'e2b5c8f1a047'
+down_revision: Union[str, None] = 'c4e7a9d2b318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Заполнение: python -m sourcing_service.match_table backfill
+    op.create_table('investor_startup_matches',
+    sa.Column('investor_id', sa.UUID(), nullable=False),
+    sa.Column('startup_id', sa.UUID(), nullable=False),
+    sa.Column('startup_created_at', sa.TIMESTAMP(), nullable=True),
+    sa.Column('computed_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['investor_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['startup_id'], ['startups.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('investor_id', 'startup_id')
+    )
+    op.create_index('ix_investor_startup_matches_investor_keyset', 'investor_startup_matches', ['investor_id', 'startup_created_at', 'startup_id'])
+    op.create_index('ix_investor_startup_matches_startup_id', 'investor_startup_matches', ['startup_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_investor_startup_matches_startup_id', table_name='investor_startup_matches')
+    op.drop_index('ix_investor_startup_matches_investor_keyset', table_name='investor_startup_matches')
+    op.drop_table('investor_startup_matches')
@@ -0,0 +1,38 @@
+"""Unique (startup_id, category_id, question_id) on startup_scores
+
+Revision ID: f3c6d9a2b584
+Revises: e2b5c8f1a047
+Create Date: 2026-10-18 17:32:08.417260
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'f3c6d9a2b584'
+down_revision: Union[str, None] = 'e2b5c8f1a047'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Дубликаты ответа на один вопрос: оставляем одну строку
+    op.execute(
+        """
+        DELETE FROM startup_scores a
+        USING startup_scores b
+        WHERE a.startup_id = b.startup_id
+          AND a.category_id = b.category_id
+          AND a.question_id = b.question_id
+          AND a.ctid < b.ctid
+        """
+    )
+    op.create_unique_constraint(
+        'uq_startup_scores_startup_question', 'startup_scores', ['startup_id', 'category_id', 'question_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_startup_scores_startup_question', 'startup_scores', type_='unique')
@@ -0,0 +1,156 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Optional
+import jwt
+from fastapi import Depends, HTTPException
+from fastapi.security import OAuth2PasswordBearer
+from shared.identity import sign_identity
+
+logger = logging.getLogger(__name__)
+
+# 🔹 Те же параметры подписи access-токенов, что и в auth_service
+SECRET_KEY = os.getenv("SECRET_KEY", "your_secret_key")
+ALGORITHM = "HS256"
+
+# 🔹 Кеш проверенных токенов
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "60"))
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000"))
+
+# 🔹 Проверка отзыва при промахе кеша: off — только подпись и срок, remote — запрос /auth/me в auth_service
+TOKEN_REVOCATION_CHECK = os.getenv("TOKEN_REVOCATION_CHECK", "off")
+
+# ✅ Заголовки личности текущего запроса (читаются HTTP-клиентами при проксировании)
+identity_headers: ContextVar[Optional[dict]] = ContextVar("identity_headers", default=None)
+
+
+class TokenCache:
+    """TTL/LRU-кеш проверенных claims по строке токена"""
+
+    def __init__(self, ttl: float = TOKEN_CACHE_TTL, max_size: int = TOKEN_CACHE_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, token: str, claims: dict):
+        # Запись не переживает сам токен
+        expires_at = min(time.time() + self.ttl, claims["exp"])
+        with self._lock:
+            self._entries[token] = (expires_at, claims)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+token_cache = TokenCache()
+
+
+async def _is_revoked(token: str) -> bool:
+    if TOKEN_REVOCATION_CHECK != "remote":
+        return False
+
+    from api_gateway.http_clients import UPSTREAMS, upstream_client
+
+    async with upstream_client("auth") as client:
+        response = await client.get(f"{UPSTREAMS['auth'].base_url}/auth/me", headers={"Authorization": f"Bearer {token}"})
+    return response.status_code != 200
+
+
+async def verify_access_token(token: str) -> Optional[dict]:
+    """Claims access-токена, проверенного локально (с кешем), или None"""
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
+
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.InvalidTokenError:
+        return None
+
+    if not payload.get("sub") or not payload.get("role") or not payload.get("exp"):
+        return None
+
+    try:
+        if await _is_revoked(token):
+            return None
+    except Exception:
+        # auth_service недоступен — решение остаётся за сервисом, токен не кешируем
+        logger.exception("Ошибка проверки отзыва токена")
+        return None
+
+    claims = {"sub": str(payload["sub"]), "role": payload["role"], "exp": int(payload["exp"])}
+    token_cache.put(token, claims)
+    return claims
+
+
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+
+
+# ✅ Служебные эндпоинты gateway (статистика пулов и кеша) — только для роли admin
+async def require_admin(token: str = Depends(oauth2_scheme)) -> dict:
+    claims = await verify_access_token(token)
+    if claims is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    if claims["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Access denied")
+    return claims
+
+
+class LocalJWTMiddleware:
+    """
+    ASGI-middleware: проверяет Bearer-токен в gateway и кладёт подписанные заголовки
+    личности в identity_headers. Невалидный токен не отклоняется здесь — он
+    проксируется как есть, и решение принимает сервис (как и раньше).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    claims = await verify_access_token(token)
+                    if claims is not None:
+                        headers = sign_identity(claims["sub"], claims["role"], claims["exp"])
+                break
+
+        reset = identity_headers.set(headers)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            identity_headers.reset(reset)
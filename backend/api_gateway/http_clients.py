@@ -0,0 +1,126 @@
+import os
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import httpx
+from api_gateway.auth_middleware import identity_headers
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class UpstreamConfig:
+    base_url: str
+    timeout: float
+
+
+def _upstream(name: str, base_url: str, timeout: float) -> UpstreamConfig:
+    """Настройки сервиса из переменных окружения <NAME>_SERVICE_URL / <NAME>_TIMEOUT"""
+    prefix = name.upper()
+    return UpstreamConfig(
+        base_url=os.getenv(f"{prefix}_SERVICE_URL", base_url),
+        timeout=float(os.getenv(f"{prefix}_TIMEOUT", str(timeout))),
+    )
+
+
+# 🔹 Сервисы, в которые проксирует gateway
+UPSTREAMS = {
+    "auth": _upstream("auth", "http://127.0.0.1:8001", 10.0),
+    "sourcing": _upstream("sourcing", "http://127.0.0.1:8002", 30.0),
+    "deal_room": _upstream("deal_room", "http://127.0.0.1:8003", 5.0),
+    "decision": _upstream("decision", "http://127.0.0.1:8004", 5.0),
+    "due_diligence": _upstream("due_diligence", "http://127.0.0.1:8005", 5.0),
+    "exit": _upstream("exit", "http://127.0.0.1:8006", 5.0),
+}
+
+# 🔹 Лимиты пула соединений (на каждый сервис)
+HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100"))
+HTTP_POOL_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "20"))
+HTTP_POOL_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY", "30"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "0") in ("1", "true", "True")
+
+
+class UpstreamClients:
+    """Один долгоживущий httpx.AsyncClient с пулом keep-alive соединений на каждый сервис"""
+
+    def __init__(self):
+        self.clients: dict[str, httpx.AsyncClient] = {}
+        self.requests_total: dict[str, int] = {}
+
+    def _create(self, name: str) -> httpx.AsyncClient:
+        config = UPSTREAMS[name]
+        limits = httpx.Limits(
+            max_connections=HTTP_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_POOL_KEEPALIVE_EXPIRY,
+        )
+
+        async def on_request(request: httpx.Request):
+            self.requests_total[name] = self.requests_total.get(name, 0) + 1
+            # ✅ Личность, проверенная gateway, — сервису не нужно повторно разбирать токен
+            headers = identity_headers.get()
+            if headers:
+                request.headers.update(headers)
+
+        http2 = HTTP2_ENABLED
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP2_ENABLED=1, но пакет h2 не установлен — используется HTTP/1.1")
+                http2 = False
+
+        return httpx.AsyncClient(
+            timeout=config.timeout,
+            limits=limits,
+            http2=http2,
+            event_hooks={"request": [on_request]},
+        )
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self.clients.get(name)
+        if client is None or client.is_closed:
+            client = self.clients[name] = self._create(name)
+        return client
+
+    async def start(self):
+        for name in UPSTREAMS:
+            self.get(name)
+
+    async def stop(self):
+        for client in self.clients.values():
+            await client.aclose()
+        self.clients = {}
+
+    def stats(self) -> dict:
+        """Состояние пулов: открытые / занятые / простаивающие соединения и число запросов"""
+        result = {}
+        for name in UPSTREAMS:
+            client = self.clients.get(name)
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+            idle = sum(1 for connection in connections if connection.is_idle())
+            result[name] = {
+                "base_url": UPSTREAMS[name].base_url,
+                "timeout": UPSTREAMS[name].timeout,
+                "open": len(connections),
+                "active": len(connections) - idle,
+                "idle": idle,
+                "max_connections": HTTP_POOL_MAX_CONNECTIONS,
+                "max_keepalive": HTTP_POOL_MAX_KEEPALIVE,
+                "requests_total": self.requests_total.get(name, 0),
+            }
+        return result
+
+
+# ✅ Клиенты процесса gateway (открываются и закрываются в lifespan)
+upstream_clients = UpstreamClients()
+
+
+@asynccontextmanager
+async def upstream_client(name: str):
+    """
+    Замена `async with httpx.AsyncClient() as client` в роутерах: отдаёт общий
+    клиент сервиса и не закрывает его после запроса.
+    """
+    yield upstream_clients.get(name)
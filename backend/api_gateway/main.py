@@ -1,15 +1,31 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from fastapi.openapi.utils import get_openapi
 from api_gateway.routes import auth, sourcing, investors, kpi, decisions, deals, monitoring, exit
+from api_gateway.http_clients import upstream_clients
+from api_gateway.auth_middleware import LocalJWTMiddleware, require_admin, token_cache
+from shared.identity import check_identity_secret
 #from routes import sourcing
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    check_identity_secret("api_gateway")
+    # ✅ Общие HTTP-клиенты с пулом keep-alive соединений к сервисам
+    await upstream_clients.start()
+    yield
+    await upstream_clients.stop()
+
 app = FastAPI(
     title="APP_5 API",
     description="API для венчурных инвесторов и стартапов",
     version="1.0.0",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan
 )
 
+# ✅ Локальная проверка JWT и передача подписанной личности в сервисы
+app.add_middleware(LocalJWTMiddleware)
+
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 #app.include_router(sourcing.router, prefix="/sourcing")
 app.include_router(sourcing.router, prefix="/startups", tags=["Startups"])
@@ -20,6 +36,16 @@ app.include_router(monitoring.router, prefix="/monitoring", tags=["Monitoring"])
 app.include_router(decisions.router, prefix="/decisions", tags=["Decisions"])
 app.include_router(exit.router, prefix="/exit", tags=["Exit"])
 
+# ✅ Статистика пулов соединений к сервисам
+@app.get("/gateway/pool-stats", tags=["Gateway"], dependencies=[Depends(require_admin)])
+async def get_pool_stats():
+    return upstream_clients.stats()
+
+# ✅ Статистика кеша проверенных токенов
+@app.get("/gateway/token-cache-stats", tags=["Gateway"], dependencies=[Depends(require_admin)])
+async def get_token_cache_stats():
+    return token_cache.stats()
+
 def custom_openapi():
     del app.openapi_schema
     app.openapi_schema = get_openapi(
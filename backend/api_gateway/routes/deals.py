@@ -1,10 +1,11 @@
 from fastapi import APIRouter, HTTPException
 import httpx
+from api_gateway.http_clients import UPSTREAMS, upstream_client
 from pydantic import BaseModel
 
 router = APIRouter()
 
-DEAL_ROOM_SERVICE_URL = "http://127.0.0.1:8003/deals"
+DEAL_ROOM_SERVICE_URL = f"{UPSTREAMS['deal_room'].base_url}/deals"
 
 class DealRoomRequest(BaseModel):
     startup_id: int
@@ -16,9 +17,9 @@ async def create_deal_room(request: DealRoomRequest):
     """
     Проксирует создание сделки в deal_room_service.
     """
-    async with httpx.AsyncClient() as client:
+    async with upstream_client("deal_room") as client:
         try:
-            response = await client.post(f"{DEAL_ROOM_SERVICE_URL}/create", json=request.dict(), timeout=5.0)
+            response = await client.post(f"{DEAL_ROOM_SERVICE_URL}/create", json=request.dict())
             response.raise_for_status()
         except httpx.ConnectError:
             raise HTTPException(status_code=503, detail="Deal Room Service is unavailable. Please try again later.")
@@ -36,9 +37,9 @@ async def get_deal_room(deal_id: int):
     """
     Проксирует получение информации о сделке в deal_room_service.
     """
-    async with httpx.AsyncClient() as client:
+    async with upstream_client("deal_room") as client:
         try:
-            response = await client.get(f"{DEAL_ROOM_SERVICE_URL}/{deal_id}", timeout=5.0)
+            response = await client.get(f"{DEAL_ROOM_SERVICE_URL}/{deal_id}")
             response.raise_for_status()
         except httpx.ConnectError:
             raise HTTPException(status_code=503, detail="Deal Room Service is unavailable. Please try again later.")
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, HTTPException
 import httpx
+from api_gateway.http_clients import UPSTREAMS, upstream_client
 from pydantic import BaseModel
 
 router = APIRouter()
 
-DECISION_SERVICE_URL = "http://127.0.0.1:8004/decisions"
+DECISION_SERVICE_URL = f"{UPSTREAMS['decision'].base_url}/decisions"
 
 # ✅ Описание модели запроса
 class DecisionRequest(BaseModel):
@@ -16,9 +17,9 @@ async def forward_request(endpoint: str, request: DecisionRequest):
     """
     Функция для отправки запроса в decision_service с обработкой ошибок.
     """
-    async with httpx.AsyncClient() as client:
+    async with upstream_client("decision") as client:
         try:
-            response = await client.post(f"{DECISION_SERVICE_URL}{endpoint}", json=request.dict(), timeout=5.0)
+            response = await client.post(f"{DECISION_SERVICE_URL}{endpoint}", json=request.dict())
             response.raise_for_status()
         except httpx.ConnectError:
             raise HTTPException(status_code=503, detail="Decision Service is unavailable. Please try again later.")
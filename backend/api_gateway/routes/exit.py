@@ -1,16 +1,18 @@
 from fastapi import APIRouter
-import requests
+from api_gateway.http_clients import UPSTREAMS, upstream_client
 
 router = APIRouter()
 
-EXIT_SERVICE_URL = "http://localhost:8006/exit"
+EXIT_SERVICE_URL = f"{UPSTREAMS['exit'].base_url}/exit"
 
 @router.post("/request")
 async def request_exit(data: dict):
-    response = requests.post(f"{EXIT_SERVICE_URL}/request", json=data)
+    async with upstream_client("exit") as client:
+        response = await client.post(f"{EXIT_SERVICE_URL}/request", json=data)
     return response.json()
 
 @router.get("/calculate")
 async def calculate_roi():
-    response = requests.get(f"{EXIT_SERVICE_URL}/calculate")
+    async with upstream_client("exit") as client:
+        response = await client.get(f"{EXIT_SERVICE_URL}/calculate")
     return response.json()
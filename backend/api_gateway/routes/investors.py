@@ -1,15 +1,16 @@
 from fastapi import APIRouter, HTTPException
 import httpx
+from api_gateway.http_clients import UPSTREAMS, upstream_client
 
 router = APIRouter()
 
-SOURCING_SERVICE_URL = "http://127.0.0.1:8002"
+SOURCING_SERVICE_URL = UPSTREAMS["sourcing"].base_url
 
 @router.get("/profile/{investor_id}", tags=["Investors"])
 async def proxy_get_investor_profile(investor_id: str):
-    async with httpx.AsyncClient(timeout=5.0) as client:
+    async with upstream_client("sourcing") as client:
         try:
-            resp = await client.get(f"{SOURCING_SERVICE_URL}/investors/profile/{investor_id}")
+            resp = await client.get(f"{SOURCING_SERVICE_URL}/investors/profile/{investor_id}", timeout=5.0)
             resp.raise_for_status()
         except httpx.ReadTimeout:
             raise HTTPException(status_code=504, detail="Gateway Timeout: sourcing service did not respond")
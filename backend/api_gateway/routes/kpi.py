@@ -1,11 +1,12 @@
 from fastapi import APIRouter, HTTPException
 import httpx
+from api_gateway.http_clients import UPSTREAMS, upstream_client
 from pydantic import BaseModel
 from typing import List, Dict
 
 router = APIRouter()
 
-DUE_DILIGENCE_SERVICE_URL = "http://127.0.0.1:8005/kpi"
+DUE_DILIGENCE_SERVICE_URL = f"{UPSTREAMS['due_diligence'].base_url}/kpi"
 
 # ✅ Модель запроса
 class KPIRequest(BaseModel):
@@ -26,9 +27,9 @@ async def forward_request(endpoint: str, request: KPIRequest):
     """
     🔁 Проксирование запроса в due_diligence_service
     """
-    async with httpx.AsyncClient() as client:
+    async with upstream_client("due_diligence") as client:
         try:
-            response = await client.post(f"{DUE_DILIGENCE_SERVICE_URL}{endpoint}", json=request.dict(), timeout=5.0)
+            response = await client.post(f"{DUE_DILIGENCE_SERVICE_URL}{endpoint}", json=request.dict())
             response.raise_for_status()
         except httpx.ConnectError:
             raise HTTPException(status_code=503, detail="Due Diligence Service is unavailable. Please try again later.")
@@ -86,6 +87,6 @@ async def receive_startup_for_due_diligence(startup_id: str, request: dict):
     """
     🔁 Проксирует отправку данных о стартапе в due_diligence_service.
     """
-    async with httpx.AsyncClient() as client:
+    async with upstream_client("due_diligence") as client:
         response = await client.post(f"{DUE_DILIGENCE_SERVICE_URL}/analyze/{startup_id}", json=request)
         return response.json()
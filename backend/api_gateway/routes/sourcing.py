@@ -1,15 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Query, Request
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 import httpx
+from api_gateway.http_clients import UPSTREAMS, upstream_client
 import logging
+import os
 import uuid
 from typing import List, Optional
 from pydantic import BaseModel, Field, field_validator
-from sourcing_service.routes.startups import FillTemplateRequest
 from api_gateway.schemas.sourcing import (
     StartupFilterRequest, StartupCreateRequest, InvestorProfileUpdate,
-    FounderProfileUpdate, Answer, FillTemplateRequest,)
+    FounderProfileUpdate, Answer, FillTemplateRequest, StartupScoreBatchRequest,
+    DueDiligenceBatchRequest,)
 
 
 router = APIRouter()
@@ -18,8 +22,9 @@ router = APIRouter()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-SOURCING_SERVICE_URL = "http://127.0.0.1:8002"
-DUE_DILIGENCE_SERVICE_URL = "http://127.0.0.1:8005/kpi/analyze"
+SOURCING_SERVICE_URL = UPSTREAMS["sourcing"].base_url
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+DUE_DILIGENCE_SERVICE_URL = f"{UPSTREAMS['due_diligence'].base_url}/kpi/analyze"
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 """
@@ -35,7 +40,7 @@ async def save_investor_profile(
 ):
     headers = {"Authorization": f"Bearer {token}"}
     
-    async with httpx.AsyncClient() as client:
+    async with upstream_client("sourcing") as client:
         response = await client.post(
             f"{SOURCING_SERVICE_URL}/startups/investors/profile",
             json=investor_data.model_dump(),  # ✅ Исправленный метод для Pydantic v2
@@ -61,7 +66,7 @@ async def save_founder_profile(
 ):
     headers = {"Authorization": f"Bearer {token}"}
 
-    async with httpx.AsyncClient() as client:
+    async with upstream_client("sourcing") as client:
         response = await client.post(
             f"{SOURCING_SERVICE_URL}/startups/founders/profile",
             json=founder_data.model_dump(),  # ✅ Передаем корректный JSON
@@ -73,28 +78,102 @@ async def save_founder_profile(
 
         return response.json()
 
-# ✅ 3. Загрузка Pitch Deck и анализ
-@router.post("/founders/upload", summary="Загрузить Pitch Deck и провести анализ", tags=["Startups"])
-async def upload_pitch_deck(file: UploadFile = File(...), token: str = Depends(oauth2_scheme)):
-    headers = {"Authorization": f"Bearer {token}"}
-    
-    TIMEOUT = 240.0  # Увеличиваем таймаут до 4 минут
+# ✅ 3. Загрузка Pitch Deck и постановка анализа в очередь
+@router.post(
+    "/founders/upload",
+    summary="Загрузить Pitch Deck и поставить анализ в очередь",
+    status_code=202,
+    tags=["Startups"],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"],
+                    }
+                }
+            },
+        }
+    },
+)
+async def upload_pitch_deck(request: Request, token: str = Depends(oauth2_scheme)):
+    """
+    Multipart-тело потоково передаётся в sourcing_service по мере получения,
+    без буферизации файла в памяти gateway.
+    """
+    content_type = request.headers.get("content-type", "")
+    if not content_type.startswith("multipart/form-data"):
+        raise HTTPException(status_code=400, detail="Ожидается multipart/form-data")
 
-    async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-        files = {"file": (file.filename, await file.read(), file.content_type)}
-        response = await client.post(f"{SOURCING_SERVICE_URL}/startups/founders/upload", files=files, headers=headers)
+    content_length = request.headers.get("content-length")
+    if content_length:
+        try:
+            declared_length = int(content_length)
+        except ValueError:
+            declared_length = -1
+        if declared_length < 0:
+            raise HTTPException(status_code=400, detail="Некорректный заголовок Content-Length")
+        if declared_length > UPLOAD_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"Файл превышает лимит {UPLOAD_MAX_BYTES} байт")
+
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": content_type}
+    if content_length:
+        headers["Content-Length"] = content_length
+
+    too_large = False
+
+    async def body():
+        nonlocal too_large
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > UPLOAD_MAX_BYTES:
+                # Тело без Content-Length (chunked) обрываем, как только превышен лимит
+                too_large = True
+                raise ValueError("upload size limit exceeded")
+            yield chunk
+
+    TIMEOUT = 60.0  # Анализ идёт в фоне, ждём только передачу файла
+
+    async with upstream_client("sourcing") as client:
+        try:
+            response = await client.post(f"{SOURCING_SERVICE_URL}/startups/founders/upload", content=body(), headers=headers, timeout=TIMEOUT)
+        except Exception:
+            if too_large:
+                raise HTTPException(status_code=413, detail=f"Файл превышает лимит {UPLOAD_MAX_BYTES} байт")
+            logger.exception("Ошибка передачи питч-дека в sourcing_service")
+            raise HTTPException(status_code=502, detail="Ошибка соединения с sourcing_service")
         
-        if response.status_code != 200:
+        if response.status_code not in (200, 202):
             raise HTTPException(status_code=response.status_code, detail=response.json().get("detail"))
         
         return response.json()
+
+# ✅ 3.0.1 Статус анализа питч-дека
+@router.get("/founders/upload/jobs/{job_id}", summary="Статус анализа питч-дека", tags=["Startups"])
+async def get_upload_job_status(job_id: str, token: str = Depends(oauth2_scheme)):
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with upstream_client("sourcing") as client:
+        try:
+            response = await client.get(f"{SOURCING_SERVICE_URL}/startups/founders/upload/jobs/{job_id}", headers=headers)
+            response.raise_for_status()
+
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            raise HTTPException(status_code=e.response.status_code, detail=f"Ошибка: {e.response.text}")
+        except httpx.RequestError:
+            raise HTTPException(status_code=502, detail="Ошибка соединения с sourcing_service")
     
 # ✅ 3.1. Получить профиль фаундера 
 @router.get("/founders/profile", summary="Получить профиль фаундера", tags=["Startups"])
 async def proxy_get_founder_profile(token: str = Depends(oauth2_scheme)):
     try:
         headers = {"Authorization": f"Bearer {token}"}
-        async with httpx.AsyncClient() as client:
+        async with upstream_client("sourcing") as client:
             response = await client.get(
                 f"{SOURCING_SERVICE_URL}/startups/founders/profile",
                 headers=headers
@@ -127,7 +206,7 @@ async def fill_template(data: FillTemplateRequest, token: str = Depends(oauth2_s
         # 🔹 Конвертируем `UUID` в строку перед отправкой
         request_data = jsonable_encoder(data)
 
-        async with httpx.AsyncClient() as client:
+        async with upstream_client("sourcing") as client:
             response = await client.post(f"{SOURCING_SERVICE_URL}/startups/startups/fill_template", json=request_data, headers=headers)
 
         if response.status_code != 200:
@@ -151,7 +230,7 @@ async def get_startup_score(startup_id: uuid.UUID, token: str = Depends(oauth2_s
     headers = {"Authorization": f"Bearer {token}"}
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with upstream_client("sourcing") as client:
             response = await client.get(f"{SOURCING_SERVICE_URL}/startups/startups/{startup_id}/score", headers=headers)
 
         if response.status_code != 200:
@@ -173,16 +252,20 @@ async def get_startup_score(startup_id: uuid.UUID, token: str = Depends(oauth2_s
 @router.post("/filter", summary="Фильтрация стартапов", tags=["Startups"])
 async def filter_startups(
     filters: StartupFilterRequest,
+    cursor: Optional[str] = Query(None, description="Токен продолжения из next_cursor"),
+    limit: Optional[int] = Query(None, ge=1),
     token: str = Depends(oauth2_scheme)  # 🔹 Проверяем токен
 ):
     headers = {"Authorization": f"Bearer {token}"}  # ✅ Передаем токен
+    params = {"cursor": cursor, "limit": limit}
 
-    async with httpx.AsyncClient() as client:
+    async with upstream_client("sourcing") as client:
         try:
             response = await client.post(
                 f"{SOURCING_SERVICE_URL}/startups/filter",
                 json=filters.model_dump(),  # ✅ Современный метод вместо `.dict()`
-                headers=headers  # ✅ Передаем токен в заголовках
+                headers=headers,  # ✅ Передаем токен в заголовках
+                params={key: value for key, value in params.items() if value is not None},
             )
             response.raise_for_status()  # ✅ Проверяем ошибки HTTP
 
@@ -198,20 +281,33 @@ async def filter_startups(
 @router.get("/{startup_id}", summary="Получение информации о стартапе", tags=["Startups"])
 async def get_startup_detail(startup_id: str):
     TIMEOUT = 30.0  # Увеличиваем таймаут до 2 минут
-    async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-        response = await client.get(f"{SOURCING_SERVICE_URL}/startups/{startup_id}")
+    async with upstream_client("sourcing") as client:
+        response = await client.get(f"{SOURCING_SERVICE_URL}/startups/{startup_id}", timeout=TIMEOUT)
         
         if response.status_code != 200:
             raise HTTPException(status_code=response.status_code, detail=response.json().get("detail"))
         
         return response.json()
 
+# ✅ 8.0 Пакетная отправка стартапов в Due Diligence (объявлен до /select/{startup_id})
+@router.post("/select/batch", summary="Отправить несколько стартапов в Due Diligence", tags=["Startups"])
+async def submit_due_diligence_batch(data: DueDiligenceBatchRequest, token: str = Depends(oauth2_scheme)):
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with upstream_client("sourcing") as client:
+        response = await client.post(f"{SOURCING_SERVICE_URL}/startups/select/batch", json=jsonable_encoder(data), headers=headers)
+
+        if response.status_code != 200:
+            raise HTTPException(status_code=response.status_code, detail=response.json().get("detail"))
+
+        return response.json()
+
 # ✅ 8. Отправка стартапа в Due Diligence
 @router.post("/select/{startup_id}", summary="Отправить стартап в Due Diligence", tags=["Startups"])
 async def submit_due_diligence(startup_id: str, token: str = Depends(oauth2_scheme)):
     headers = {"Authorization": f"Bearer {token}"}
 
-    async with httpx.AsyncClient() as client:
+    async with upstream_client("sourcing") as client:
         response = await client.post(f"{SOURCING_SERVICE_URL}/select/{startup_id}", headers=headers)
         
         if response.status_code != 200:
@@ -221,12 +317,28 @@ async def submit_due_diligence(startup_id: str, token: str = Depends(oauth2_sche
     
 # ✅ 9. Получение списка подходящих стартапов для инвестора
 @router.get("/matches/me", summary="Получить список стартапов, подходящих инвестору", tags=["Startups"])
-async def get_matching_startups(token: str = Depends(oauth2_scheme)):
+async def get_matching_startups(
+    top_k: Optional[int] = Query(None, ge=1, description="Вернуть только K самых релевантных (ранжированный режим)"),
+    w_overlap: Optional[float] = Query(None, ge=0, description="Вес пересечения отрасли, стадии и региона"),
+    w_check: Optional[float] = Query(None, ge=0, description="Вес соответствия чека"),
+    w_score: Optional[float] = Query(None, ge=0, description="Вес последнего startup_score"),
+    cursor: Optional[str] = Query(None, description="Токен продолжения из next_cursor"),
+    limit: Optional[int] = Query(None, ge=1),
+    token: str = Depends(oauth2_scheme)
+):
     headers = {"Authorization": f"Bearer {token}"}
+    params = {
+        "top_k": top_k, "w_overlap": w_overlap, "w_check": w_check, "w_score": w_score,
+        "cursor": cursor, "limit": limit,
+    }
 
-    async with httpx.AsyncClient() as client:
+    async with upstream_client("sourcing") as client:
         try:
-            response = await client.get(f"{SOURCING_SERVICE_URL}/startups/matches/me", headers=headers)
+            response = await client.get(
+                f"{SOURCING_SERVICE_URL}/startups/matches/me",
+                headers=headers,
+                params={key: value for key, value in params.items() if value is not None},
+            )
             response.raise_for_status()
 
             return response.json()
@@ -242,7 +354,7 @@ async def get_matching_startups(token: str = Depends(oauth2_scheme)):
 async def get_matching_startups(investor_id: str, token: str = Depends(oauth2_scheme)):  
     headers = {"Authorization": f"Bearer {token}"}  # ✅ Передаем токен
 
-    async with httpx.AsyncClient() as client:
+    async with upstream_client("sourcing") as client:
         try:
             response = await client.get(f"{SOURCING_SERVICE_URL}/startups/matches/{investor_id}", headers=headers)
             response.raise_for_status()  # ✅ Проверяем ошибки HTTP
@@ -257,12 +369,23 @@ async def get_matching_startups(investor_id: str, token: str = Depends(oauth2_sc
 
 # ✅ 10. Получение списка подходящих инвесторов для стартапа
 @router.get("/investors/matches/{founder_id}", summary="Получить список инвесторов, подходящих стартапу", tags=["Startups"])
-async def get_matching_investors(founder_id: str, token: str = Depends(oauth2_scheme)):  
+async def get_matching_investors(
+    founder_id: str,
+    top_k: Optional[int] = Query(None, ge=1, description="Вернуть только K самых релевантных (ранжированный режим)"),
+    w_overlap: Optional[float] = Query(None, ge=0, description="Вес пересечения отрасли, стадии и региона"),
+    w_check: Optional[float] = Query(None, ge=0, description="Вес соответствия чека"),
+    token: str = Depends(oauth2_scheme)
+):
     headers = {"Authorization": f"Bearer {token}"}  # ✅ Передаем токен
+    params = {"top_k": top_k, "w_overlap": w_overlap, "w_check": w_check}
 
-    async with httpx.AsyncClient() as client:
+    async with upstream_client("sourcing") as client:
         try:
-            response = await client.get(f"{SOURCING_SERVICE_URL}/startups/investors/matches/{founder_id}", headers=headers)
+            response = await client.get(
+                f"{SOURCING_SERVICE_URL}/startups/investors/matches/{founder_id}",
+                headers=headers,
+                params={key: value for key, value in params.items() if value is not None},
+            )
             response.raise_for_status()  # ✅ Проверяем ошибки HTTP
 
             return response.json()  # ✅ Возвращаем успешный JSON-ответ
@@ -290,11 +413,12 @@ async def proxy_batch_pitch_scores(request: Request, ids: str = Query(...)):
         if "authorization" in request.headers:
             headers["Authorization"] = request.headers["authorization"]
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with upstream_client("sourcing") as client:
             response = await client.get(
                 url,
                 params={"ids": ",".join(ids_list)},
                 headers=headers,
+                timeout=10.0,
             )
 
         if response.status_code == 200:
@@ -323,3 +447,40 @@ async def proxy_batch_pitch_scores(request: Request, ids: str = Query(...)):
     except Exception:
         logger.exception("Неожиданная ошибка при получении batch pitch-scores")
         raise HTTPException(status_code=500, detail="Внутренняя ошибка сервера при получении скорингов")
+
+
+# ✅ 11.1 Скоринги пачкой (POST, NDJSON) — ответ sourcing_service передаётся потоком
+@router.post("/batch/pitch-scores", summary="Скоринги для большого числа стартапов (NDJSON)", tags=["Startups"])
+async def proxy_batch_pitch_scores_stream(data: StartupScoreBatchRequest, request: Request):
+    headers = {}
+    if "authorization" in request.headers:
+        headers["Authorization"] = request.headers["authorization"]
+
+    async with upstream_client("sourcing") as client:
+        upstream_request = client.build_request(
+            "POST",
+            f"{SOURCING_SERVICE_URL}/startups/batch/pitch-scores",
+            json=jsonable_encoder(data),
+            headers=headers,
+        )
+        try:
+            response = await client.send(upstream_request, stream=True)
+        except httpx.RequestError:
+            logger.exception("Ошибка соединения с sourcing_service")
+            raise HTTPException(status_code=502, detail="Ошибка соединения с внешним сервисом")
+
+    if response.status_code != 200:
+        await response.aread()
+        await response.aclose()
+        try:
+            error_detail = response.json().get("detail", "Ошибка внешнего сервиса")
+        except Exception:
+            error_detail = response.text or "Ошибка внешнего сервиса"
+        raise HTTPException(status_code=response.status_code, detail=error_detail)
+
+    # Соединение возвращается в пул после отправки последнего чанка клиенту
+    return StreamingResponse(
+        response.aiter_raw(),
+        media_type=response.headers.get("content-type", "application/x-ndjson"),
+        background=BackgroundTask(response.aclose),
+    )
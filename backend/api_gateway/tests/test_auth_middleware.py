@@ -0,0 +1,120 @@
+import sys
+import os
+import time
+
+# ✅ Добавляем `backend` в PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import httpx
+import jwt
+import pytest
+from api_gateway import auth_middleware
+from api_gateway.auth_middleware import ALGORITHM, SECRET_KEY, LocalJWTMiddleware, TokenCache, identity_headers
+from api_gateway.http_clients import UpstreamClients
+from shared import identity
+from shared.identity import sign_identity, verify_identity
+
+
+def make_token(sub: str = "8d3c1f9e-4b1a-4c53-9f55-1f1f2a9d0c11", role: str = "investor", ttl: int = 900) -> str:
+    return jwt.encode({"sub": sub, "role": role, "exp": int(time.time()) + ttl}, SECRET_KEY, algorithm=ALGORITHM)
+
+
+@pytest.fixture
+def identity_secret(monkeypatch):
+    monkeypatch.setattr(identity, "GATEWAY_IDENTITY_SECRET", "test-identity-secret")
+
+
+def test_identity_signature_roundtrip_and_tampering(identity_secret):
+    headers = sign_identity("user-1", "founder", int(time.time()) + 60)
+    assert verify_identity(headers) == ("user-1", "founder")
+
+    assert verify_identity({**headers, "X-User-Role": "admin"}) is None
+    assert verify_identity(sign_identity("user-1", "founder", int(time.time()) - 1)) is None
+    assert verify_identity({}) is None
+
+
+@pytest.mark.parametrize("secret", ["", "your_gateway_identity_secret"])
+def test_default_identity_secret_disables_identity_headers(monkeypatch, secret):
+    monkeypatch.setattr(identity, "GATEWAY_IDENTITY_SECRET", secret)
+    # Заголовки, подписанные публичным примером секрета, не принимаются
+    forged = {
+        "X-User-Id": "user-1",
+        "X-User-Role": "admin",
+        "X-Identity-Expires": str(int(time.time()) + 60),
+        "X-Identity-Signature": identity._signature("user-1", "admin", int(time.time()) + 60),
+    }
+
+    assert sign_identity("user-1", "admin", int(time.time()) + 60) is None
+    assert verify_identity(forged) is None
+
+
+@pytest.mark.asyncio
+async def test_verify_access_token_uses_cache(monkeypatch):
+    cache = TokenCache(ttl=60, max_size=10)
+    monkeypatch.setattr(auth_middleware, "token_cache", cache)
+    token = make_token()
+
+    first = await auth_middleware.verify_access_token(token)
+    second = await auth_middleware.verify_access_token(token)
+
+    assert first == second
+    assert first["role"] == "investor"
+    assert cache.stats()["hits"] == 1
+    assert await auth_middleware.verify_access_token("not-a-token") is None
+
+
+def test_token_cache_entry_does_not_outlive_token():
+    cache = TokenCache(ttl=60, max_size=1)
+    cache.put("expired", {"sub": "u", "role": "r", "exp": int(time.time()) - 1})
+    assert cache.get("expired") is None
+
+    cache.put("a", {"sub": "u", "role": "r", "exp": int(time.time()) + 60})
+    cache.put("b", {"sub": "u", "role": "r", "exp": int(time.time()) + 60})
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+
+
+@pytest.mark.asyncio
+async def test_middleware_injects_signed_identity_into_upstream_requests(identity_secret):
+    captured = {}
+
+    async def app(scope, receive, send):
+        # Хук пула клиентов добавляет заголовки личности к запросу в сервис
+        client = UpstreamClients().get("sourcing")
+        request = httpx.Request("GET", "http://sourcing/startups")
+        for hook in client.event_hooks["request"]:
+            await hook(request)
+        captured["upstream"] = request.headers
+        await client.aclose()
+
+    token = make_token()
+    scope = {"type": "http", "headers": [(b"authorization", f"Bearer {token}".encode())]}
+    await LocalJWTMiddleware(app)(scope, None, None)
+
+    assert verify_identity(captured["upstream"]) == ("8d3c1f9e-4b1a-4c53-9f55-1f1f2a9d0c11", "investor")
+    assert identity_headers.get() is None
+
+
+@pytest.mark.asyncio
+async def test_middleware_forwards_invalid_token_without_identity():
+    captured = {}
+
+    async def app(scope, receive, send):
+        captured["identity"] = identity_headers.get()
+
+    scope = {"type": "http", "headers": [(b"authorization", b"Bearer broken")]}
+    await LocalJWTMiddleware(app)(scope, None, None)
+
+    assert captured["identity"] is None
+
+
+def test_gateway_stats_require_admin_token():
+    from fastapi.testclient import TestClient
+    from api_gateway.main import app
+
+    client = TestClient(app)
+    for path in ("/gateway/pool-stats", "/gateway/token-cache-stats"):
+        assert client.get(path).status_code == 401
+        assert client.get(path, headers={"Authorization": "Bearer not-a-token"}).status_code == 401
+        assert client.get(path, headers={"Authorization": f"Bearer {make_token()}"}).status_code == 403
+        assert client.get(path, headers={"Authorization": f"Bearer {make_token(role='admin')}"}).status_code == 200
@@ -0,0 +1,35 @@
+import sys
+import os
+
+# ✅ Добавляем `backend` в PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import pytest
+from api_gateway.http_clients import UPSTREAMS, UpstreamClients, upstream_client, upstream_clients
+
+
+@pytest.mark.asyncio
+async def test_client_is_shared_between_requests():
+    async with upstream_client("sourcing") as first:
+        pass
+    async with upstream_client("sourcing") as second:
+        pass
+
+    assert first is second
+    assert not first.is_closed
+    await upstream_clients.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_closes_clients_and_stats_cover_every_upstream():
+    clients = UpstreamClients()
+    await clients.start()
+    client = clients.get("auth")
+
+    stats = clients.stats()
+    assert set(stats) == set(UPSTREAMS)
+    assert stats["auth"]["open"] == 0
+    assert stats["auth"]["timeout"] == UPSTREAMS["auth"].timeout
+
+    await clients.stop()
+    assert client.is_closed
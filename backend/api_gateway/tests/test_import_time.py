@@ -0,0 +1,44 @@
+import sys
+import os
+
+# ✅ Добавляем `backend` в PYTHONPATH
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+sys.path.append(BACKEND_DIR)
+
+import json
+import subprocess
+
+# 🔹 Модули, которые не должны попадать в процесс gateway
+HEAVY_MODULES = [
+    "transformers", "torch", "fitz", "pymupdf", "pptx",
+    "sqlalchemy", "asyncpg",
+    "sourcing_service", "auth_service", "due_diligence_service",
+]
+
+# 🔹 Бюджет холодного старта gateway (секунды), можно переопределить в CI
+GATEWAY_IMPORT_BUDGET_SECONDS = float(os.getenv("GATEWAY_IMPORT_BUDGET_SECONDS", "3.0"))
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import api_gateway.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def import_gateway() -> dict:
+    """Импорт api_gateway.main в чистом интерпретаторе"""
+    output = subprocess.run([sys.executable, "-c", PROBE], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def test_gateway_does_not_import_heavy_modules():
+    loaded = import_gateway()["modules"]
+    leaked = [name for name in loaded if name.split(".")[0] in HEAVY_MODULES]
+
+    assert leaked == []
+
+
+def test_gateway_cold_import_fits_budget():
+    assert import_gateway()["elapsed"] < GATEWAY_IMPORT_BUDGET_SECONDS
@@ -0,0 +1,58 @@
+import sys
+import os
+import json
+import uuid
+
+# ✅ Добавляем `backend` в PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from api_gateway.main import app
+from api_gateway.http_clients import upstream_clients
+
+AUTH = {"Authorization": "Bearer test-token"}
+
+
+def use_upstream(monkeypatch, handler):
+    monkeypatch.setitem(upstream_clients.clients, "sourcing", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+
+def test_ndjson_is_streamed_through(monkeypatch):
+    ids = [str(uuid.uuid4()) for _ in range(3)]
+    received = {}
+
+    async def lines():
+        for startup_id in ids:
+            yield (json.dumps({"startup_id": startup_id, "total": 7.5}) + "\n").encode()
+
+    async def handler(request: httpx.Request):
+        received["body"] = json.loads(await request.aread())
+        return httpx.Response(200, headers={"content-type": "application/x-ndjson"}, content=lines())
+
+    use_upstream(monkeypatch, handler)
+    response = TestClient(app).post("/startups/batch/pitch-scores", json={"ids": ids}, headers=AUTH)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert received["body"] == {"ids": ids}
+    assert [json.loads(line)["startup_id"] for line in response.text.splitlines()] == ids
+
+
+def test_upstream_error_is_passed_through(monkeypatch):
+    async def handler(request: httpx.Request):
+        return httpx.Response(400, json={"detail": "Не больше 10000 идентификаторов за запрос"})
+
+    use_upstream(monkeypatch, handler)
+    response = TestClient(app).post("/startups/batch/pitch-scores", json={"ids": [str(uuid.uuid4())]}, headers=AUTH)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Не больше 10000 идентификаторов за запрос"
+
+
+def test_empty_ids_rejected_by_gateway(monkeypatch):
+    use_upstream(monkeypatch, lambda request: pytest.fail("запрос не должен уходить в sourcing_service"))
+    response = TestClient(app).post("/startups/batch/pitch-scores", json={"ids": []}, headers=AUTH)
+
+    assert response.status_code == 422
@@ -0,0 +1,70 @@
+import sys
+import os
+
+# ✅ Добавляем `backend` в PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from api_gateway.main import app
+from api_gateway.routes import sourcing
+from api_gateway.http_clients import upstream_clients
+
+AUTH = {"Authorization": "Bearer test-token"}
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Подменяем sourcing_service: запоминаем полученное тело и заголовки"""
+    received = {}
+
+    async def handler(request: httpx.Request):
+        received["body"] = await request.aread()
+        received["content_type"] = request.headers["content-type"]
+        return httpx.Response(202, json={"job_id": "job-1", "status": "queued"})
+
+    monkeypatch.setitem(upstream_clients.clients, "sourcing", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return received
+
+
+def test_multipart_body_is_forwarded_unchanged(upstream):
+    client = TestClient(app)
+    response = client.post("/startups/founders/upload", files={"file": ("deck.pdf", b"%PDF-1.4 deck", "application/pdf")}, headers=AUTH)
+
+    assert response.status_code == 202
+    assert response.json()["job_id"] == "job-1"
+    assert upstream["content_type"].startswith("multipart/form-data; boundary=")
+    assert b"%PDF-1.4 deck" in upstream["body"]
+
+
+def test_declared_oversize_upload_is_rejected_before_forwarding(upstream, monkeypatch):
+    monkeypatch.setattr(sourcing, "UPLOAD_MAX_BYTES", 100)
+    client = TestClient(app)
+    response = client.post("/startups/founders/upload", files={"file": ("deck.pdf", b"x" * 500, "application/pdf")}, headers=AUTH)
+
+    assert response.status_code == 413
+    assert upstream == {}
+
+
+def test_chunked_oversize_upload_is_cut_off(upstream, monkeypatch):
+    monkeypatch.setattr(sourcing, "UPLOAD_MAX_BYTES", 100)
+
+    def chunks():
+        for _ in range(10):
+            yield b"x" * 50
+
+    client = TestClient(app)
+    headers = {**AUTH, "Content-Type": "multipart/form-data; boundary=abc"}
+    response = client.post("/startups/founders/upload", content=chunks(), headers=headers)
+
+    assert response.status_code == 413
+
+
+@pytest.mark.parametrize("content_length", ["abc", "-1", "1e3"])
+def test_malformed_content_length_is_bad_request(upstream, content_length):
+    client = TestClient(app)
+    headers = {**AUTH, "Content-Type": "multipart/form-data; boundary=abc", "Content-Length": content_length}
+    response = client.post("/startups/founders/upload", content=b"--abc--", headers=headers)
+
+    assert response.status_code == 400
+    assert upstream == {}
@@ -1,15 +1,16 @@
 import os
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
+from shared.db import create_engine
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 # ✅ Используем асинхронный драйвер PostgreSQL (asyncpg)
 
-# ✅ Создаём асинхронный движок SQLAlchemy
-engine = create_async_engine(DATABASE_URL, echo=True, future=True)
+# ✅ Создаём асинхронный движок SQLAlchemy (пул, кеш выражений и echo — из DB_* переменных окружения)
+engine = create_engine(DATABASE_URL)
 
 # ✅ Создаём фабрику сессий для работы с БД
 AsyncSessionLocal = sessionmaker(
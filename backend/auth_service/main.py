@@ -1,9 +1,26 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from auth_service.routes import auth
+from auth_service.passwords import password_hasher
+from auth_service.refresh_tokens import refresh_token_sweeper
+from auth_service.database import engine
+from shared.identity import check_identity_secret
 #from routes.auth import router
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI(title="Auth Service")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    check_identity_secret("auth_service")
+    # ✅ Фоновое удаление истёкших refresh-токенов
+    await refresh_token_sweeper.start()
+    yield
+    await refresh_token_sweeper.stop()
+    # ✅ Останавливаем пул потоков bcrypt
+    password_hasher.shutdown()
+    # ✅ Закрываем соединения пула БД
+    await engine.dispose()
+
+app = FastAPI(title="Auth Service", lifespan=lifespan)
 
 # ✅ Добавляем CORS, чтобы фронтенд мог отправлять запросы
 app.add_middleware(
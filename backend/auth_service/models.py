@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, TIMESTAMP, ForeignKey, text
+from sqlalchemy import Column, String, TIMESTAMP, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 from auth_service.database import Base
@@ -23,5 +23,12 @@ class RefreshToken(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    token = Column(String, unique=True, nullable=False)
+    # 🔹 Храним не сам JWT, а его SHA-256 (64 hex-символа) — короткий ключ уникального индекса
+    token_hash = Column(String(64), unique=True, nullable=False)
+    expires_at = Column(TIMESTAMP, nullable=False, index=True)
     created_at = Column(TIMESTAMP, server_default=text("now()"))
+
+    __table_args__ = (
+        # ✅ Подсчёт и вытеснение самых старых сессий пользователя
+        Index("ix_refresh_tokens_user_id_created_at", "user_id", "created_at"),
+    )
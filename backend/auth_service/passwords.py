@@ -0,0 +1,107 @@
+import os
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from passlib.context import CryptContext
+
+logger = logging.getLogger(__name__)
+
+# 🔹 Стоимость bcrypt: хеши с другим числом раундов пересчитываются при следующем логине
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# 🔹 Пул потоков для bcrypt (библиотека отпускает GIL на время хеширования)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_CONCURRENCY = int(os.getenv("PASSWORD_HASH_MAX_CONCURRENCY", str(PASSWORD_HASH_WORKERS)))
+
+
+def make_context(rounds: int = BCRYPT_ROUNDS) -> CryptContext:
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+class PasswordHasher:
+    """
+    Хеширование и проверка паролей вне event loop: bcrypt выполняется в пуле потоков,
+    одновременно — не больше max_concurrency операций, остальные ждут в очереди.
+    """
+
+    def __init__(self, context: CryptContext = None, workers: int = PASSWORD_HASH_WORKERS,
+                 max_concurrency: int = PASSWORD_HASH_MAX_CONCURRENCY):
+        self.context = context or make_context()
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.waiting = 0
+        self.active = 0
+        self.max_waiting = 0
+        self.completed = 0
+        self.rehashed = 0
+        self.wait_seconds_total = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, func, *args):
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        started = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            # Ожидание завершилось (или запрос отменён) — задача больше не в очереди
+            self.waiting -= 1
+        self.wait_seconds_total += time.perf_counter() - started
+
+        self.active += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.active -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(self.context.verify, password, password_hash)
+
+    async def verify_and_update(self, password: str, password_hash: str) -> tuple[bool, Optional[str]]:
+        """(пароль верен, новый хеш) — новый хеш не None, если параметры bcrypt изменились"""
+        valid, new_hash = await self._run(self.context.verify_and_update, password, password_hash)
+        if new_hash:
+            self.rehashed += 1
+        return valid, new_hash
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "bcrypt_rounds": self.context.to_dict().get("bcrypt__default_rounds"),
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_waiting,
+            "active": self.active,
+            "completed": self.completed,
+            "rehashed": self.rehashed,
+            "avg_wait_ms": round(self.wait_seconds_total / self.completed * 1000, 2) if self.completed else 0.0,
+        }
+
+
+# ✅ Хешер процесса auth_service
+password_hasher = PasswordHasher()
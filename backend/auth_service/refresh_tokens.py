@@ -0,0 +1,105 @@
+import os
+import asyncio
+import hashlib
+import logging
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from auth_service.database import AsyncSessionLocal
+from auth_service.models import RefreshToken
+
+logger = logging.getLogger(__name__)
+
+# 🔹 Максимум активных сессий (refresh-токенов) на пользователя: при превышении удаляются самые старые
+REFRESH_TOKEN_MAX_SESSIONS = int(os.getenv("REFRESH_TOKEN_MAX_SESSIONS", "10"))
+
+# 🔹 Очистка истёкших токенов: период (секунды) и размер пачки одного DELETE
+REFRESH_TOKEN_SWEEP_INTERVAL = float(os.getenv("REFRESH_TOKEN_SWEEP_INTERVAL", "300"))
+REFRESH_TOKEN_SWEEP_BATCH = int(os.getenv("REFRESH_TOKEN_SWEEP_BATCH", "1000"))
+
+
+def hash_refresh_token(token: str) -> str:
+    """SHA-256 refresh-токена — ключ поиска в refresh_tokens"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+async def enforce_session_cap(db: AsyncSession, user_id, max_sessions: int = REFRESH_TOKEN_MAX_SESSIONS):
+    """Удаляем самые старые сессии пользователя сверх лимита (изменения коммитит вызывающий)"""
+    if max_sessions <= 0:
+        return
+
+    stale = (
+        select(RefreshToken.id)
+        .where(RefreshToken.user_id == user_id)
+        .order_by(RefreshToken.created_at.desc(), RefreshToken.id.desc())
+        .offset(max_sessions)
+    )
+    await db.execute(delete(RefreshToken).where(RefreshToken.id.in_(stale)))
+
+
+class RefreshTokenSweeper:
+    """Фоновая задача: периодически удаляет истёкшие refresh-токены пачками"""
+
+    def __init__(self, session_factory=AsyncSessionLocal, interval: float = REFRESH_TOKEN_SWEEP_INTERVAL,
+                 batch_size: int = REFRESH_TOKEN_SWEEP_BATCH):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self.deleted_total = 0
+        self.last_run: Optional[datetime] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Ошибка очистки refresh-токенов")
+            await asyncio.sleep(self.interval)
+
+    async def sweep(self) -> int:
+        """Удаляет истёкшие токены пачками по batch_size, каждая пачка — отдельная транзакция"""
+        deleted = 0
+        while True:
+            # expires_at хранится в UTC без часового пояса
+            expired = (
+                select(RefreshToken.id)
+                .where(RefreshToken.expires_at < datetime.utcnow())
+                .limit(self.batch_size)
+            )
+            async with self.session_factory() as db:
+                result = await db.execute(delete(RefreshToken).where(RefreshToken.id.in_(expired)))
+                await db.commit()
+
+            deleted += result.rowcount
+            if result.rowcount < self.batch_size:
+                break
+
+        self.deleted_total += deleted
+        self.last_run = datetime.utcnow()
+        if deleted:
+            logger.info(f"Удалено истёкших refresh-токенов: {deleted}")
+        return deleted
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "batch_size": self.batch_size,
+            "max_sessions": REFRESH_TOKEN_MAX_SESSIONS,
+            "deleted_total": self.deleted_total,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+        }
+
+
+# ✅ Очистка запускается в lifespan auth_service
+refresh_token_sweeper = RefreshTokenSweeper()
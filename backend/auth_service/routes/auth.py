@@ -1,10 +1,9 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from auth_service.models import User, RefreshToken
-from auth_service.database import get_db
-from passlib.context import CryptContext
+from auth_service.database import get_db, engine
 import jwt
 import datetime
 import os
@@ -12,6 +11,11 @@ import uuid
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy import delete
 from shared.schemas import CurrentUser
+from shared.identity import verify_identity
+from shared.db import engine_stats
+from auth_service.user_cache import user_cache
+from auth_service.passwords import password_hasher
+from auth_service.refresh_tokens import enforce_session_cap, hash_refresh_token, refresh_token_sweeper
 
 router = APIRouter()
 
@@ -21,8 +25,10 @@ REFRESH_SECRET_KEY = os.getenv("REFRESH_SECRET_KEY", "your_refresh_secret_key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 180
 REFRESH_TOKEN_EXPIRE_DAYS = 30
+# 🔹 Фактический срок жизни refresh-токена (он же expires_at в refresh_tokens)
+REFRESH_TOKEN_TTL = datetime.timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+#REFRESH_TOKEN_TTL = datetime.timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 #oauth2_scheme = OAuth2PasswordBearer(tokenUrl="http://127.0.0.1:8001/auth/login")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -55,7 +61,7 @@ async def register(request: RegisterRequest, db: AsyncSession = Depends(get_db_s
     if request.role not in ["investor", "founder", "admin"]:
         raise HTTPException(status_code=400, detail="Некорректная роль")
 
-    hashed_password = pwd_context.hash(request.password)
+    hashed_password = await password_hasher.hash(request.password)
 
     new_user = User(
         id=uuid.uuid4(),
@@ -84,14 +90,31 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
     result = await db.execute(select(User).where(User.email == form_data.username))
     user = result.scalars().first()
 
-    if not user or not pwd_context.verify(form_data.password, user.password_hash):
+    if not user:
         raise HTTPException(status_code=401, detail="Неверные учетные данные")
 
+    # ✅ bcrypt выполняется в пуле потоков и не блокирует другие запросы
+    valid, new_hash = await password_hasher.verify_and_update(form_data.password, user.password_hash)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Неверные учетные данные")
+
+    if new_hash:
+        # 🔹 Стоимость bcrypt изменилась — сохраняем пересчитанный хеш
+        user.password_hash = new_hash
+
     access_token = create_access_token({"sub": str(user.id), "role": user.role})
     refresh_token = create_refresh_token({"sub": str(user.id)})
 
-    new_refresh = RefreshToken(id=uuid.uuid4(), user_id=user.id, token=refresh_token)
+    # ✅ В БД — только хеш токена и срок его действия
+    new_refresh = RefreshToken(
+        id=uuid.uuid4(),
+        user_id=user.id,
+        token_hash=hash_refresh_token(refresh_token),
+        expires_at=datetime.datetime.utcnow() + REFRESH_TOKEN_TTL,
+    )
     db.add(new_refresh)
+    await db.flush()
+    await enforce_session_cap(db, user.id)
     await db.commit()
 
     return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "Bearer"}
@@ -107,9 +130,10 @@ def create_access_token(data: dict):
 
 # 🔹 Функция генерации Refresh Token
 def create_refresh_token(data: dict):
-    expire = datetime.datetime.now(datetime.UTC) + datetime.timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    expire = datetime.datetime.now(datetime.UTC) + REFRESH_TOKEN_TTL
     #expire = datetime.datetime.utcnow() + datetime.timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    data.update({"exp": expire})
+    # jti делает токены уникальными, даже если выданы в одну секунду
+    data.update({"exp": expire, "jti": uuid.uuid4().hex})
     return jwt.encode(data, REFRESH_SECRET_KEY, algorithm=ALGORITHM)
 
 # 🔹 Обновление Access-токена
@@ -118,7 +142,12 @@ class RefreshRequest(BaseModel):
 
 @router.post("/refresh", response_model=TokenResponse, summary="Обновление access-токена")
 async def refresh_token(request: RefreshRequest, db: AsyncSession = Depends(get_db_session)):
-    result = await db.execute(select(RefreshToken).where(RefreshToken.token == request.refresh_token))
+    result = await db.execute(
+        select(RefreshToken).where(
+            RefreshToken.token_hash == hash_refresh_token(request.refresh_token),
+            RefreshToken.expires_at > datetime.datetime.utcnow(),
+        )
+    )
     refresh_entry = result.scalars().first()
 
     if not refresh_entry:
@@ -143,7 +172,7 @@ async def refresh_token(request: RefreshRequest, db: AsyncSession = Depends(get_
 # 🔹 Выход из системы (удаление Refresh-токена)
 @router.post("/logout", summary="Выход из системы")
 async def logout(request: RefreshRequest, db: AsyncSession = Depends(get_db_session)):
-    await db.execute(delete(RefreshToken).where(RefreshToken.token == request.refresh_token))
+    await db.execute(delete(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(request.refresh_token)))
     #await db.execute(select(RefreshToken).where(RefreshToken.token == request.refresh_token).delete())
     await db.commit()
     return {"message": "Вы вышли из системы"}
@@ -151,22 +180,41 @@ async def logout(request: RefreshRequest, db: AsyncSession = Depends(get_db_sess
 # ✅ 4. Авторизация и проверка прав доступа
 
 # 🔹 Декодирование и проверка JWT токена
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db_session)) -> CurrentUser:
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db_session)) -> CurrentUser:
+    # ✅ Личность уже проверена api_gateway — обходимся без декодирования токена и запроса в БД
+    identity = verify_identity(request.headers)
+    if identity:
+        user_id, role = identity
+        return CurrentUser(user_id=user_id, role=role)
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = payload.get("sub")
 
+        # ✅ Повторные запросы того же пользователя обслуживаются из кеша без запроса в БД
+        cached = await user_cache.get(user_id)
+        if cached is not None:
+            return cached
+
         result = await db.execute(select(User).where(User.id == user_id))
         user = result.scalars().first()
 
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
-        return CurrentUser(user_id=user.id, role=user.role)
+        current_user = CurrentUser(user_id=user.id, role=user.role)
+        await user_cache.put(current_user)
+        return current_user
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+# ✅ Служебные эндпоинты (статистика кешей и пулов) — только для роли admin
+async def require_admin(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Access denied")
+    return current_user
+
 """
 async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db_session)):
     try:
@@ -206,11 +254,20 @@ async def get_user_profile(current_user: CurrentUser  = Depends(get_current_user
 class UpdateProfileRequest(BaseModel):
     full_name: str
 
+# 🔹 get_current_user отдаёт только id и роль — для изменения нужна строка пользователя
+async def load_user(db: AsyncSession, user_id) -> User:
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalars().first()
+    if not user:
+        raise HTTPException(status_code=404, detail="Пользователь не найден")
+    return user
+
 @router.put("/update-profile", summary="Обновление профиля пользователя")
-async def update_profile(request: UpdateProfileRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db_session)):
-    current_user.full_name = request.full_name
+async def update_profile(request: UpdateProfileRequest, current_user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_db_session)):
+    user = await load_user(db, current_user.user_id)
+    user.full_name = request.full_name
     await db.commit()
-    await db.refresh(current_user)
+    await user_cache.invalidate(current_user.user_id)
     return {"message": "Профиль обновлён"}
 
 # 🔹 Смена пароля пользователя
@@ -219,12 +276,14 @@ class ChangePasswordRequest(BaseModel):
     new_password: str
 
 @router.post("/change-password", summary="Смена пароля пользователя")
-async def change_password(request: ChangePasswordRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db_session)):
-    if not pwd_context.verify(request.old_password, current_user.password_hash):
+async def change_password(request: ChangePasswordRequest, current_user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_db_session)):
+    user = await load_user(db, current_user.user_id)
+    if not await password_hasher.verify(request.old_password, user.password_hash):
         raise HTTPException(status_code=400, detail="Старый пароль неверен")
 
-    current_user.password_hash = pwd_context.hash(request.new_password)
+    user.password_hash = await password_hasher.hash(request.new_password)
     await db.commit()
+    await user_cache.invalidate(current_user.user_id)
     return {"message": "Пароль успешно изменён"}
 
 class TokenRequest(BaseModel):
@@ -245,3 +304,23 @@ async def verify_token(request: TokenRequest):  #(token: str):
         raise HTTPException(status_code=401, detail="Token has expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+
+# 🔹 Статистика кеша пользователей get_current_user
+@router.get("/user-cache/stats", summary="Статистика кеша пользователей", dependencies=[Depends(require_admin)])
+async def get_user_cache_stats():
+    return user_cache.stats()
+
+# 🔹 Очередь и загрузка пула хеширования паролей
+@router.get("/password-hasher/stats", summary="Статистика хеширования паролей", dependencies=[Depends(require_admin)])
+async def get_password_hasher_stats():
+    return password_hasher.stats()
+
+# 🔹 Очистка истёкших refresh-токенов
+@router.get("/refresh-tokens/stats", summary="Статистика очистки refresh-токенов", dependencies=[Depends(require_admin)])
+async def get_refresh_token_stats():
+    return refresh_token_sweeper.stats()
+
+# 🔹 Пул соединений с БД
+@router.get("/db/pool-stats", summary="Статистика пула соединений с БД", dependencies=[Depends(require_admin)])
+async def get_db_pool_stats():
+    return engine_stats(engine)
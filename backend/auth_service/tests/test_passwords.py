@@ -0,0 +1,52 @@
+import sys
+import os
+import asyncio
+
+# ✅ Добавляем `backend` в PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import pytest
+from auth_service.passwords import PasswordHasher, make_context
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_in_executor():
+    hasher = PasswordHasher(make_context(4), workers=2, max_concurrency=2)
+    password_hash = await hasher.hash("Secret123")
+
+    assert await hasher.verify("Secret123", password_hash)
+    assert not await hasher.verify("wrong", password_hash)
+    assert hasher.stats()["completed"] == 3
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rehash_on_login_when_rounds_change():
+    old_hash = await PasswordHasher(make_context(4)).hash("Secret123")
+    hasher = PasswordHasher(make_context(5))
+
+    valid, new_hash = await hasher.verify_and_update("Secret123", old_hash)
+    assert valid
+    assert new_hash and "$05$" in new_hash
+
+    valid, again = await hasher.verify_and_update("Secret123", new_hash)
+    assert valid and again is None
+    assert hasher.stats()["rehashed"] == 1
+
+    valid, new_hash = await hasher.verify_and_update("wrong", old_hash)
+    assert not valid and new_hash is None
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_queues_extra_requests():
+    hasher = PasswordHasher(make_context(4), workers=4, max_concurrency=1)
+    password_hash = await hasher.hash("Secret123")
+
+    results = await asyncio.gather(*(hasher.verify("Secret123", password_hash) for _ in range(5)))
+
+    assert all(results)
+    stats = hasher.stats()
+    assert stats["max_queue_depth"] == 4
+    assert stats["queue_depth"] == 0
+    assert stats["active"] == 0
+    hasher.shutdown()
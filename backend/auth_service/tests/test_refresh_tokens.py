@@ -0,0 +1,55 @@
+import sys
+import os
+
+# ✅ Добавляем `backend` в PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import pytest
+from auth_service.refresh_tokens import RefreshTokenSweeper, hash_refresh_token
+
+
+class FakeResult:
+    def __init__(self, rowcount: int):
+        self.rowcount = rowcount
+
+
+class FakeSession:
+    """Сессия, которая «удаляет» заданное число строк за каждый DELETE"""
+
+    def __init__(self, batches: list[int]):
+        self.batches = batches
+        self.commits = 0
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        return FakeResult(self.batches.pop(0))
+
+    async def commit(self):
+        self.commits += 1
+
+
+def test_hash_is_fixed_size_and_deterministic():
+    token = "header.payload.signature" * 20
+
+    assert len(hash_refresh_token(token)) == 64
+    assert hash_refresh_token(token) == hash_refresh_token(token)
+    assert hash_refresh_token(token) != hash_refresh_token(token + "x")
+
+
+@pytest.mark.asyncio
+async def test_sweep_deletes_in_batches_until_partial_batch():
+    session = FakeSession([100, 100, 37])
+    sweeper = RefreshTokenSweeper(session_factory=session, batch_size=100)
+
+    assert await sweeper.sweep() == 237
+    assert session.commits == 3
+    assert sweeper.stats()["deleted_total"] == 237
+    assert sweeper.stats()["last_run"] is not None
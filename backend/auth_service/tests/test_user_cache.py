@@ -0,0 +1,133 @@
+import sys
+import os
+import uuid
+
+# ✅ Добавляем `backend` в PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import pytest
+from auth_service.user_cache import UserCache
+from shared.schemas import CurrentUser
+
+
+def make_user(role: str = "investor") -> CurrentUser:
+    return CurrentUser(user_id=uuid.uuid4(), role=role)
+
+
+@pytest.mark.asyncio
+async def test_hit_after_put_and_hit_rate():
+    cache = UserCache(ttl=60, max_size=10, backend="memory")
+    user = make_user()
+
+    assert await cache.get(user.user_id) is None
+    await cache.put(user)
+    assert await cache.get(str(user.user_id)) == user
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_entry():
+    cache = UserCache(ttl=60, max_size=10, backend="memory")
+    user = make_user()
+    await cache.put(user)
+
+    await cache.invalidate(user.user_id)
+    assert await cache.get(user.user_id) is None
+
+
+@pytest.mark.asyncio
+async def test_expired_and_evicted_entries_are_misses():
+    expired = UserCache(ttl=-1, max_size=10, backend="memory")
+    user = make_user()
+    await expired.put(user)
+    assert await expired.get(user.user_id) is None
+
+    cache = UserCache(ttl=60, max_size=1, backend="memory")
+    first, second = make_user(), make_user("founder")
+    await cache.put(first)
+    await cache.put(second)
+    assert await cache.get(first.user_id) is None
+    assert await cache.get(second.user_id) == second
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        UserCache(backend="memcached")
+
+
+class FakeResult:
+    def __init__(self, user):
+        self.user = user
+
+    def scalars(self):
+        return self
+
+    def first(self):
+        return self.user
+
+
+class FakeSession:
+    """Сессия с одним пользователем: считает запросы к БД"""
+
+    def __init__(self, user):
+        self.user = user
+        self.queries = 0
+
+    async def execute(self, statement):
+        self.queries += 1
+        return FakeResult(self.user)
+
+    async def commit(self):
+        pass
+
+
+def plain_request():
+    # Запрос без заголовков личности от gateway — get_current_user разбирает токен сам
+    from starlette.requests import Request
+    return Request({"type": "http", "headers": []})
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_serves_hits_and_reloads_after_profile_update(monkeypatch):
+    from types import SimpleNamespace
+    from auth_service.routes import auth
+
+    monkeypatch.setattr(auth, "user_cache", UserCache(ttl=60, max_size=10, backend="memory"))
+    user = SimpleNamespace(id=uuid.uuid4(), role="investor", full_name="Old")
+    db = FakeSession(user)
+    token = auth.create_access_token({"sub": str(user.id)})
+
+    first = await auth.get_current_user(plain_request(), token, db)
+    second = await auth.get_current_user(plain_request(), token, db)
+    assert first == second == CurrentUser(user_id=user.id, role="investor")
+    assert db.queries == 1
+
+    # Изменение профиля загружает строку пользователя и сбрасывает запись кеша
+    await auth.update_profile(auth.UpdateProfileRequest(full_name="New"), first, db)
+    assert user.full_name == "New"
+    assert await auth.user_cache.get(user.id) is None
+
+    user.role = "admin"
+    reloaded = await auth.get_current_user(plain_request(), token, db)
+    assert reloaded.role == "admin"
+    assert db.queries == 3
+
+
+@pytest.mark.asyncio
+async def test_stats_endpoints_require_admin():
+    from fastapi import HTTPException
+    from auth_service.routes import auth
+
+    with pytest.raises(HTTPException) as error:
+        await auth.require_admin(make_user("investor"))
+    assert error.value.status_code == 403
+    assert (await auth.require_admin(make_user("admin"))).role == "admin"
+
+    stats_routes = [route for route in auth.router.routes if "stats" in route.path]
+    assert stats_routes
+    for route in stats_routes:
+        assert auth.require_admin in [dependency.dependency for dependency in route.dependencies]
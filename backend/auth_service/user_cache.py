@@ -0,0 +1,129 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+from shared.schemas import CurrentUser
+
+logger = logging.getLogger(__name__)
+
+# 🔹 Кеш CurrentUser по id пользователя (запись живёт не дольше USER_CACHE_TTL секунд)
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "300"))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+
+# 🔹 Хранилище: memory — кеш процесса, redis — общий кеш сервисов (database/redis.conf, пакет redis).
+#    При memory и нескольких процессах устаревание записи после изменения ограничено только USER_CACHE_TTL.
+USER_CACHE_BACKEND = os.getenv("USER_CACHE_BACKEND", "memory")
+REDIS_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6380/0")
+REDIS_KEY_PREFIX = "current_user:"
+
+
+class UserCache:
+    """
+    TTL/LRU-кеш CurrentUser для get_current_user. Записи сбрасываются через
+    invalidate() при изменении пользователя; с USER_CACHE_BACKEND=redis сброс
+    виден всем процессам, в режиме memory — только текущему (до истечения TTL).
+    """
+
+    def __init__(self, ttl: float = USER_CACHE_TTL, max_size: int = USER_CACHE_MAX_SIZE, backend: str = USER_CACHE_BACKEND):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.backend = backend
+        self._entries: OrderedDict[str, tuple[float, CurrentUser]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+        if backend == "redis":
+            try:
+                import redis.asyncio as redis
+            except ImportError:
+                logger.warning("USER_CACHE_BACKEND=redis, но пакет redis не установлен — используется кеш процесса")
+                self.backend = "memory"
+            else:
+                self._redis = redis.from_url(REDIS_URL)
+        elif backend != "memory":
+            raise ValueError(f"Неизвестный USER_CACHE_BACKEND: {backend}. Допустимые: memory, redis")
+
+    async def get(self, user_id) -> Optional[CurrentUser]:
+        key = str(user_id)
+        if self._redis is not None:
+            try:
+                raw = await self._redis.get(REDIS_KEY_PREFIX + key)
+            except Exception:
+                # Redis недоступен — идём в БД, как без кеша
+                logger.exception("Ошибка чтения кеша пользователей из Redis")
+                self.errors += 1
+                raw = None
+            user = CurrentUser.model_validate_json(raw) if raw else None
+            self._count(user is not None)
+            return user
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+            self._count(entry is not None)
+            return entry[1] if entry else None
+
+    async def put(self, user: CurrentUser):
+        key = str(user.user_id)
+        if self._redis is not None:
+            try:
+                await self._redis.set(REDIS_KEY_PREFIX + key, user.model_dump_json(), ex=max(1, int(self.ttl)))
+            except Exception:
+                logger.exception("Ошибка записи кеша пользователей в Redis")
+                self.errors += 1
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    async def invalidate(self, user_id):
+        """Сброс записи после изменения пользователя (роль, профиль, удаление)"""
+        key = str(user_id)
+        if self._redis is not None:
+            try:
+                await self._redis.delete(REDIS_KEY_PREFIX + key)
+            except Exception:
+                logger.exception("Ошибка сброса кеша пользователей в Redis")
+                self.errors += 1
+
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _count(self, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend,
+            "entries": len(self._entries) if self._redis is None else None,
+            "ttl": self.ttl,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# ✅ Кеш процесса (используется get_current_user в auth_service и sourcing_service)
+user_cache = UserCache()
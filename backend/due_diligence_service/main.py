@@ -1,11 +1,26 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from routes.kpi import router
+from database import engine
+from shared.db import engine_stats
 from fastapi.middleware.cors import CORSMiddleware
 
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # ✅ Метрики ожидания пула за время работы (у сервиса нет закрытых служебных эндпоинтов)
+    logger.info(f"Пул соединений с БД: {engine_stats(engine)}")
+    # ✅ Закрываем соединения пула БД
+    await engine.dispose()
+
 app = FastAPI(
     title="Due Diligence Service",
     description="API для анализа стартапов перед инвестицией",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # ✅ Добавляем CORS
@@ -1,7 +1,11 @@
 from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Dict
-from sqlalchemy.orm import Session
+import os
+import uuid
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from database import get_db
 from models import DueDiligenceStartup
 
@@ -22,29 +26,112 @@ class KPIResponse(BaseModel):
     kpi_results: Dict[str, Dict]
     recommended_docs: List[str]
 
+# ✅ Пакетный приём: стартапы и итог по каждому
+class KPIBatchRequest(BaseModel):
+    startups: List[KPIRequest] = Field(..., min_length=1)
+
+# 🔹 Максимум стартапов в одном пакетном приёме
+DUE_DILIGENCE_BATCH_MAX = int(os.getenv("DUE_DILIGENCE_BATCH_MAX", "1000"))
+
+# ✅ Пакетный приём от sourcing_service (объявлен до /analyze/{startup_id})
+@router.post("/analyze/batch", summary="Пакетный приём стартапов для Due Diligence")
+async def receive_startups_batch(request: KPIBatchRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Добавляет все стартапы одним многострочным INSERT ... ON CONFLICT DO NOTHING
+    и возвращает итог по каждому startup_id: inserted / already_exists / invalid.
+    """
+    if len(request.startups) > DUE_DILIGENCE_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"Не больше {DUE_DILIGENCE_BATCH_MAX} стартапов за запрос")
+
+    # Повторы одного стартапа в пакете схлопываются: ON CONFLICT не видит строки того же INSERT
+    startups, invalid = {}, []
+    for item in request.startups:
+        try:
+            startups[uuid.UUID(item.startup_id)] = item
+        except ValueError:
+            invalid.append(item.startup_id)
+
+    inserted = set()
+    if startups:
+        stmt = (
+            pg_insert(DueDiligenceStartup)
+            .values([
+                {
+                    "startup_id": startup_uuid,
+                    "company_name": item.company_name,
+                    "industry": item.industry,
+                    "stage": item.stage,
+                    "region": item.region,
+                    "min_check": item.min_check,
+                }
+                for startup_uuid, item in startups.items()
+            ])
+            .on_conflict_do_nothing(index_elements=[DueDiligenceStartup.startup_id])
+            .returning(DueDiligenceStartup.startup_id)
+        )
+        result = await db.execute(stmt)
+        inserted = set(result.scalars().all())
+        await db.commit()
+
+    results = [
+        {"startup_id": str(startup_uuid), "status": "inserted" if startup_uuid in inserted else "already_exists"}
+        for startup_uuid in startups
+    ] + [{"startup_id": startup_id, "status": "invalid"} for startup_id in invalid]
+
+    return {
+        "inserted": len(inserted),
+        "already_exists": len(startups) - len(inserted),
+        "invalid": len(invalid),
+        "results": results,
+    }
+
+def due_diligence_entry(entry: DueDiligenceStartup) -> dict:
+    return {
+        "id": str(entry.id),
+        "startup_id": str(entry.startup_id),
+        "company_name": entry.company_name,
+        "industry": entry.industry,
+        "stage": entry.stage,
+        "region": entry.region,
+        "min_check": float(entry.min_check),
+        "created_at": entry.created_at.isoformat() if entry.created_at else None,
+    }
+
 # ✅ Приём данных от sourcing_service
 @router.post("/analyze/{startup_id}", summary="Приём стартапа для Due Diligence")
-async def receive_startup_for_due_diligence(startup_id: str, request: KPIRequest, db: Session = Depends(get_db)):
+async def receive_startup_for_due_diligence(startup_id: str, request: KPIRequest, db: AsyncSession = Depends(get_db)):
     """
     Получает данные о стартапе из `sourcing_service` и добавляет в Due Diligence.
+    Повторный приём того же startup_id не ошибка: возвращается уже сохранённая запись.
     """
-    existing_entry = db.query(DueDiligenceStartup).filter(DueDiligenceStartup.startup_id == startup_id).first()
-    if existing_entry:
-        raise HTTPException(status_code=400, detail="Стартап уже в Due Diligence")
+    try:
+        startup_uuid = uuid.UUID(request.startup_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid startup_id")
 
-    new_entry = DueDiligenceStartup(
-        startup_id=request.startup_id,
-        company_name=request.company_name,
-        industry=request.industry,
-        stage=request.stage,
-        region=request.region,
-        min_check=request.min_check
+    # ✅ Один INSERT ... ON CONFLICT вместо проверки и вставки: повторный приём не создаёт гонку
+    stmt = (
+        pg_insert(DueDiligenceStartup)
+        .values(
+            startup_id=startup_uuid,
+            company_name=request.company_name,
+            industry=request.industry,
+            stage=request.stage,
+            region=request.region,
+            min_check=request.min_check
+        )
+        .on_conflict_do_nothing(index_elements=[DueDiligenceStartup.startup_id])
+        .returning(DueDiligenceStartup)
     )
-    db.add(new_entry)
-    db.commit()
-    db.refresh(new_entry)
+    entry = (await db.execute(stmt)).scalar_one_or_none()
+    if entry is None:
+        existing = await db.execute(select(DueDiligenceStartup).where(DueDiligenceStartup.startup_id == startup_uuid))
+        entry = existing.scalar_one()
+        await db.commit()
+        return {"message": "Стартап уже в Due Diligence", "status": "already_exists", "startup": due_diligence_entry(entry)}
 
-    return {"message": "Стартап успешно добавлен в Due Diligence"}
+    await db.commit()
+    return {"message": "Стартап успешно добавлен в Due Diligence", "status": "inserted", "startup": due_diligence_entry(entry)}
 
 # ✅ Анализ KPI (уже был)
 @router.post("/analyze", summary="Анализ KPI стартапа", response_model=KPIResponse)
@@ -0,0 +1,18 @@
+import sys
+import os
+
+# ✅ Добавляем `due_diligence_service` в начало PYTHONPATH: сервис импортирует свои модули без пакета,
+#    а в `backend` есть одноимённый main.py
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from database import engine
+from shared.db import DB_MAX_OVERFLOW, DB_POOL_SIZE, MeteredAsyncPool, engine_stats
+
+
+def test_engine_uses_shared_metered_pool():
+    pool = engine.sync_engine.pool
+
+    assert isinstance(pool, MeteredAsyncPool)
+    assert pool.size() == DB_POOL_SIZE
+    assert engine_stats(engine)["max_overflow"] == DB_MAX_OVERFLOW
+    assert engine.echo is False
@@ -0,0 +1,95 @@
+import sys
+import os
+import uuid
+
+# ✅ Добавляем `due_diligence_service` в начало PYTHONPATH: сервис импортирует свои модули без пакета,
+#    а в `backend` есть одноимённый main.py
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import httpx
+import pytest
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from database import Base, get_db
+from models import DueDiligenceStartup
+from main import app
+
+# ✅ Приём проверяется на тестовой БД: TEST_DATABASE_URL=postgresql+asyncpg://.../venture_app_test
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+requires_db = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL не задан")
+
+
+def make_payload(startup_id: str, company_name: str = "Acme") -> dict:
+    return {"startup_id": startup_id, "company_name": company_name, "industry": "fintech", "stage": "seed", "region": "EU", "min_check": 50000}
+
+
+@pytest.fixture
+async def db_engine():
+    engine = create_async_engine(TEST_DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[DueDiligenceStartup.__table__])
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client(db_engine):
+    async def test_db():
+        async with AsyncSession(db_engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = test_db
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://due-diligence") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+async def startup_id(db_engine):
+    startup_id = str(uuid.uuid4())
+    yield startup_id
+    async with db_engine.begin() as conn:
+        await conn.execute(delete(DueDiligenceStartup).where(DueDiligenceStartup.startup_id == uuid.UUID(startup_id)))
+
+
+async def stored_count(engine, startup_id: str) -> int:
+    async with engine.connect() as conn:
+        query = select(func.count()).where(DueDiligenceStartup.startup_id == uuid.UUID(startup_id))
+        return (await conn.execute(query)).scalar_one()
+
+
+@requires_db
+@pytest.mark.asyncio
+async def test_first_intake_inserts_row(client, db_engine, startup_id):
+    response = await client.post(f"/kpi/analyze/{startup_id}", json=make_payload(startup_id))
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "inserted"
+    assert body["startup"]["startup_id"] == startup_id
+    assert body["startup"]["company_name"] == "Acme"
+    assert await stored_count(db_engine, startup_id) == 1
+
+
+@requires_db
+@pytest.mark.asyncio
+async def test_duplicate_intake_returns_existing_row(client, db_engine, startup_id):
+    first = (await client.post(f"/kpi/analyze/{startup_id}", json=make_payload(startup_id))).json()
+
+    response = await client.post(f"/kpi/analyze/{startup_id}", json=make_payload(startup_id, company_name="Acme v2"))
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "already_exists"
+    assert body["startup"] == first["startup"]
+    assert body["startup"]["company_name"] == "Acme"
+    assert await stored_count(db_engine, startup_id) == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_startup_id_is_bad_request():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://due-diligence") as client:
+        response = await client.post("/kpi/analyze/x", json=make_payload("not-a-uuid"))
+
+    assert response.status_code == 400
@@ -0,0 +1,88 @@
+import os
+import time
+import logging
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+# 🔹 Пул соединений (на процесс): pool_size постоянных + max_overflow временных
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") not in ("0", "false", "False")
+
+# 🔹 Кеш подготовленных выражений asyncpg на соединение (0 — выключить, нужно за pgbouncer в transaction mode)
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "500"))
+
+# 🔹 Логирование каждого SQL-запроса — только для отладки
+DB_ECHO = os.getenv("DB_ECHO", "0") in ("1", "true", "True")
+
+
+class MeteredAsyncPool(AsyncAdaptedQueuePool):
+    """Пул с замером ожидания свободного соединения при checkout"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def recreate(self):
+        # Пул пересоздаётся при dispose/инвалидации — счётчики переносим
+        pool = super().recreate()
+        pool.checkouts, pool.timeouts = self.checkouts, self.timeouts
+        pool.total_wait, pool.max_wait = self.total_wait, self.max_wait
+        return pool
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": self.overflow(),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+
+def create_engine(database_url: str, **overrides) -> AsyncEngine:
+    """Асинхронный движок сервиса с общими настройками пула, кеша выражений и echo"""
+    options = {
+        "echo": DB_ECHO,
+        "poolclass": MeteredAsyncPool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": {"prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE},
+    }
+    options.update(overrides)
+    return create_async_engine(database_url, **options)
+
+
+def engine_stats(engine: AsyncEngine) -> dict:
+    pool = engine.sync_engine.pool
+    if isinstance(pool, MeteredAsyncPool):
+        return pool.stats()
+    return {"status": pool.status()}
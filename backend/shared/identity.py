@@ -0,0 +1,72 @@
+import os
+import hmac
+import time
+import hashlib
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# 🔹 Заголовки с личностью пользователя, проверенной api_gateway
+USER_ID_HEADER = "X-User-Id"
+USER_ROLE_HEADER = "X-User-Role"
+IDENTITY_EXPIRES_HEADER = "X-Identity-Expires"
+IDENTITY_SIGNATURE_HEADER = "X-Identity-Signature"
+
+# 🔹 Общий секрет gateway и сервисов: сервисы доверяют заголовкам только с верной подписью.
+#    Без секрета (или с публичным примером из документации) заголовки не подписываются и не
+#    принимаются: иначе любой, кто достучится до сервиса напрямую, подписал бы себе роль admin.
+#    Сервисы тогда сами проверяют JWT, как до передачи личности через gateway.
+GATEWAY_IDENTITY_SECRET = os.getenv("GATEWAY_IDENTITY_SECRET", "")
+INSECURE_IDENTITY_SECRETS = ("", "your_gateway_identity_secret")
+
+
+def identity_secret_configured() -> bool:
+    return GATEWAY_IDENTITY_SECRET not in INSECURE_IDENTITY_SECRETS
+
+
+def check_identity_secret(service: str):
+    """Вызывается при старте сервиса: громкое предупреждение, если секрет не задан"""
+    if not identity_secret_configured():
+        logger.warning(
+            f"⚠️ GATEWAY_IDENTITY_SECRET не задан или равен примеру: {service} не использует подписанные "
+            "заголовки личности gateway. Задайте одинаковый секрет в api_gateway, auth_service и sourcing_service."
+        )
+
+
+def _signature(user_id: str, role: str, expires: int) -> str:
+    message = f"{user_id}:{role}:{expires}".encode()
+    return hmac.new(GATEWAY_IDENTITY_SECRET.encode(), message, hashlib.sha256).hexdigest()
+
+
+def sign_identity(user_id: str, role: str, expires: int) -> Optional[dict[str, str]]:
+    """Заголовки личности для проксируемого запроса (expires — unix time истечения токена) или None без секрета"""
+    if not identity_secret_configured():
+        return None
+    return {
+        USER_ID_HEADER: user_id,
+        USER_ROLE_HEADER: role,
+        IDENTITY_EXPIRES_HEADER: str(expires),
+        IDENTITY_SIGNATURE_HEADER: _signature(user_id, role, expires),
+    }
+
+
+def verify_identity(headers) -> Optional[tuple[str, str]]:
+    """(user_id, role), если заголовки подписаны gateway и не истекли, иначе None"""
+    if not identity_secret_configured():
+        return None
+    user_id = headers.get(USER_ID_HEADER)
+    role = headers.get(USER_ROLE_HEADER)
+    expires = headers.get(IDENTITY_EXPIRES_HEADER)
+    signature = headers.get(IDENTITY_SIGNATURE_HEADER)
+    if not (user_id and role and expires and signature):
+        return None
+
+    try:
+        expires = int(expires)
+    except ValueError:
+        return None
+
+    if expires < time.time() or not hmac.compare_digest(signature, _signature(user_id, role, expires)):
+        return None
+    return user_id, role
@@ -1,7 +1,61 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
 from uuid import UUID
 
 class CurrentUser(BaseModel):
     user_id: UUID
     #email:str
     role: str
+
+# 🔹 Схемы запросов sourcing_service, общие для сервиса и api_gateway
+# (gateway не должен импортировать sourcing_service и его ML-зависимости)
+
+# ✅ Профиль инвестора
+class InvestorProfileUpdate(BaseModel):
+    investor_type: Optional[List[str]] = []
+    investment_stage: Optional[List[str]] = []
+    industry: Optional[List[str]] = []
+    region: Optional[List[str]] = []
+    min_check: Optional[float] = 0
+
+# ✅ Профиль фаундера
+class FounderProfileUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    stage: List[str] = Field(default_factory=list)
+    industry: List[str] = Field(default_factory=list)
+    region: List[str] = Field(default_factory=list)
+    min_check: float = 20
+
+# ✅ Фильтрация стартапов
+class StartupFilterRequest(BaseModel):
+    industry: Optional[List[str]] = None
+    stage: Optional[List[str]] = None
+    region: Optional[List[str]] = None
+    min_check: Optional[float] = None
+
+# ✅ Ответ анкеты скоринга
+class Answer(BaseModel):
+    category_id: int
+    question_id: int
+    score: int = Field(..., ge=0, le=3, description="Score должен быть в диапазоне 0-3")
+
+# ✅ Запрос на заполнение шаблона оценки
+class FillTemplateRequest(BaseModel):
+    startup_id: UUID
+    answers: List[Answer]
+
+    @field_validator("startup_id", mode="before")
+    @classmethod
+    def convert_uuid(cls, value):
+        if isinstance(value, UUID):
+            return str(value)
+        return value
+
+# ✅ Запрос скорингов пачкой (POST-тело вместо ids в query string)
+class StartupScoreBatchRequest(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, description="Список startup_id")
+
+# ✅ Пакетная отправка стартапов в Due Diligence
+class DueDiligenceBatchRequest(BaseModel):
+    startup_ids: List[UUID] = Field(..., min_length=1, description="Список startup_id")
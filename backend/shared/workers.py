@@ -0,0 +1,38 @@
+import os
+import sys
+import shlex
+from typing import Optional
+
+
+def _workers_option(args: list[str], short: bool) -> Optional[int]:
+    for i, arg in enumerate(args):
+        value = None
+        if arg.startswith("--workers="):
+            value = arg.split("=", 1)[1]
+        elif arg == "--workers" or (short and arg == "-w"):
+            value = args[i + 1] if i + 1 < len(args) else None
+        if value is not None:
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+def worker_processes() -> int:
+    """
+    Сколько процессов обслуживают сервис: WEB_CONCURRENCY, `uvicorn --workers N`
+    (воркеры uvicorn запускаются через spawn и наследуют sys.argv родителя),
+    `gunicorn -w N` / `--workers N` и GUNICORN_CMD_ARGS. По умолчанию — 1.
+    """
+    counts = [1]
+    try:
+        counts.append(int(os.getenv("WEB_CONCURRENCY", "1")))
+    except ValueError:
+        pass
+
+    gunicorn = "gunicorn" in os.path.basename(sys.argv[0] if sys.argv else "")
+    counts.append(_workers_option(sys.argv[1:], short=gunicorn) or 1)
+    if gunicorn:
+        counts.append(_workers_option(shlex.split(os.getenv("GUNICORN_CMD_ARGS", "")), short=True) or 1)
+    return max(counts)
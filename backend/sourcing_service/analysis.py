@@ -1,18 +1,27 @@
 import os
 os.environ["TRANSFORMERS_NO_TF"] = "1"
+import json
+import re
+import math
 import uuid
+import hashlib
 import asyncio
 import aiofiles
-from pptx import Presentation
 from functools import lru_cache
-from transformers import pipeline
-import fitz  # PyMuPDF
 from config import UPLOAD_DIR
+from sourcing_service.extraction import extract_text
+from sourcing_service.inference import INFERENCE_BACKEND, load_backend
 
-# ✅ Глобальное кеширование NLP-модели
+MODEL_NAME = "facebook/bart-large-mnli"
+
+# ✅ Глобальное кеширование NLP-модели (transformers импортируется только при первой загрузке)
 @lru_cache(maxsize=1)
 def get_nlp_model():
-    return pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
+    return load_backend(INFERENCE_BACKEND, MODEL_NAME)
+
+def is_model_loaded() -> bool:
+    """Загружена ли модель в этом процессе"""
+    return get_nlp_model.cache_info().currsize > 0
 
 # Ключевые категории оценки
 STARTUP_CATEGORIES = {
@@ -23,48 +32,190 @@ STARTUP_CATEGORIES = {
     "Finance": ["funding", "financial projections", "investment"]
 }
 
-async def save_uploaded_file(file) -> str:
-    """Асинхронное сохранение загруженного файла"""
+# 🔹 Шаблон гипотезы — тот же, что по умолчанию у zero-shot pipeline
+HYPOTHESIS_TEMPLATE = "This example is {}."
+
+# 🔹 Режим скоринга: single_pass — один батч по всем меткам, per_category — прежние 5 вызовов pipeline,
+# chunked — окна по предложениям, чтобы длинный дек не обрезался токенизатором
+SCORING_MODE = os.getenv("SCORING_MODE", "single_pass")
+
+# 🔹 Настройки режима chunked
+CHUNK_MAX_WORDS = int(os.getenv("CHUNK_MAX_WORDS", "300"))
+CHUNK_OVERLAP_SENTENCES = int(os.getenv("CHUNK_OVERLAP_SENTENCES", "1"))
+CHUNK_REDUCER = os.getenv("CHUNK_REDUCER", "max")  # max | mean | topk_mean
+CHUNK_TOP_K = int(os.getenv("CHUNK_TOP_K", "3"))
+CHUNK_BATCH_SIZE = int(os.getenv("CHUNK_BATCH_SIZE", "32"))
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+
+def scoring_version() -> str:
+    """Версия конфигурации скоринга: меняется вместе с моделью, бэкендом, категориями и режимом"""
+    config = {
+        "model": MODEL_NAME,
+        "backend": INFERENCE_BACKEND,
+        "categories": STARTUP_CATEGORIES,
+        "template": HYPOTHESIS_TEMPLATE,
+        "mode": SCORING_MODE,
+    }
+    if SCORING_MODE == "chunked":
+        config["chunks"] = [CHUNK_MAX_WORDS, CHUNK_OVERLAP_SENTENCES, CHUNK_REDUCER, CHUNK_TOP_K]
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+async def save_uploaded_file(file) -> tuple[str, str]:
+    """Асинхронное сохранение загруженного файла, возвращает путь и sha256 содержимого"""
     file_ext = file.filename.split('.')[-1]
     file_id = f"{uuid.uuid4()}.{file_ext}"
     file_path = os.path.join(UPLOAD_DIR, file_id)
+    digest = hashlib.sha256()
     
     async with aiofiles.open(file_path, "wb") as buffer:
         while content := await file.read(8192):  # ✅ Увеличенный размер чанка
+            digest.update(content)
             await buffer.write(content)
     
-    return file_path
-
-async def extract_text(file_path: str, file_type: str) -> str:
-    """Асинхронное извлечение текста из PDF и PPTX"""
-    if file_type == "pdf":
-        doc = fitz.open(file_path)
-        return "\n".join([page.get_text() for page in doc])
-    elif file_type == "pptx":
-        prs = Presentation(file_path)
-        return "\n".join([
-            (slide.notes_text_frame.text if slide.notes_text_frame else "") + " " +
-            " ".join([shape.text for shape in slide.shapes if hasattr(shape, "text")])
-            for slide in prs.slides
-        ])
-    else:
-        return ""
+    return file_path, digest.hexdigest()
 
 async def analyze_text_async(text: str, keywords: list[str]):#(text, keywords):
     """Асинхронный анализ текста с кешированной моделью"""
     model = get_nlp_model()  # ✅ Используем кешированную модель
     return await asyncio.to_thread(model, text, candidate_labels=keywords)
 
+def all_candidate_labels() -> list[str]:
+    """Объединение меток всех категорий без повторов (порядок сохраняется)"""
+    return list(dict.fromkeys(label for keywords in STARTUP_CATEGORIES.values() for label in keywords))
+
+def entailment_logits_batch(model, pairs: list[tuple[str, str]], batch_size: int) -> list[float]:
+    """Логиты entailment для пар (текст, метка), прогоняемых батчами по batch_size"""
+    import torch
+
+    results = []
+    for start in range(0, len(pairs), batch_size):
+        batch = pairs[start:start + batch_size]
+        inputs = model.tokenizer(
+            [premise for premise, _ in batch],
+            [HYPOTHESIS_TEMPLATE.format(label) for _, label in batch],
+            padding=True,
+            truncation="only_first",
+            return_tensors="pt",
+        ).to(model.device)
+
+        with torch.inference_mode():
+            logits = model.model(**inputs).logits
+
+        results.extend(logits[:, model.entailment_id].tolist())
+    return results
+
+def entailment_logits(model, text: str, labels: list[str]) -> dict[str, float]:
+    """Один батчевый прогон NLI-пар (текст, гипотеза) по всем меткам → логиты entailment"""
+    return dict(zip(labels, entailment_logits_batch(model, [(text, label) for label in labels], len(labels))))
+
+def split_into_windows(text: str, max_words: int = None, overlap: int = None) -> list[str]:
+    """
+    Разбиение текста на окна из целых предложений (до max_words слов) с перекрытием
+    в overlap предложений. Повторяющиеся окна (например, одинаковые колонтитулы) отбрасываются.
+    """
+    max_words = max_words or CHUNK_MAX_WORDS
+    overlap = CHUNK_OVERLAP_SENTENCES if overlap is None else overlap
+
+    sentences = []
+    for sentence in SENTENCE_BOUNDARY.split(text):
+        words = sentence.split()
+        # Слишком длинное «предложение» (таблица, список) режем по словам
+        for start in range(0, len(words), max_words):
+            sentences.append(" ".join(words[start:start + max_words]))
+
+    windows, current, current_words = [], [], 0
+    for sentence in sentences:
+        length = len(sentence.split())
+        if current and current_words + length > max_words:
+            windows.append(" ".join(current))
+            current = current[-overlap:] if overlap else []
+            current_words = sum(len(item.split()) for item in current)
+            # Перекрытие не должно само по себе переполнять окно
+            while current and current_words + length > max_words:
+                current_words -= len(current.pop(0).split())
+        current.append(sentence)
+        current_words += length
+    if current:
+        windows.append(" ".join(current))
+
+    unique = {}
+    for window in windows:
+        unique.setdefault(" ".join(window.lower().split()), window)
+    return list(unique.values())
+
+def reduce_scores(values: list[float], reducer: str = None, top_k: int = None) -> float:
+    """Агрегация оценок категории по окнам: max, mean или среднее top-k"""
+    reducer = reducer or CHUNK_REDUCER
+    top_k = top_k or CHUNK_TOP_K
+
+    if reducer == "max":
+        return max(values)
+    if reducer == "mean":
+        return round(sum(values) / len(values), 2)
+    if reducer == "topk_mean":
+        best = sorted(values, reverse=True)[:top_k]
+        return round(sum(best) / len(best), 2)
+    raise ValueError(f"Неизвестный CHUNK_REDUCER: {reducer}")
+
+def chunked_category_scores(model, text: str) -> dict[str, float]:
+    """Оценки категорий по окнам текста: все пары (окно, метка) идут общими батчами"""
+    windows = split_into_windows(text) or [text]
+    labels = all_candidate_labels()
+    pairs = [(window, label) for window in windows for label in labels]
+    logits = entailment_logits_batch(model, pairs, CHUNK_BATCH_SIZE)
+
+    per_window = [
+        fold_category_scores(dict(zip(labels, logits[index * len(labels):(index + 1) * len(labels)])))
+        for index in range(len(windows))
+    ]
+    return {
+        category: reduce_scores([scores[category] for scores in per_window])
+        for category in STARTUP_CATEGORIES
+    }
+
+def fold_category_scores(logits: dict[str, float]) -> dict[str, float]:
+    """
+    Свёртка логитов по категориям: softmax внутри каждой категории (как у pipeline
+    с multi_label=False) и максимум по её меткам, шкала 0–20.
+    """
+    scores = {}
+    for category, keywords in STARTUP_CATEGORIES.items():
+        values = [logits[keyword] for keyword in keywords]
+        peak = max(values)
+        exps = [math.exp(value - peak) for value in values]
+        scores[category] = round(max(exps) / sum(exps) * 20, 2)
+    return scores
+
+async def score_categories_async(text: str) -> dict[str, float]:
+    """Оценки по категориям в выбранном режиме (SCORING_MODE)"""
+    if SCORING_MODE == "per_category":
+        tasks = [analyze_text_async(text, keywords) for _, keywords in STARTUP_CATEGORIES.items()]
+        results = await asyncio.gather(*tasks)
+        return {category: round(max(result["scores"]) * 20, 2) for category, result in zip(STARTUP_CATEGORIES.keys(), results)}
+
+    model = get_nlp_model()
+    if SCORING_MODE == "chunked":
+        return await asyncio.to_thread(chunked_category_scores, model, text)
+
+    logits = await asyncio.to_thread(entailment_logits, model, text, all_candidate_labels())
+    return fold_category_scores(logits)
+
+async def warm_up_model_async():
+    """Загрузка модели и один холостой прогон, чтобы первый запрос не платил за инициализацию"""
+    await asyncio.to_thread(get_nlp_model)
+    await score_categories_async("Warm-up pitch deck: product, market, team and funding.")
+
+def summarize_scores(scores: dict[str, float]) -> dict:
+    """Итоговый скоринг по оценкам категорий"""
+    total_score = sum(scores.values()) / 5 * 100
+    return {"startup_score": round(total_score, 2), "details": scores, "inference_backend": INFERENCE_BACKEND}
+
 async def analyze_startup_score_async(file_path: str, file_type: str) -> dict:
     """Асинхронный анализ питч-дека"""
     text = await extract_text(file_path, file_type)
     if not text:
         return {"error": "Unsupported or empty file"}
 
-    tasks = [analyze_text_async(text, keywords) for _, keywords in STARTUP_CATEGORIES.items()]
-    results = await asyncio.gather(*tasks)
-
-    scores = {category: round(max(result["scores"]) * 20, 2) for category, result in zip(STARTUP_CATEGORIES.keys(), results)}
-    total_score = sum(scores.values()) / 5 * 100
-
-    return {"startup_score": round(total_score, 2), "details": scores}
+    scores = await score_categories_async(text)
+    return summarize_scores(scores)
@@ -0,0 +1,90 @@
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from sourcing_service.analysis import scoring_version
+
+# 🔹 Лимиты кеша результатов анализа
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "1024"))
+ANALYSIS_CACHE_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+@dataclass
+class CachedAnalysis:
+    text: str
+    scores: dict[str, float]
+
+    @property
+    def size(self) -> int:
+        return len(self.text.encode("utf-8")) + 64 * len(self.scores)
+
+
+def analysis_cache_key(content_hash: str) -> str:
+    """Ключ кеша: хеш содержимого файла + версия модели/категорий"""
+    return f"{content_hash}:{scoring_version()}"
+
+
+class AnalysisCache:
+    """LRU-кеш извлечённого текста и оценок с ограничением по числу записей и объёму"""
+
+    def __init__(self, max_entries: int = ANALYSIS_CACHE_MAX_ENTRIES, max_bytes: int = ANALYSIS_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CachedAnalysis] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[CachedAnalysis]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, text: str, scores: dict[str, float]):
+        entry = CachedAnalysis(text=text, scores=dict(scores))
+        if entry.size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "scoring_version": scoring_version(),
+            }
+
+
+# ✅ Кеш процесса sourcing_service
+analysis_cache = AnalysisCache()
@@ -0,0 +1,100 @@
+import os
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# 🔹 Настройки пула процессов для извлечения текста
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 2)))
+EXTRACTION_START_METHOD = os.getenv("EXTRACTION_START_METHOD", "spawn")
+EXTRACTION_MAX_PAGES = int(os.getenv("EXTRACTION_MAX_PAGES", "200"))
+EXTRACTION_MAX_BYTES = int(os.getenv("EXTRACTION_MAX_BYTES", str(50 * 1024 * 1024)))
+EXTRACTION_PAGES_PER_TASK = int(os.getenv("EXTRACTION_PAGES_PER_TASK", "20"))
+
+
+class DocumentTooLarge(Exception):
+    """Документ превышает EXTRACTION_MAX_BYTES"""
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Ленивое создание общего пула процессов"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=EXTRACTION_WORKERS,
+            mp_context=multiprocessing.get_context(EXTRACTION_START_METHOD),
+        )
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+# 🔹 Функции ниже выполняются в дочерних процессах
+def _pdf_page_count(file_path: str) -> int:
+    import fitz  # PyMuPDF
+
+    with fitz.open(file_path) as doc:
+        return doc.page_count
+
+
+def _extract_pdf_pages(file_path: str, start: int, stop: int) -> str:
+    import fitz  # PyMuPDF
+
+    with fitz.open(file_path) as doc:
+        return "\n".join([doc[number].get_text() for number in range(start, stop)])
+
+
+def _extract_pptx(file_path: str, max_slides: int) -> str:
+    from pptx import Presentation
+
+    prs = Presentation(file_path)
+    return "\n".join([
+        (slide.notes_text_frame.text if slide.notes_text_frame else "") + " " +
+        " ".join([shape.text for shape in slide.shapes if hasattr(shape, "text")])
+        for slide in list(prs.slides)[:max_slides]
+    ])
+
+
+async def extract_text(file_path: str, file_type: str) -> str:
+    """
+    Извлечение текста из PDF и PPTX в пуле процессов, не блокируя event loop.
+    Большие PDF разбиваются на диапазоны страниц и обрабатываются параллельно.
+    """
+    if file_type not in ("pdf", "pptx"):
+        return ""
+
+    size = os.path.getsize(file_path)
+    if size > EXTRACTION_MAX_BYTES:
+        raise DocumentTooLarge(f"Файл {size} байт превышает лимит {EXTRACTION_MAX_BYTES} байт")
+
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+
+    if file_type == "pptx":
+        return await loop.run_in_executor(executor, _extract_pptx, file_path, EXTRACTION_MAX_PAGES)
+
+    page_count = await loop.run_in_executor(executor, _pdf_page_count, file_path)
+    if page_count > EXTRACTION_MAX_PAGES:
+        logger.warning(f"{file_path}: {page_count} страниц, анализируются первые {EXTRACTION_MAX_PAGES}")
+        page_count = EXTRACTION_MAX_PAGES
+
+    ranges = [
+        (start, min(start + EXTRACTION_PAGES_PER_TASK, page_count))
+        for start in range(0, page_count, EXTRACTION_PAGES_PER_TASK)
+    ]
+    parts = await asyncio.gather(*[
+        loop.run_in_executor(executor, _extract_pdf_pages, file_path, start, stop)
+        for start, stop in ranges
+    ])
+    return "\n".join(parts)
@@ -0,0 +1,112 @@
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 🔹 Бэкенд инференса zero-shot модели:
+#   transformers — эталонная fp32-модель через transformers.pipeline
+#   quantized    — динамическая int8-квантизация Linear-слоёв (torch.quantization)
+#   onnx         — экспорт в ONNX и запуск через ONNX Runtime (пакет optimum[onnxruntime])
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "transformers")
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join(os.getcwd(), "onnx_models"))
+
+# 🔹 Допустимое расхождение оценок категорий (шкала 0–20) с эталонной моделью
+CALIBRATION_TOLERANCE = float(os.getenv("CALIBRATION_TOLERANCE", "0.5"))
+CALIBRATION_SAMPLES = [
+    "We are building a unique marketplace with a strong competitive advantage over incumbents.",
+    "The total addressable market is 40 billion dollars and growing 20% a year.",
+    "We monetize through a subscription with tiered pricing for enterprise customers.",
+    "Our founders previously led engineering teams at two successful startups.",
+    "We are raising a 2 million seed round; financial projections show break-even in year three.",
+]
+
+BACKENDS = ("transformers", "quantized", "onnx")
+
+
+def _load_transformers(model_name: str):
+    from transformers import pipeline
+
+    return pipeline("zero-shot-classification", model=model_name)
+
+
+def _load_quantized(model_name: str):
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("zero-shot-classification", model=model, tokenizer=tokenizer)
+
+
+def _load_onnx(model_name: str):
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError:
+        raise RuntimeError("INFERENCE_BACKEND=onnx требует пакет optimum[onnxruntime]")
+    from transformers import AutoTokenizer, pipeline
+
+    export_dir = os.path.join(ONNX_MODEL_DIR, model_name.replace("/", "__"))
+    if os.path.isdir(export_dir):
+        model = ORTModelForSequenceClassification.from_pretrained(export_dir)
+        tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    else:
+        # ✅ Экспорт выполняется один раз, дальше модель грузится с диска
+        logger.info(f"Экспорт {model_name} в ONNX: {export_dir}")
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model.save_pretrained(export_dir)
+        tokenizer.save_pretrained(export_dir)
+
+    return pipeline("zero-shot-classification", model=model, tokenizer=tokenizer)
+
+
+def load_backend(name: str, model_name: str):
+    """Загрузка zero-shot pipeline выбранного бэкенда"""
+    loaders = {
+        "transformers": _load_transformers,
+        "quantized": _load_quantized,
+        "onnx": _load_onnx,
+    }
+    if name not in loaders:
+        raise ValueError(f"Неизвестный INFERENCE_BACKEND: {name}. Допустимые: {', '.join(BACKENDS)}")
+
+    logger.info(f"Загрузка модели {model_name} (бэкенд {name})")
+    return loaders[name](model_name)
+
+
+def calibrate(reference, candidate, samples: list[str] = None, tolerance: float = None) -> dict:
+    """
+    Сравнение оценок категорий кандидата с эталонной моделью на контрольных текстах.
+    Возвращает максимальное расхождение по каждой категории и флаг прохождения проверки.
+    """
+    from sourcing_service.analysis import all_candidate_labels, entailment_logits, fold_category_scores
+
+    samples = samples or CALIBRATION_SAMPLES
+    tolerance = CALIBRATION_TOLERANCE if tolerance is None else tolerance
+    labels = all_candidate_labels()
+
+    max_diff = {}
+    for text in samples:
+        expected = fold_category_scores(entailment_logits(reference, text, labels))
+        actual = fold_category_scores(entailment_logits(candidate, text, labels))
+        for category, value in expected.items():
+            max_diff[category] = max(max_diff.get(category, 0.0), round(abs(value - actual[category]), 2))
+
+    return {
+        "max_diff": max_diff,
+        "tolerance": tolerance,
+        "passed": all(diff <= tolerance for diff in max_diff.values()),
+    }
+
+
+if __name__ == "__main__":
+    # python -m sourcing_service.inference quantized — проверка бэкенда против эталона
+    import sys
+    import json
+    from sourcing_service.analysis import MODEL_NAME
+
+    backend = sys.argv[1] if len(sys.argv) > 1 else INFERENCE_BACKEND
+    report = calibrate(load_backend("transformers", MODEL_NAME), load_backend(backend, MODEL_NAME))
+    print(json.dumps({"backend": backend, **report}, ensure_ascii=False, indent=2))
+    sys.exit(0 if report["passed"] else 1)
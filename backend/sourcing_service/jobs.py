@@ -0,0 +1,258 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+from sourcing_service.analysis import extract_text, score_categories_async, summarize_scores
+from sourcing_service.cache import analysis_cache, analysis_cache_key
+from sourcing_service.database import AsyncSessionLocal
+from sourcing_service.models import AnalysisResult
+from sourcing_service.matching import matching_engine
+from shared.workers import worker_processes
+
+logger = logging.getLogger(__name__)
+
+# 🔹 Настройки пула фоновых воркеров анализа
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "2"))
+ANALYSIS_QUEUE_SIZE = int(os.getenv("ANALYSIS_QUEUE_SIZE", "100"))
+ANALYSIS_JOB_RETENTION_SECONDS = int(os.getenv("ANALYSIS_JOB_RETENTION_SECONDS", "3600"))
+
+# 🔹 Хранилище статусов задач: memory — только процесс, принявший загрузку, redis — статусы видны всем
+#    процессам (нужен пакет redis). Больше одного процесса (WEB_CONCURRENCY, uvicorn/gunicorn --workers)
+#    допускается только с redis: иначе запрос статуса попадёт в другой процесс и получит 404 — сервис
+#    в этом случае не стартует. Очередь и выполнение остаются в процессе загрузки.
+ANALYSIS_JOBS_BACKEND = os.getenv("ANALYSIS_JOBS_BACKEND", "memory")
+REDIS_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6380/0")
+REDIS_KEY_PREFIX = "analysis_job:"
+
+# 🔹 Статусы задачи (progress — грубая оценка в процентах)
+JOB_QUEUED = "queued"
+JOB_EXTRACTING = "extracting"
+JOB_SCORING = "scoring"
+JOB_SAVING = "saving"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+JOB_PROGRESS = {
+    JOB_QUEUED: 0,
+    JOB_EXTRACTING: 10,
+    JOB_SCORING: 40,
+    JOB_SAVING: 90,
+    JOB_DONE: 100,
+    JOB_FAILED: 100,
+}
+
+
+class AnalysisQueueFull(Exception):
+    """Очередь анализа переполнена"""
+
+
+@dataclass
+class AnalysisJob:
+    startup_id: uuid.UUID
+    founder_id: uuid.UUID
+    file_path: str
+    file_type: str
+    content_hash: Optional[str] = None
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    status: str = JOB_QUEUED
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    cache_hit: bool = False
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[float] = None
+
+    def set_status(self, status: str):
+        self.status = status
+        self.updated_at = datetime.utcnow()
+        if status in (JOB_DONE, JOB_FAILED):
+            self.finished_at = time.monotonic()
+
+    def to_state(self) -> dict:
+        """Состояние для общего хранилища: ответ статуса + владелец задачи"""
+        return {**self.to_dict(), "founder_id": str(self.founder_id)}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "AnalysisJob":
+        return cls(
+            startup_id=uuid.UUID(state["startup_id"]),
+            founder_id=uuid.UUID(state["founder_id"]),
+            file_path=state["file_path"],
+            file_type="",
+            id=state["job_id"],
+            status=state["status"],
+            result=state["analysis_result"],
+            error=state["error"],
+            cache_hit=state["cache_hit"],
+            created_at=datetime.fromisoformat(state["created_at"]),
+            updated_at=datetime.fromisoformat(state["updated_at"]),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "progress": JOB_PROGRESS[self.status],
+            "startup_id": str(self.startup_id),
+            "file_path": self.file_path,
+            "analysis_result": self.result,
+            "error": self.error,
+            "cache_hit": self.cache_hit,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+        }
+
+
+class AnalysisJobQueue:
+    """Ограниченная очередь анализа питч-деков с фиксированным пулом воркеров"""
+
+    def __init__(self, workers: int = ANALYSIS_WORKERS, maxsize: int = ANALYSIS_QUEUE_SIZE, backend: str = ANALYSIS_JOBS_BACKEND):
+        self.workers = workers
+        self.maxsize = maxsize
+        self.backend = backend
+        self.jobs: dict[str, AnalysisJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        self._redis = None
+        self._redis_missing = False
+
+        if backend == "redis":
+            try:
+                import redis.asyncio as redis
+            except ImportError:
+                # Ошибка в start(): redis запрошен явно, тихо откатываться на память нельзя
+                self._redis_missing = True
+            else:
+                self._redis = redis.from_url(REDIS_URL)
+        elif backend != "memory":
+            raise ValueError(f"Неизвестный ANALYSIS_JOBS_BACKEND: {backend}. Допустимые: memory, redis")
+
+    async def start(self):
+        if self._redis_missing:
+            raise RuntimeError("ANALYSIS_JOBS_BACKEND=redis, но пакет redis не установлен")
+        processes = worker_processes()
+        if self._redis is None and processes > 1:
+            raise RuntimeError(
+                f"Статусы задач анализа хранятся в процессе (ANALYSIS_JOBS_BACKEND=memory), а процессов {processes}: "
+                "запускайте sourcing_service в одном воркере или задайте ANALYSIS_JOBS_BACKEND=redis"
+            )
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Запущено воркеров анализа: {self.workers}")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, job: AnalysisJob) -> AnalysisJob:
+        if self._queue is None:
+            raise RuntimeError("Очередь анализа не запущена")
+
+        self._purge_finished()
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise AnalysisQueueFull()
+
+        self.jobs[job.id] = job
+        await self._save(job)
+        return job
+
+    async def get(self, job_id: str) -> Optional[AnalysisJob]:
+        """Задача этого процесса или, с redis, любого воркера сервиса"""
+        job = self.jobs.get(job_id)
+        if job is not None or self._redis is None:
+            return job
+        try:
+            raw = await self._redis.get(REDIS_KEY_PREFIX + job_id)
+        except Exception:
+            logger.exception("Ошибка чтения статуса задачи анализа из Redis")
+            return None
+        return AnalysisJob.from_state(json.loads(raw)) if raw else None
+
+    async def _set_status(self, job: AnalysisJob, status: str):
+        job.set_status(status)
+        await self._save(job)
+
+    async def _save(self, job: AnalysisJob):
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(REDIS_KEY_PREFIX + job.id, json.dumps(job.to_state()), ex=ANALYSIS_JOB_RETENTION_SECONDS)
+        except Exception:
+            # Статус в процессе уже обновлён — задача продолжается
+            logger.exception("Ошибка записи статуса задачи анализа в Redis")
+
+    def _purge_finished(self):
+        """Удаляем завершённые задачи старше ANALYSIS_JOB_RETENTION_SECONDS"""
+        deadline = time.monotonic() - ANALYSIS_JOB_RETENTION_SECONDS
+        expired = [job_id for job_id, job in self.jobs.items() if job.finished_at and job.finished_at < deadline]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            except Exception as e:
+                logger.exception(f"Ошибка анализа питч-дека (job {job.id})")
+                job.error = str(e)
+                await self._set_status(job, JOB_FAILED)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: AnalysisJob):
+        cache_key = analysis_cache_key(job.content_hash) if job.content_hash else None
+        cached = analysis_cache.get(cache_key) if cache_key else None
+
+        if cached is not None:
+            # ✅ Тот же файл уже анализировался — пропускаем извлечение и модель
+            job.cache_hit = True
+            scores = cached.scores
+        else:
+            await self._set_status(job, JOB_EXTRACTING)
+            text = await extract_text(job.file_path, job.file_type)
+            if not text:
+                job.error = "Unsupported or empty file"
+                await self._set_status(job, JOB_FAILED)
+                return
+
+            await self._set_status(job, JOB_SCORING)
+            scores = await score_categories_async(text)
+            if cache_key:
+                analysis_cache.put(cache_key, text, scores)
+
+        result = summarize_scores(scores)
+
+        await self._set_status(job, JOB_SAVING)
+        async with AsyncSessionLocal() as db:
+            db.add(AnalysisResult(
+                startup_id=job.startup_id,
+                founder_id=job.founder_id,
+                file_path=job.file_path,
+                startup_score=result["startup_score"],
+                usp_score=result["details"].get("USP"),
+                market_score=result["details"].get("Market"),
+                business_model_score=result["details"].get("Business Model"),
+                team_score=result["details"].get("Team"),
+                finance_score=result["details"].get("Finance"),
+                inference_backend=result["inference_backend"],
+                created_at=datetime.utcnow()
+            ))
+            await db.commit()
+        matching_engine.set_startup_score(job.startup_id, result["startup_score"])
+
+        job.result = result
+        await self._set_status(job, JOB_DONE)
+
+
+# ✅ Глобальная очередь сервиса (запускается в lifespan приложения)
+analysis_jobs = AnalysisJobQueue()
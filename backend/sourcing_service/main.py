@@ -1,11 +1,97 @@
+import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from sourcing_service.routes import startups, investors
+from sourcing_service.jobs import analysis_jobs
+from sourcing_service.matching import matching_engine, MATCHING_ENGINE_ENABLED
+from sourcing_service.extraction import shutdown_executor
+from sourcing_service.database import engine
+from sourcing_service.analysis import is_model_loaded, warm_up_model_async, MODEL_NAME, INFERENCE_BACKEND
+from shared.identity import check_identity_secret
 
-app = FastAPI(title="Sourcing Service")
+logger = logging.getLogger(__name__)
+
+# 🔹 Прогрев NLP-модели при старте воркера (MODEL_WARMUP=0 — отключить: модель загрузится при первом анализе)
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "1") not in ("0", "false", "False")
+# 🔹 Пауза между повторными попытками прогрева после ошибки (секунды)
+MODEL_WARMUP_RETRY_INTERVAL = float(os.getenv("MODEL_WARMUP_RETRY_INTERVAL", "30"))
+
+# 🔹 Состояние прогрева для /health/ready
+warmup_state = {"attempts": 0, "error": None}
+
+async def warm_up() -> bool:
+    warmup_state["attempts"] += 1
+    try:
+        await warm_up_model_async()
+    except Exception as e:
+        logger.exception(f"Не удалось прогреть NLP-модель (попытка {warmup_state['attempts']})")
+        warmup_state["error"] = f"{type(e).__name__}: {e}"
+        return False
+    warmup_state["error"] = None
+    logger.info(f"Модель {MODEL_NAME} ({INFERENCE_BACKEND}) загружена и прогрета")
+    return True
+
+async def retry_warm_up():
+    # ✅ Процесс остаётся неготовым (503 с текстом ошибки), пока прогрев не удастся
+    while True:
+        await asyncio.sleep(MODEL_WARMUP_RETRY_INTERVAL)
+        if await warm_up():
+            return
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    check_identity_secret("sourcing_service")
+    warmup_task = None
+    if MODEL_WARMUP:
+        # ✅ uvicorn не сообщает о готовности, пока lifespan не завершит старт
+        if not await warm_up():
+            warmup_task = asyncio.create_task(retry_warm_up())
+
+    # ✅ Пул фоновых воркеров анализа питч-деков
+    await analysis_jobs.start()
+    # ✅ Индекс матчинга строится из БД до приёма запросов
+    if MATCHING_ENGINE_ENABLED:
+        await matching_engine.start()
+    yield
+    if warmup_task is not None:
+        warmup_task.cancel()
+        await asyncio.gather(warmup_task, return_exceptions=True)
+    await matching_engine.stop()
+    await analysis_jobs.stop()
+    # ✅ Пул процессов извлечения текста создаётся лениво
+    shutdown_executor()
+    # ✅ Закрываем соединения пула БД
+    await engine.dispose()
+
+app = FastAPI(title="Sourcing Service", lifespan=lifespan)
 
 app.include_router(startups.router, prefix="/startups", tags=["Startups"])
 app.include_router(investors.router, prefix="/investors", tags=["Investors"])
 
+# ✅ Проверки живости и готовности
+@app.get("/health/live", tags=["Health"])
+async def liveness():
+    return {"status": "alive"}
+
+@app.get("/health/ready", tags=["Health"])
+async def readiness():
+    loaded = is_model_loaded()
+    # Без прогрева модель грузится первым анализом — ждать её загрузки для готовности нельзя
+    ready = loaded or not MODEL_WARMUP
+    body = {
+        "status": "ready" if ready else ("error" if warmup_state["error"] else "loading"),
+        "model": MODEL_NAME,
+        "backend": INFERENCE_BACKEND,
+        "model_loaded": loaded,
+        "warmup": MODEL_WARMUP,
+        "warmup_attempts": warmup_state["attempts"],
+        "warmup_error": warmup_state["error"],
+    }
+    return JSONResponse(status_code=200 if ready else 503, content=body)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("sourcing_service.main:app", host="0.0.0.0", port=8002, reload=True)
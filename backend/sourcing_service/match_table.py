@@ -0,0 +1,83 @@
+import sys
+import time
+import asyncio
+import logging
+from sqlalchemy import and_, delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sourcing_service.database import AsyncSessionLocal
+from sourcing_service.models import InvestorStartupMatch, Startup, User
+
+logger = logging.getLogger(__name__)
+
+MATCH_COLUMNS = ["investor_id", "startup_id", "startup_created_at"]
+
+# 🔹 Ключ advisory-блокировки пересчёта. Блокировка общая, а не на инвестора/фаундера: пересчёт
+#    инвестора читает стартапы, пересчёт фаундера — инвесторов, и при READ COMMITTED параллельные
+#    пересчёты не видят незакоммиченный профиль друг друга и теряют пару. Взятая после UPDATE
+#    профиля, она упорядочивает пересчёты: следующий видит закоммиченные данные предыдущего.
+MATCH_TABLE_LOCK_KEY = 0x5F3C_19A7
+
+
+async def _lock(db: AsyncSession):
+    # Снимается при commit/rollback транзакции
+    await db.execute(select(func.pg_advisory_xact_lock(MATCH_TABLE_LOCK_KEY)))
+
+
+def _insert_pairs(pairs):
+    # ON CONFLICT — страховка от дубля пары, если строку успел вставить другой пересчёт
+    return pg_insert(InvestorStartupMatch).from_select(MATCH_COLUMNS, pairs).on_conflict_do_nothing()
+
+
+def _pairs_query():
+    """Пары (инвестор, стартап) по тем же условиям, что и /matches/me: пересечение массивов и чек"""
+    return (
+        select(User.id, Startup.id, Startup.created_at)
+        .select_from(Startup)
+        .join(User, and_(
+            User.role == "investor",
+            User.industry.op("&&")(Startup.industry),
+            User.investment_stage.op("&&")(Startup.stage),
+            User.region.op("&&")(Startup.region),
+            User.min_check >= Startup.min_check,
+        ))
+    )
+
+
+async def recompute_for_investor(db: AsyncSession, investor_id) -> int:
+    """Пересчёт совпадений одного инвестора (коммитит вызывающий)"""
+    await _lock(db)
+    await db.execute(delete(InvestorStartupMatch).where(InvestorStartupMatch.investor_id == investor_id))
+    result = await db.execute(_insert_pairs(_pairs_query().where(User.id == investor_id)))
+    return result.rowcount
+
+
+async def recompute_for_founder(db: AsyncSession, founder_id) -> int:
+    """Пересчёт совпадений стартапов фаундера (коммитит вызывающий)"""
+    await _lock(db)
+    founder_startups = select(Startup.id).where(Startup.founder_id == founder_id)
+    await db.execute(delete(InvestorStartupMatch).where(InvestorStartupMatch.startup_id.in_(founder_startups)))
+    result = await db.execute(_insert_pairs(_pairs_query().where(Startup.founder_id == founder_id)))
+    return result.rowcount
+
+
+async def backfill(session_factory=AsyncSessionLocal) -> int:
+    """Полное построение таблицы с нуля в одной транзакции (читатели видят старые данные до коммита)"""
+    started = time.perf_counter()
+    async with session_factory() as db:
+        await _lock(db)
+        await db.execute(delete(InvestorStartupMatch))
+        result = await db.execute(_insert_pairs(_pairs_query()))
+        await db.commit()
+
+    logger.info(f"investor_startup_matches: {result.rowcount} пар за {time.perf_counter() - started:.2f} с")
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    # python -m sourcing_service.match_table backfill
+    logging.basicConfig(level=logging.INFO)
+    if sys.argv[1:] != ["backfill"]:
+        print("Использование: python -m sourcing_service.match_table backfill")
+        sys.exit(2)
+    print(f"Записано пар: {asyncio.run(backfill())}")
@@ -0,0 +1,498 @@
+import os
+import time
+import uuid
+import asyncio
+import bisect
+import heapq
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+from sqlalchemy.future import select
+from sourcing_service.database import AsyncSessionLocal
+from sourcing_service.models import Startup, User, AnalysisResult
+from shared.workers import worker_processes
+
+logger = logging.getLogger(__name__)
+
+# 🔹 Источник совпадений для /matches/me и /investors/matches/me:
+#   engine — in-memory индекс в каждом процессе sourcing_service (до его построения — SQL)
+#   table  — предрассчитанная таблица investor_startup_matches (см. match_table.py)
+#   sql    — запрос пересечения массивов на каждый вызов
+MATCH_SOURCE = os.getenv("MATCH_SOURCE", "engine")
+MATCHING_ENGINE_ENABLED = MATCH_SOURCE == "engine"
+
+# 🔹 Период полной перестройки из БД (секунды, 0 — только при старте). Инкрементальные обновления
+#    видит лишь процесс, принявший запрос на запись; остальные воркеры и изменения через auth_service
+#    подхватываются перестройкой — поэтому по умолчанию она периодическая.
+MATCHING_REBUILD_INTERVAL = float(os.getenv("MATCHING_REBUILD_INTERVAL", "60"))
+
+# 🔹 Ранжированный режим: верхняя граница K в запросе
+MATCH_TOP_K_MAX = int(os.getenv("MATCH_TOP_K_MAX", "500"))
+
+# 🔹 Максимум startup_score: сумма пяти категорий по 0–20, /5*100 (см. summarize_scores)
+STARTUP_SCORE_MAX = 2000.0
+
+
+@dataclass
+class MatchWeights:
+    """Веса компонент релевантности (каждая компонента нормирована в 0..1)"""
+    overlap: float = 1.0
+    check_fit: float = 1.0
+    startup_score: float = 1.0
+
+
+@dataclass
+class StartupRecord:
+    id: uuid.UUID
+    founder_id: uuid.UUID
+    name: str
+    industry: list[str]
+    stage: list[str]
+    region: list[str]
+    min_check: Optional[float]
+    created_at: Optional[datetime] = None
+    startup_score: Optional[float] = None
+
+
+@dataclass
+class InvestorRecord:
+    id: uuid.UUID
+    investor_type: Optional[list[str]]
+    industry: Optional[list[str]]
+    investment_stage: Optional[list[str]]
+    region: Optional[list[str]]
+    min_check: Optional[float]
+    created_at: Optional[datetime] = None
+
+
+class InvertedIndex:
+    """
+    Записи одного типа в слотах 0..n; для каждого атрибута — значение → битсет слотов
+    (Python int), плюс отсортированный массив (min_check, slot) для фильтра по чеку.
+    """
+
+    def __init__(self, attributes: tuple[str, ...]):
+        self.attributes = attributes
+        self.postings: dict[str, dict[str, int]] = {attribute: {} for attribute in attributes}
+        self.checks: list[tuple[float, int]] = []
+        self.slots: dict[uuid.UUID, int] = {}
+        self.records: list = []
+        self._free: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def get(self, record_id) -> Optional[object]:
+        slot = self.slots.get(record_id)
+        return self.records[slot] if slot is not None else None
+
+    def load(self, records: list):
+        """
+        Построение с нуля за один проход: постинг каждого значения собирается в bytearray
+        и переводится в int один раз (add по записи копирует весь битсет — O(n²) на n записей).
+        """
+        self.records = list(records)
+        self.slots = {record.id: slot for slot, record in enumerate(self.records)}
+        self._free = []
+        size = (len(self.records) + 7) // 8
+        for attribute in self.attributes:
+            buffers: dict[str, bytearray] = {}
+            for slot, record in enumerate(self.records):
+                for value in set(getattr(record, attribute) or ()):
+                    buffer = buffers.get(value)
+                    if buffer is None:
+                        buffer = buffers[value] = bytearray(size)
+                    buffer[slot >> 3] |= 1 << (slot & 7)
+            self.postings[attribute] = {value: int.from_bytes(buffer, "little") for value, buffer in buffers.items()}
+        self.checks = sorted(
+            (record.min_check, slot) for slot, record in enumerate(self.records) if record.min_check is not None
+        )
+
+    def add(self, record):
+        self.remove(record.id)
+
+        slot = self._free.pop() if self._free else len(self.records)
+        if slot == len(self.records):
+            self.records.append(record)
+        else:
+            self.records[slot] = record
+        self.slots[record.id] = slot
+
+        bit = 1 << slot
+        for attribute in self.attributes:
+            postings = self.postings[attribute]
+            for value in set(getattr(record, attribute) or ()):
+                postings[value] = postings.get(value, 0) | bit
+        if record.min_check is not None:
+            bisect.insort(self.checks, (record.min_check, slot))
+
+    def remove(self, record_id):
+        slot = self.slots.pop(record_id, None)
+        if slot is None:
+            return
+        record = self.records[slot]
+
+        mask = ~(1 << slot)
+        for attribute in self.attributes:
+            postings = self.postings[attribute]
+            for value in set(getattr(record, attribute) or ()):
+                bits = postings.get(value, 0) & mask
+                if bits:
+                    postings[value] = bits
+                else:
+                    postings.pop(value, None)
+        if record.min_check is not None:
+            index = bisect.bisect_left(self.checks, (record.min_check, slot))
+            if index < len(self.checks) and self.checks[index] == (record.min_check, slot):
+                del self.checks[index]
+
+        self.records[slot] = None
+        self._free.append(slot)
+
+    def overlap(self, criteria: dict[str, Iterable[str]]) -> int:
+        """Битсет записей, пересекающихся с criteria по каждому атрибуту (аналог `&&` для всех)"""
+        result = -1
+        for attribute, values in criteria.items():
+            postings = self.postings[attribute]
+            bits = 0
+            for value in values or ():
+                bits |= postings.get(value, 0)
+            result &= bits
+            if not result:
+                return 0
+        return result if result > 0 else 0
+
+    def filter_check(self, mask: int, threshold: float, at_most: bool) -> int:
+        """
+        Оставляет в mask записи с min_check <= threshold (at_most) или >= threshold.
+        Если подходящий по чеку диапазон меньше кандидатов — строим его битсет из
+        отсортированного массива, иначе проверяем кандидатов по одному.
+        """
+        if at_most:
+            start, end = 0, bisect.bisect_right(self.checks, (threshold, float("inf")))
+        else:
+            start, end = bisect.bisect_left(self.checks, (threshold, -1)), len(self.checks)
+
+        if end - start < mask.bit_count():
+            return mask & mask_from_slots((slot for _, slot in self.checks[start:end]), len(self.records))
+
+        def fits(slot) -> bool:
+            min_check = self.records[slot].min_check
+            return min_check is not None and (min_check <= threshold if at_most else min_check >= threshold)
+
+        return mask_from_slots(filter(fits, iter_slots(mask)), len(self.records))
+
+    def iter_records(self, mask: int) -> Iterator:
+        for slot in iter_slots(mask):
+            yield self.records[slot]
+
+
+def overlap_ratio(values, wanted) -> float:
+    """Доля запрошенных значений атрибута, покрытых кандидатом"""
+    wanted = set(wanted or ())
+    return len(wanted & set(values or ())) / len(wanted) if wanted else 0.0
+
+
+def check_fit(startup_min_check: Optional[float], investor_check: Optional[float]) -> float:
+    """Насколько минимальный чек стартапа близок к чеку инвестора (1.0 — совпадает)"""
+    if not investor_check or investor_check <= 0 or startup_min_check is None:
+        return 0.0
+    return max(0.0, min(startup_min_check / investor_check, 1.0))
+
+
+def startup_relevance(startup, investor, weights: MatchWeights, startup_score: Optional[float] = None) -> float:
+    overlap = (
+        overlap_ratio(startup.industry, investor.industry)
+        + overlap_ratio(startup.stage, investor.investment_stage)
+        + overlap_ratio(startup.region, investor.region)
+    ) / 3
+    score = min(max((startup_score or 0.0) / STARTUP_SCORE_MAX, 0.0), 1.0)
+    return (
+        weights.overlap * overlap
+        + weights.check_fit * check_fit(startup.min_check, investor.min_check)
+        + weights.startup_score * score
+    )
+
+
+def investor_relevance(investor, startup, weights: MatchWeights) -> float:
+    overlap = (
+        overlap_ratio(investor.industry, startup.industry)
+        + overlap_ratio(investor.investment_stage, startup.stage)
+        + overlap_ratio(investor.region, startup.region)
+    ) / 3
+    return weights.overlap * overlap + weights.check_fit * check_fit(startup.min_check, investor.min_check)
+
+
+def top_startups(investor, startups: Iterable, k: int, weights: MatchWeights,
+                 scores: Optional[dict] = None) -> list[tuple[float, object]]:
+    """K самых релевантных стартапов (heapq.nlargest — O(n log k) без полной сортировки)"""
+    def relevance(startup):
+        startup_score = scores.get(startup.id) if scores is not None else getattr(startup, "startup_score", None)
+        return startup_relevance(startup, investor, weights, startup_score)
+
+    return heapq.nlargest(k, ((relevance(startup), startup) for startup in startups), key=lambda item: item[0])
+
+
+def top_investors(startup, investors: Iterable, k: int, weights: MatchWeights) -> list[tuple[float, object]]:
+    """K самых релевантных инвесторов"""
+    return heapq.nlargest(
+        k, ((investor_relevance(investor, startup, weights), investor) for investor in investors), key=lambda item: item[0]
+    )
+
+
+# 🔹 Номера установленных битов для каждого значения байта
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+
+def iter_slots(mask: int) -> Iterator[int]:
+    """Слоты установленных битов по возрастанию: один проход по байтам числа, O(n)"""
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    for offset, byte in enumerate(data):
+        if byte:
+            base = offset << 3
+            for bit in _BYTE_BITS[byte]:
+                yield base + bit
+
+
+def mask_from_slots(slots: Iterable[int], size: int) -> int:
+    """Битсет из слотов за один проход через bytearray, без копии int на каждый бит"""
+    buffer = bytearray((size + 7) // 8)
+    for slot in slots:
+        buffer[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(buffer, "little")
+
+
+class MatchingEngine:
+    """Индекс стартапов и инвесторов процесса: матчинг пересечением битсетов вместо SQL `&&`"""
+
+    def __init__(self):
+        self.startups = InvertedIndex(("industry", "stage", "region"))
+        self.investors = InvertedIndex(("industry", "investment_stage", "region"))
+        self.founders: dict[uuid.UUID, set[uuid.UUID]] = {}
+        self.ready = False
+        self.rebuilt_at: Optional[datetime] = None
+        self.rebuild_seconds: Optional[float] = None
+        self.queries = 0
+        self._pending: Optional[list[tuple]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ---------- инкрементальные обновления ----------
+
+    def upsert_startup(self, record: StartupRecord):
+        self._defer("upsert_startup", record)
+        previous = self.startups.get(record.id)
+        if previous is not None:
+            self.founders.get(previous.founder_id, set()).discard(record.id)
+            if record.startup_score is None:
+                record.startup_score = previous.startup_score
+        self.startups.add(record)
+        self.founders.setdefault(record.founder_id, set()).add(record.id)
+
+    def remove_startup(self, startup_id: uuid.UUID):
+        self._defer("remove_startup", startup_id)
+        record = self.startups.get(startup_id)
+        if record is not None:
+            self.founders.get(record.founder_id, set()).discard(startup_id)
+        self.startups.remove(startup_id)
+
+    def set_startup_score(self, startup_id: uuid.UUID, startup_score: float):
+        self._defer("set_startup_score", startup_id, startup_score)
+        record = self.startups.get(startup_id)
+        if record is not None:
+            record.startup_score = startup_score
+
+    def upsert_investor(self, record: InvestorRecord):
+        self._defer("upsert_investor", record)
+        self.investors.add(record)
+
+    def remove_investor(self, investor_id: uuid.UUID):
+        self._defer("remove_investor", investor_id)
+        self.investors.remove(investor_id)
+
+    def load(self, startups: list[StartupRecord], investors: list[InvestorRecord]):
+        """Заполнение пустого индекса пачкой записей (перестройка из БД)"""
+        self.startups.load(startups)
+        self.investors.load(investors)
+        self.founders = {}
+        for record in startups:
+            self.founders.setdefault(record.founder_id, set()).add(record.id)
+
+    def _defer(self, operation: str, *args):
+        # Во время перестройки изменения повторяются на новом индексе после переключения
+        if self._pending is not None:
+            self._pending.append((operation, args))
+
+    async def refresh_founder(self, db, founder_id: uuid.UUID):
+        """Перечитать стартапы фаундера после записи профиля"""
+        if not MATCHING_ENGINE_ENABLED:
+            return
+        result = await db.execute(_startup_query().where(Startup.founder_id == founder_id))
+        rows = result.all()
+        current_ids = {row.id for row in rows}
+        for startup_id in list(self.founders.get(founder_id, ())):
+            if startup_id not in current_ids:
+                self.remove_startup(startup_id)
+        for row in rows:
+            self.upsert_startup(_startup_record(row))
+
+    async def refresh_investor(self, db, investor_id: uuid.UUID):
+        """Перечитать профиль инвестора после записи"""
+        if not MATCHING_ENGINE_ENABLED:
+            return
+        result = await db.execute(_investor_query().where(User.id == investor_id))
+        row = result.first()
+        if row is None:
+            self.remove_investor(investor_id)
+        else:
+            self.upsert_investor(_investor_record(row))
+
+    # ---------- запросы ----------
+
+    def investor(self, investor_id: uuid.UUID) -> Optional[InvestorRecord]:
+        return self.investors.get(investor_id)
+
+    def startup_for_founder(self, founder_id: uuid.UUID) -> Optional[StartupRecord]:
+        startup_ids = self.founders.get(founder_id)
+        if not startup_ids:
+            return None
+        return self.startups.get(next(iter(startup_ids)))
+
+    def match_startups(self, investor: InvestorRecord) -> list[StartupRecord]:
+        """Стартапы, пересекающиеся с инвестором по отрасли, стадии и региону, с min_check <= чека инвестора"""
+        self.queries += 1
+        if investor.min_check is None:
+            return []
+        mask = self.startups.overlap({
+            "industry": investor.industry,
+            "stage": investor.investment_stage,
+            "region": investor.region,
+        })
+        mask = self.startups.filter_check(mask, investor.min_check, at_most=True) if mask else 0
+        return list(self.startups.iter_records(mask))
+
+    def match_investors(self, startup: StartupRecord) -> list[InvestorRecord]:
+        """Инвесторы, пересекающиеся со стартапом по отрасли, стадии и региону, с чеком >= min_check"""
+        self.queries += 1
+        if startup.min_check is None:
+            return []
+        mask = self.investors.overlap({
+            "industry": startup.industry,
+            "investment_stage": startup.stage,
+            "region": startup.region,
+        })
+        mask = self.investors.filter_check(mask, startup.min_check, at_most=False) if mask else 0
+        return list(self.investors.iter_records(mask))
+
+    # ---------- перестройка из БД ----------
+
+    async def rebuild(self, session_factory=AsyncSessionLocal):
+        """Полная перестройка индекса из БД; запросы до переключения обслуживает старый индекс"""
+        started = time.perf_counter()
+        self._pending = []
+        try:
+            async with session_factory() as db:
+                startup_rows = (await db.execute(_startup_query())).all()
+                investor_rows = (await db.execute(_investor_query())).all()
+            # ✅ Построение индекса — секунды CPU на больших таблицах: в потоке, event loop не блокируется
+            fresh = await asyncio.to_thread(_build_engine, startup_rows, investor_rows)
+
+            pending, self._pending = self._pending, None
+            self.startups, self.investors, self.founders = fresh.startups, fresh.investors, fresh.founders
+            for operation, args in pending:
+                getattr(self, operation)(*args)
+        finally:
+            self._pending = None
+
+        self.ready = True
+        self.rebuilt_at = datetime.utcnow()
+        self.rebuild_seconds = round(time.perf_counter() - started, 3)
+        logger.info(
+            f"Индекс матчинга перестроен: {len(self.startups)} стартапов, "
+            f"{len(self.investors)} инвесторов за {self.rebuild_seconds} с"
+        )
+
+    async def start(self, interval: float = MATCHING_REBUILD_INTERVAL):
+        try:
+            await self.rebuild()
+        except Exception:
+            # Без индекса эндпоинты матчинга работают через SQL
+            logger.exception("Не удалось построить индекс матчинга")
+        if interval > 0:
+            self._task = asyncio.create_task(self._rebuild_loop(interval))
+        elif worker_processes() > 1:
+            logger.warning(
+                "MATCHING_REBUILD_INTERVAL=0 при нескольких воркерах: остальные процессы не увидят изменений "
+                "профилей до перезапуска — задайте интервал или MATCH_SOURCE=table"
+            )
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _rebuild_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception("Ошибка перестройки индекса матчинга")
+
+    def stats(self) -> dict:
+        return {
+            "match_source": MATCH_SOURCE,
+            "enabled": MATCHING_ENGINE_ENABLED,
+            "ready": self.ready,
+            "startups": len(self.startups),
+            "investors": len(self.investors),
+            "startup_values": {attribute: len(values) for attribute, values in self.startups.postings.items()},
+            "investor_values": {attribute: len(values) for attribute, values in self.investors.postings.items()},
+            "queries": self.queries,
+            "rebuild_interval": MATCHING_REBUILD_INTERVAL,
+            "rebuilt_at": self.rebuilt_at.isoformat() if self.rebuilt_at else None,
+            "rebuild_seconds": self.rebuild_seconds,
+        }
+
+
+def _startup_query():
+    # Последний startup_score каждого стартапа
+    latest_score = (
+        select(AnalysisResult.startup_id, AnalysisResult.startup_score)
+        .distinct(AnalysisResult.startup_id)
+        .order_by(AnalysisResult.startup_id, AnalysisResult.created_at.desc().nulls_last())
+        .subquery()
+    )
+    return (
+        select(
+            Startup.id, Startup.founder_id, Startup.name, Startup.industry, Startup.stage,
+            Startup.region, Startup.min_check, Startup.created_at, latest_score.c.startup_score,
+        )
+        .outerjoin(latest_score, latest_score.c.startup_id == Startup.id)
+    )
+
+
+def _investor_query():
+    return select(
+        User.id, User.investor_type, User.industry, User.investment_stage,
+        User.region, User.min_check, User.created_at,
+    ).where(User.role == "investor")
+
+
+def _startup_record(row) -> StartupRecord:
+    return StartupRecord(**row._asdict())
+
+
+def _investor_record(row) -> InvestorRecord:
+    return InvestorRecord(**row._asdict())
+
+
+def _build_engine(startup_rows, investor_rows) -> MatchingEngine:
+    engine = MatchingEngine()
+    engine.load([_startup_record(row) for row in startup_rows], [_investor_record(row) for row in investor_rows])
+    return engine
+
+
+# ✅ Индекс процесса (строится в lifespan sourcing_service)
+matching_engine = MatchingEngine()
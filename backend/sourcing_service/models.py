@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, TIMESTAMP, ForeignKey, text, Float, ARRAY, DateTime, func, Integer
+from sqlalchemy import Column, String, TIMESTAMP, ForeignKey, text, Float, ARRAY, DateTime, func, Integer, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -10,7 +10,16 @@ from auth_service.models import RefreshToken
 # ✅ Модель стартапов
 class Startup(Base):
     __tablename__ = "startups"
-    __table_args__ = {"extend_existing": True}  
+    __table_args__ = (
+        # ✅ GIN-индексы для фильтров пересечения массивов (`&&`) и btree для чека
+        Index("ix_startups_industry_gin", "industry", postgresql_using="gin"),
+        Index("ix_startups_stage_gin", "stage", postgresql_using="gin"),
+        Index("ix_startups_region_gin", "region", postgresql_using="gin"),
+        Index("ix_startups_min_check", "min_check"),
+        # ✅ Keyset-пагинация списков по (created_at, id)
+        Index("ix_startups_created_at_id", "created_at", "id"),
+        {"extend_existing": True},
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     founder_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -19,7 +28,7 @@ class Startup(Base):
     region = Column(ARRAY(String), nullable=False)
     min_check = Column(Float, nullable=False)
     pitch_deck = Column(String, nullable=True)  
-    created_at = Column(TIMESTAMP, server_default=text("now()"))
+    created_at = Column(TIMESTAMP, server_default=text("now()"), nullable=False)
     updated_at = Column(TIMESTAMP, server_default=text("now()"), onupdate=text("now()"))
     name = Column(String, nullable=False)
     description = Column(String, nullable=False)
@@ -29,7 +38,14 @@ class Startup(Base):
 # ✅ Модель `User`
 class User(Base):
     __tablename__ = "users"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("ix_users_industry_gin", "industry", postgresql_using="gin"),
+        Index("ix_users_investment_stage_gin", "investment_stage", postgresql_using="gin"),
+        Index("ix_users_region_gin", "region", postgresql_using="gin"),
+        # ✅ Частичный индекс: подбор идёт только среди инвесторов
+        Index("ix_users_investor_min_check", "min_check", postgresql_where=text("role = 'investor'")),
+        {"extend_existing": True},
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)  # 🔹 Исправлено: теперь UUID
     email = Column(String, unique=True, nullable=False)
@@ -67,10 +83,39 @@ class AnalysisResult(Base):
     team_score = Column(Float, nullable=True)       # Команда
     finance_score = Column(Float, nullable=True)    # Финансы
 
+    # ✅ Бэкенд инференса, посчитавший оценки (transformers / quantized / onnx)
+    inference_backend = Column(String, nullable=True)
+
     created_at = Column(DateTime, server_default=func.now())
 
+# ✅ Последний анализ стартапа: LATERAL ... ORDER BY created_at DESC LIMIT 1 читает одну запись индекса
+Index(
+    "ix_analysis_results_startup_id_created_at",
+    AnalysisResult.startup_id,
+    AnalysisResult.created_at.desc().nulls_last(),
+)
+
+# ✅ Предрассчитанные пары инвестор ↔ стартап (обновляются при записи профилей)
+class InvestorStartupMatch(Base):
+    __tablename__ = "investor_startup_matches"
+    __table_args__ = (
+        # 🔹 Чтение совпадений инвестора постранично по (created_at, id) стартапа
+        Index("ix_investor_startup_matches_investor_keyset", "investor_id", "startup_created_at", "startup_id"),
+        # 🔹 Пересчёт и чтение со стороны стартапа
+        Index("ix_investor_startup_matches_startup_id", "startup_id"),
+    )
+
+    investor_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    startup_id = Column(UUID(as_uuid=True), ForeignKey("startups.id", ondelete="CASCADE"), primary_key=True)
+    startup_created_at = Column(TIMESTAMP, nullable=False)
+    computed_at = Column(TIMESTAMP, server_default=text("now()"))
+
 class StartupScore(Base):
     __tablename__ = "startup_scores"
+    __table_args__ = (
+        # ✅ Один ответ на вопрос анкеты: цель для INSERT ... ON CONFLICT в fill_template
+        UniqueConstraint("startup_id", "category_id", "question_id", name="uq_startup_scores_startup_question"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     startup_id = Column(UUID(as_uuid=True), ForeignKey("startups.id", ondelete="CASCADE"), nullable=False)  
@@ -0,0 +1,48 @@
+import os
+import json
+import base64
+import heapq
+import uuid
+from datetime import datetime
+from typing import Iterable, Optional
+from fastapi import HTTPException
+
+# 🔹 Размер страницы списков стартапов
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "200"))
+
+
+def encode_cursor(created_at: Optional[datetime], record_id) -> str:
+    """Непрозрачный токен продолжения: позиция последней выданной записи (created_at, id)"""
+    payload = {"c": created_at.isoformat() if created_at else None, "i": str(record_id)}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Optional[datetime], uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(payload["c"]) if payload["c"] else None
+        return created_at, uuid.UUID(payload["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Некорректный cursor")
+
+
+def _sort_key(record) -> tuple:
+    # created_at в БД NOT NULL; на всякий случай None ставим как Postgres в DESC (NULLS FIRST) — самой новой
+    return (record.created_at or datetime.max, str(record.id))
+
+
+def page_records(records: Iterable, cursor: Optional[str], limit: int) -> tuple[list, Optional[str]]:
+    """
+    Keyset-страница записей в памяти в порядке (created_at, id) по убыванию — тот же
+    порядок и формат cursor, что и у SQL-запросов. Частичная сортировка: O(n log limit).
+    """
+    if cursor:
+        created_at, record_id = decode_cursor(cursor)
+        boundary = (created_at or datetime.max, str(record_id))
+        records = (record for record in records if _sort_key(record) < boundary)
+
+    page = heapq.nlargest(limit + 1, records, key=_sort_key)
+    next_cursor = encode_cursor(page[limit - 1].created_at, page[limit - 1].id) if len(page) > limit else None
+    return page[:limit], next_cursor
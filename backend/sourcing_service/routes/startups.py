@@ -1,25 +1,35 @@
 #import sys
-#import os
+import os
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Header, Query
 from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import update
-from sqlalchemy.sql import cast, exists, func
+from sqlalchemy import bindparam, true, update
+from sqlalchemy.sql import cast, exists, func, tuple_
 #from sqlalchemy.orm import joinedload
-from sqlalchemy.dialects.postgresql import ARRAY, VARCHAR, TEXT
-from sourcing_service.database import get_db
-from sourcing_service.models import Startup, User, AnalysisResult, StartupScore
+from sqlalchemy.dialects.postgresql import ARRAY, VARCHAR, UUID as PG_UUID, insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sourcing_service.database import get_db, AsyncSessionLocal, engine
+from shared.db import engine_stats
+from sourcing_service.models import Startup, User, AnalysisResult, StartupScore, InvestorStartupMatch
 from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional, Dict, Union
-from auth_service.routes.auth import get_current_user
+from auth_service.routes.auth import get_current_user, require_admin
+from auth_service.user_cache import user_cache
 #import shutil
 import logging
+import json
 import uuid
 import httpx
 import traceback
-from datetime import datetime
-from sourcing_service.analysis import save_uploaded_file, analyze_startup_score_async
+from sourcing_service.analysis import save_uploaded_file
+from sourcing_service.jobs import analysis_jobs, AnalysisJob, AnalysisQueueFull
+from sourcing_service.extraction import EXTRACTION_MAX_BYTES
+from sourcing_service.cache import analysis_cache
+from sourcing_service.match_table import recompute_for_investor, recompute_for_founder
+from sourcing_service.pagination import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, decode_cursor, encode_cursor, page_records
+from sourcing_service.matching import matching_engine, MATCH_SOURCE, MatchWeights, MATCH_TOP_K_MAX, top_startups, top_investors
 #import requests
 #import json
 from config import UPLOAD_DIR
@@ -29,7 +39,7 @@ from uuid import UUID
 from sourcing_service.schemas.startups import (
     StartupResponse, InvestorProfileUpdate, FounderProfileUpdate,
     StartupFilterRequest, Answer, StartupScoreDetails, FillTemplateRequest,
-    StartupScoreBatchResponse,)
+    StartupScoreBatchResponse, StartupScoreBatchRequest, DueDiligenceBatchRequest,)
 from shared.schemas import CurrentUser
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -38,9 +48,83 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 AUTH_SERVICE_VERIFY_URL = "http://127.0.0.1:8001/auth/verify-token"
 DUE_DILIGENCE_SERVICE_URL = "http://127.0.0.1:8005/kpi/analyze"
+DUE_DILIGENCE_TIMEOUT = float(os.getenv("DUE_DILIGENCE_TIMEOUT", "30"))
+DUE_DILIGENCE_BATCH_MAX = int(os.getenv("DUE_DILIGENCE_BATCH_MAX", "1000"))
+
+# 🔹 POST /batch/pitch-scores: ids выбираются кусками по PITCH_SCORES_CHUNK_SIZE
+PITCH_SCORES_CHUNK_SIZE = int(os.getenv("PITCH_SCORES_CHUNK_SIZE", "500"))
+PITCH_SCORES_MAX_IDS = int(os.getenv("PITCH_SCORES_MAX_IDS", "10000"))
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# 🔹 Колонки списков стартапов: без description и pitch_deck
+STARTUP_LIST_COLUMNS = (
+    Startup.id, Startup.name, Startup.industry, Startup.stage,
+    Startup.region, Startup.min_check, Startup.created_at,
+)
+
+# 🔹 Запросы пересечения массивов. Колонки — varchar[], поэтому и параметры приводим к
+#    ARRAY(VARCHAR): при text[] Postgres не может использовать GIN-индексы по этим колонкам.
+def filter_startups_query(filter_criteria: StartupFilterRequest):
+    query = select(*STARTUP_LIST_COLUMNS)
+    if filter_criteria.industry:
+        query = query.where(Startup.industry.op("&&")(cast(filter_criteria.industry, ARRAY(VARCHAR))))
+    if filter_criteria.stage:
+        query = query.where(Startup.stage.op("&&")(cast(filter_criteria.stage, ARRAY(VARCHAR))))
+    if filter_criteria.region:
+        query = query.where(Startup.region.op("&&")(cast(filter_criteria.region, ARRAY(VARCHAR))))
+    if filter_criteria.min_check:
+        query = query.where(Startup.min_check <= filter_criteria.min_check)
+    return query
+
+def matching_startups_query(investor):
+    return select(*STARTUP_LIST_COLUMNS).where(
+        Startup.industry.op("&&")(cast(investor.industry, ARRAY(VARCHAR))),
+        Startup.stage.op("&&")(cast(investor.investment_stage, ARRAY(VARCHAR))),
+        Startup.region.op("&&")(cast(investor.region, ARRAY(VARCHAR))),
+        Startup.min_check <= investor.min_check
+    )
+
+def matched_startups_query(investor_id):
+    """Совпадения инвестора из investor_startup_matches (MATCH_SOURCE=table)"""
+    return (
+        select(*STARTUP_LIST_COLUMNS)
+        .join(InvestorStartupMatch, InvestorStartupMatch.startup_id == Startup.id)
+        .where(InvestorStartupMatch.investor_id == investor_id)
+    )
+
+def matched_investors_query(startup_id):
+    return (
+        select(User)
+        .join(InvestorStartupMatch, InvestorStartupMatch.investor_id == User.id)
+        .where(InvestorStartupMatch.startup_id == startup_id)
+    )
+
+async def fetch_startup_page(db: AsyncSession, query, cursor: Optional[str], limit: int,
+                             keyset=(Startup.created_at, Startup.id)):
+    """
+    Keyset-страница по (created_at, id) по убыванию: LIMIT limit+1 показывает, есть ли продолжение.
+    keyset — колонки с теми же значениями, по которым есть индекс (для таблицы совпадений — её копии).
+    """
+    created_at_column, id_column = keyset
+    if cursor:
+        created_at, startup_id = decode_cursor(cursor)
+        query = query.where(tuple_(created_at_column, id_column) < tuple_(created_at, startup_id))
+    query = query.order_by(created_at_column.desc(), id_column.desc()).limit(limit + 1)
+
+    rows = (await db.execute(query)).all()
+    next_cursor = encode_cursor(rows[limit - 1].created_at, rows[limit - 1].id) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+def matching_investors_query(startup):
+    return select(User).where(
+        User.role == "investor",
+        User.industry.op("&&")(cast(startup.industry, ARRAY(VARCHAR))),
+        User.investment_stage.op("&&")(cast(startup.stage, ARRAY(VARCHAR))),
+        User.region.op("&&")(cast(startup.region, ARRAY(VARCHAR))),
+        User.min_check >= startup.min_check
+    )
+
 # ✅ 1. Обновить профиль инвестора
 @router.post("/investors/profile", summary="Обновить профиль инвестора", tags=["Startups"])
 async def save_investor_profile(
@@ -63,7 +147,14 @@ async def save_investor_profile(
         )
     )
     await db.execute(stmt)
+    # ✅ Совпадения пересчитываются в той же транзакции, что и профиль (таблицу читает только режим table)
+    if MATCH_SOURCE == "table":
+        await recompute_for_investor(db, current_user.user_id)
     await db.commit()
+    # 🔹 Сброс общий для всех процессов только с USER_CACHE_BACKEND=redis; в режиме memory
+    #    воркеры auth_service и другие воркеры sourcing держат запись до USER_CACHE_TTL
+    await user_cache.invalidate(current_user.user_id)
+    await matching_engine.refresh_investor(db, current_user.user_id)
 
     return {"message": "Investor profile updated successfully"}
 
@@ -107,12 +198,17 @@ async def save_founder_profile(
             min_check=founder_data.min_check,
         )
         db.add(new_startup)
+        await db.flush()
 
+    # ✅ Совпадения пересчитываются в той же транзакции, что и профиль (таблицу читает только режим table)
+    if MATCH_SOURCE == "table":
+        await recompute_for_founder(db, current_user.user_id)
     await db.commit()
+    await matching_engine.refresh_founder(db, current_user.user_id)
     return {"message": "Founder profile updated successfully"}
 
-# ✅ 3. Загрузить Pitch Deck и провести анализ
-@router.post("/founders/upload", summary="Загрузить Pitch Deck и провести анализ", response_model=dict, tags=["Startups"])
+# ✅ 3. Загрузить Pitch Deck и поставить анализ в очередь
+@router.post("/founders/upload", summary="Загрузить Pitch Deck и поставить анализ в очередь", response_model=dict, status_code=202, tags=["Startups"])
 async def upload_pitch_deck(
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
@@ -122,14 +218,21 @@ async def upload_pitch_deck(
         if current_user.role != "founder":
             raise HTTPException(status_code=403, detail="Access denied")
 
-        file_path = await save_uploaded_file(file)
         file_ext = file.filename.split('.')[-1]
+        allowed_extensions = {"pdf", "pptx"}
+        if file_ext not in allowed_extensions:
+            raise HTTPException(status_code=400, detail="Unsupported file format. Only PDF and PPTX are allowed.")
 
         startup_result = await db.execute(select(Startup).filter(Startup.founder_id == current_user.user_id))
         startup = startup_result.scalars().first()
         if not startup:
             raise HTTPException(status_code=404, detail="Стартап не найден")
 
+        file_path, content_hash = await save_uploaded_file(file)
+        if os.path.getsize(file_path) > EXTRACTION_MAX_BYTES:
+            os.remove(file_path)
+            raise HTTPException(status_code=413, detail=f"Файл превышает лимит {EXTRACTION_MAX_BYTES} байт")
+
         stmt = (
             update(Startup)
             .where(Startup.founder_id == current_user.user_id)
@@ -138,36 +241,24 @@ async def upload_pitch_deck(
         await db.execute(stmt)
         await db.commit()
 
-        print("Starting analysis for:", file_path)
-
-        allowed_extensions = {"pdf", "pptx"}
-        if file_ext not in allowed_extensions:
-            raise HTTPException(status_code=400, detail="Unsupported file format. Only PDF and PPTX are allowed.")
-
-        result = await analyze_startup_score_async(file_path, file_ext)
-
-        new_analysis = AnalysisResult(
-            startup_id=startup.id,
-            founder_id=current_user.user_id,
-            file_path=file_path,
-            startup_score=result["startup_score"],
-            usp_score=result["details"].get("USP"),
-            market_score=result["details"].get("Market"),
-            business_model_score=result["details"].get("Business Model"),
-            team_score=result["details"].get("Team"),
-            finance_score=result["details"].get("Finance"),
-            created_at=datetime.utcnow()
-        )
-        db.add(new_analysis)
-        await db.commit()
-        await db.refresh(new_analysis)
+        try:
+            job = await analysis_jobs.submit(AnalysisJob(
+                startup_id=startup.id,
+                founder_id=current_user.user_id,
+                file_path=file_path,
+                file_type=file_ext,
+                content_hash=content_hash,
+            ))
+        except AnalysisQueueFull:
+            raise HTTPException(status_code=503, detail="Очередь анализа переполнена, попробуйте позже")
+
+        logger.info(f"Анализ питч-дека поставлен в очередь: {file_path} (job {job.id})")
 
         return {
-            "message": "Pitch deck uploaded and analyzed successfully",
+            "message": "Pitch deck uploaded, analysis queued",
             "file_path": file_path,
-            "analysis_result": {
-                "startup_score": result["startup_score"],
-            }
+            "job_id": job.id,
+            "status": job.status,
         }
 
     except HTTPException as http_error:
@@ -180,6 +271,38 @@ async def upload_pitch_deck(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=error_message)
 
+# ✅ 3.0.1 Статус анализа питч-дека
+@router.get("/founders/upload/jobs/{job_id}", summary="Статус анализа питч-дека", tags=["Startups"])
+async def get_upload_job_status(
+    job_id: str,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    job = await analysis_jobs.get(job_id)
+    if not job or job.founder_id != current_user.user_id:
+        raise HTTPException(status_code=404, detail="Задача анализа не найдена")
+
+    return job.to_dict()
+
+# ✅ 3.0.2 Статистика кеша анализа питч-деков
+@router.get("/analysis/cache/stats", summary="Статистика кеша анализа питч-деков", tags=["Startups"], dependencies=[Depends(require_admin)])
+async def get_analysis_cache_stats():
+    return analysis_cache.stats()
+
+# ✅ 3.0.3 Статистика кеша пользователей get_current_user
+@router.get("/users/cache/stats", summary="Статистика кеша пользователей", tags=["Startups"], dependencies=[Depends(require_admin)])
+async def get_user_cache_stats():
+    return user_cache.stats()
+
+# ✅ 3.0.4 Состояние индекса матчинга
+@router.get("/matching/stats", summary="Состояние индекса матчинга", tags=["Startups"], dependencies=[Depends(require_admin)])
+async def get_matching_stats():
+    return matching_engine.stats()
+
+# ✅ 3.0.5 Пул соединений с БД
+@router.get("/db/pool-stats", summary="Статистика пула соединений с БД", tags=["Startups"], dependencies=[Depends(require_admin)])
+async def get_db_pool_stats():
+    return engine_stats(engine)
+
 # ✅ 3.1.Получить профиль фаундера
 @router.get("/founders/profile", summary="Получить профиль фаундера", tags=["Startups"])
 async def get_founder_profile(current_user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
@@ -198,6 +321,21 @@ async def get_founder_profile(current_user: CurrentUser = Depends(get_current_us
         "min_check": startup.min_check
     }
 
+def score_upsert_statement(startup_id, answers):
+    """
+    Пакетный upsert ответов анкеты. Повторы одного вопроса в запросе схлопываются
+    (побеждает последний) — ON CONFLICT не допускает двух строк с одним ключом.
+    """
+    latest = {(answer.category_id, answer.question_id): answer.score for answer in answers}
+    stmt = pg_insert(StartupScore).values([
+        {"startup_id": startup_id, "category_id": category_id, "question_id": question_id, "score": score}
+        for (category_id, question_id), score in latest.items()
+    ])
+    return stmt.on_conflict_do_update(
+        index_elements=[StartupScore.startup_id, StartupScore.category_id, StartupScore.question_id],
+        set_={"score": stmt.excluded.score},
+    ).returning(StartupScore)
+
 # ✅ 4. Создание стартапа (Заполнение шаблона с вопросами)
 @router.post("/startups/fill_template", summary="Заполнить шаблон", tags=["Startups"])
 async def fill_template(
@@ -205,38 +343,27 @@ async def fill_template(
     db: AsyncSession = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user)
 ):
-    exists_stmt = select(exists().where(Startup.id == request.startup_id))
-    startup_exists = await db.execute(exists_stmt)
-
-    if not startup_exists.scalar():
-        raise HTTPException(status_code=404, detail="Стартап не найден")
-
-    scores = []
-    for answer in request.answers:
-        existing_score_stmt = select(StartupScore).where(
-            StartupScore.startup_id == request.startup_id,
-            StartupScore.category_id == answer.category_id,
-            StartupScore.question_id == answer.question_id
-        )
-        existing_score = await db.execute(existing_score_stmt)
-        existing_score = existing_score.scalars().first()
+    if not request.answers:
+        exists_stmt = select(exists().where(Startup.id == request.startup_id))
+        startup_exists = await db.execute(exists_stmt)
 
-        if existing_score:
-            existing_score.score = answer.score
-        else:
-            new_score = StartupScore(
-                startup_id=request.startup_id,
-                category_id=answer.category_id,
-                question_id=answer.question_id,
-                score=answer.score
-            )
-            db.add(new_score)
-            scores.append(new_score)
+        if not startup_exists.scalar():
+            raise HTTPException(status_code=404, detail="Стартап не найден")
+        return jsonable_encoder({"message": "Шаблон успешно заполнен", "scores": []})
 
+    # 🔹 Один INSERT ... ON CONFLICT на всю анкету; несуществующий стартап — нарушение FK
     try:
-        await db.flush()
+        result = await db.execute(
+            score_upsert_statement(request.startup_id, request.answers),
+            execution_options={"populate_existing": True},
+        )
+        scores = result.scalars().all()
         await db.commit()
         return jsonable_encoder({"message": "Шаблон успешно заполнен", "scores": [score.to_dict() for score in scores]})
+    except IntegrityError as e:
+        await db.rollback()
+        logger.warning(f"Шаблон для несуществующего стартапа {request.startup_id}: {e.orig}")
+        raise HTTPException(status_code=404, detail="Стартап не найден")
     except Exception as e:
         logger.error(f"Ошибка сохранения данных: {e}")
         await db.rollback()
@@ -273,27 +400,19 @@ async def get_startup_score(startup_id: uuid.UUID, db: AsyncSession = Depends(ge
 @router.post("/filter", summary="Фильтрация стартапов", tags=["Startups"])
 async def filter_startups(
     filter_criteria: StartupFilterRequest,
+    cursor: Optional[str] = Query(None, description="Токен продолжения из next_cursor"),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
     db: AsyncSession = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user)
 ):
     if current_user.role != "investor":
         raise HTTPException(status_code=403, detail="Access denied")
 
-    query = select(Startup)
-    if filter_criteria.industry:
-        query = query.where(Startup.industry.op("&&")(cast(filter_criteria.industry, ARRAY(VARCHAR))))
-    if filter_criteria.stage:
-        query = query.where(Startup.stage.op("&&")(cast(filter_criteria.stage, ARRAY(VARCHAR))))
-    if filter_criteria.region:
-        query = query.where(Startup.region.op("&&")(cast(filter_criteria.region, ARRAY(TEXT))))
-    if filter_criteria.min_check:
-        query = query.where(Startup.min_check <= filter_criteria.min_check)
-
-    startup_result = await db.execute(query)
-    filtered_startups = startup_result.scalars().all()
+    filtered_startups, next_cursor = await fetch_startup_page(db, filter_startups_query(filter_criteria), cursor, limit)
 
     return {
         "message": "Отфильтрованные стартапы",
+        "next_cursor": next_cursor,
         "startups": [
             {
                 "id": s.id,
@@ -329,6 +448,62 @@ async def get_startup_detail(startup_id: str, db: AsyncSession = Depends(get_db)
     })
 	
 # ✅ 8. Отправка стартапа в Due Diligence
+def due_diligence_payload(startup) -> dict:
+    """Стартап в формате KPIRequest due_diligence_service: списки — строкой через запятую"""
+    return {
+        "startup_id": str(startup.id),
+        "company_name": startup.name,
+        "industry": ", ".join(startup.industry or []),
+        "stage": ", ".join(startup.stage or []),
+        "region": ", ".join(startup.region or []),
+        "min_check": startup.min_check or 0.0,
+    }
+
+# ✅ 7.1 Пакетная отправка в Due Diligence (объявлен до /select/{startup_id})
+@router.post("/select/batch", summary="Отправить несколько стартапов в Due Diligence", tags=["Startups"])
+async def submit_due_diligence_batch(
+    request: DueDiligenceBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    startup_ids = list(dict.fromkeys(request.startup_ids))
+    if len(startup_ids) > DUE_DILIGENCE_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"Не больше {DUE_DILIGENCE_BATCH_MAX} стартапов за запрос")
+
+    # Все стартапы одним запросом, один POST в due_diligence_service
+    result = await db.execute(
+        select(Startup.id, Startup.name, Startup.industry, Startup.stage, Startup.region, Startup.min_check)
+        .where(Startup.id.in_(startup_ids))
+    )
+    startups = result.all()
+    outcomes = {startup_id: "not_found" for startup_id in startup_ids}
+
+    if startups:
+        async with httpx.AsyncClient(timeout=DUE_DILIGENCE_TIMEOUT) as client:
+            try:
+                response = await client.post(
+                    f"{DUE_DILIGENCE_SERVICE_URL}/batch",
+                    json={"startups": [due_diligence_payload(startup) for startup in startups]},
+                )
+                response.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                raise HTTPException(status_code=e.response.status_code, detail=f"Due Diligence error: {e.response.text}")
+            except httpx.RequestError:
+                logger.exception("Ошибка соединения с due_diligence_service")
+                raise HTTPException(status_code=502, detail="Ошибка соединения с due_diligence_service")
+
+        for item in response.json()["results"]:
+            outcomes[UUID(item["startup_id"])] = item["status"]
+
+    results = [{"startup_id": str(startup_id), "status": status} for startup_id, status in outcomes.items()]
+    return {
+        "message": "Стартапы отправлены в Due Diligence",
+        "inserted": sum(1 for status in outcomes.values() if status == "inserted"),
+        "already_exists": sum(1 for status in outcomes.values() if status == "already_exists"),
+        "not_found": sum(1 for status in outcomes.values() if status == "not_found"),
+        "results": results,
+    }
+
 @router.post("/select/{startup_id}", summary="Отправить стартап в Due Diligence", tags=["Startups"])
 async def submit_due_diligence(
     startup_id: str,
@@ -358,17 +533,74 @@ async def submit_due_diligence(
         except httpx.HTTPStatusError as e:
             raise HTTPException(status_code=response.status_code, detail=f"Due Diligence error: {e.response.text}")
 
+# 🔹 Поля совпадений в ответах (записи индекса матчинга и ORM-объекты)
+def startup_match_item(s) -> dict:
+    return {
+        "id": s.id,
+        "name": s.name,
+        "industry": s.industry,
+        "stage": s.stage,
+        "region": s.region,
+        "min_check": s.min_check
+    }
+
+def investor_match_item(i) -> dict:
+    return {
+        "id": i.id,
+        "industry": i.industry,
+        "investment_stage": i.investment_stage,
+        "region": i.region,
+        "min_check": i.min_check
+    }
+
+def latest_analysis_query(startup_ids: list, *columns):
+    """
+    Последний AnalysisResult каждого стартапа: unnest(ids) JOIN LATERAL (... LIMIT 1).
+    По индексу (startup_id, created_at DESC) это одно чтение на id — стоимость зависит
+    от числа запрошенных стартапов, а не от длины истории; дублей при равных created_at нет.
+    """
+    requested = (
+        func.unnest(cast(bindparam("startup_ids", list(startup_ids), type_=ARRAY(PG_UUID(as_uuid=True))), ARRAY(PG_UUID(as_uuid=True))))
+        .table_valued("id")
+        .render_derived(name="requested")
+    )
+    latest = (
+        select(AnalysisResult.startup_id, *columns)
+        .where(AnalysisResult.startup_id == requested.c.id)
+        .order_by(AnalysisResult.created_at.desc().nulls_last())
+        .limit(1)
+        .lateral("latest")
+    )
+    return select(latest).select_from(requested).join(latest, true())
+
+async def latest_startup_scores(db: AsyncSession, startup_ids: list) -> dict:
+    """Последний startup_score из analysis_results для каждого стартапа"""
+    if not startup_ids:
+        return {}
+    result = await db.execute(latest_analysis_query(startup_ids, AnalysisResult.startup_score))
+    return {row.startup_id: row.startup_score for row in result}
+
 # ✅ 9. Получение списка подходящих стартапов для инвестора
 @router.get("/matches/me", summary="Получить список стартапов, подходящих инвестору", tags=["Startups"])
 async def get_matching_startups(
+    top_k: Optional[int] = Query(None, ge=1, le=MATCH_TOP_K_MAX, description="Вернуть только K самых релевантных (ранжированный режим)"),
+    w_overlap: float = Query(1.0, ge=0, description="Вес пересечения отрасли, стадии и региона"),
+    w_check: float = Query(1.0, ge=0, description="Вес соответствия чека"),
+    w_score: float = Query(1.0, ge=0, description="Вес последнего startup_score"),
+    cursor: Optional[str] = Query(None, description="Токен продолжения из next_cursor"),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
     db: AsyncSession = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user)
 ):
     if current_user.role != "investor":
         raise HTTPException(status_code=403, detail="Access denied")
 
-    investor_result = await db.execute(select(User).where(User.id == current_user.user_id, User.role == "investor"))
-    investor = investor_result.scalars().first()
+    # ✅ Индекс матчинга построен — профиль инвестора и совпадения берём из памяти
+    if matching_engine.ready:
+        investor = matching_engine.investor(current_user.user_id)
+    else:
+        investor_result = await db.execute(select(User).where(User.id == current_user.user_id, User.role == "investor"))
+        investor = investor_result.scalars().first()
     if not investor:
         raise HTTPException(status_code=404, detail="Инвестор не найден")
 
@@ -381,77 +613,111 @@ async def get_matching_startups(
     ):
         raise HTTPException(status_code=400, detail="Недостаточно данных для подбора стартапов")
 
-    startup_result = await db.execute(
-        select(Startup).where(
-            Startup.industry.op("&&")(cast(investor.industry, ARRAY(VARCHAR))),
-            Startup.stage.op("&&")(cast(investor.investment_stage, ARRAY(VARCHAR))),
-            Startup.region.op("&&")(cast(investor.region, ARRAY(TEXT))),
-            Startup.min_check <= investor.min_check
-        )
-    )
+    if top_k is None:
+        # ✅ Постраничная выдача по (created_at, id): размер ответа не зависит от числа совпадений
+        if matching_engine.ready:
+            page, next_cursor = page_records(matching_engine.match_startups(investor), cursor, limit)
+        elif MATCH_SOURCE == "table":
+            page, next_cursor = await fetch_startup_page(
+                db, matched_startups_query(investor.id), cursor, limit,
+                keyset=(InvestorStartupMatch.startup_created_at, InvestorStartupMatch.startup_id),
+            )
+        else:
+            page, next_cursor = await fetch_startup_page(db, matching_startups_query(investor), cursor, limit)
+        return {
+            "message": "Найденные стартапы",
+            "next_cursor": next_cursor,
+            "startups": [startup_match_item(s) for s in page]
+        }
 
-    matching_startups = startup_result.scalars().all()
+    if matching_engine.ready:
+        matching_startups = matching_engine.match_startups(investor)
+    else:
+        query = matched_startups_query(investor.id) if MATCH_SOURCE == "table" else matching_startups_query(investor)
+        startup_result = await db.execute(query)
+        matching_startups = startup_result.all()
+
+    # ✅ Ранжированный режим: только K лучших по релевантности (cursor не используется)
+    weights = MatchWeights(overlap=w_overlap, check_fit=w_check, startup_score=w_score)
+    scores = None if matching_engine.ready else await latest_startup_scores(db, [s.id for s in matching_startups])
+    ranked = top_startups(investor, matching_startups, top_k, weights, scores)
 
     return {
         "message": "Найденные стартапы",
-        "startups": [
-            {
-                "id": s.id,
-                "name": s.name,
-                "industry": s.industry,
-                "stage": s.stage,
-                "region": s.region,
-                "min_check": s.min_check
-            }
-            for s in matching_startups
-        ]
+        "total": len(matching_startups),
+        "startups": [{**startup_match_item(s), "score": round(score, 4)} for score, s in ranked]
     }
 
 # ✅ 10. Получение списка подходящих инвесторов для стартапа
 @router.get("/investors/matches/me", summary="Получить список инвесторов, подходящих стартапу", tags=["Startups"])
 async def get_matching_investors(
+    top_k: Optional[int] = Query(None, ge=1, le=MATCH_TOP_K_MAX, description="Вернуть только K самых релевантных (ранжированный режим)"),
+    w_overlap: float = Query(1.0, ge=0, description="Вес пересечения отрасли, стадии и региона"),
+    w_check: float = Query(1.0, ge=0, description="Вес соответствия чека"),
     db: AsyncSession = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user)
 ):
     if current_user.role != "founder":
         raise HTTPException(status_code=403, detail="Access denied")
 
-    startup_result = await db.execute(select(Startup).where(Startup.founder_id == current_user.user_id))
-    startup = startup_result.scalars().first()
+    if matching_engine.ready:
+        startup = matching_engine.startup_for_founder(current_user.user_id)
+    else:
+        startup_result = await db.execute(select(Startup).where(Startup.founder_id == current_user.user_id))
+        startup = startup_result.scalars().first()
     if not startup:
         raise HTTPException(status_code=404, detail="Стартап не найден")
 
     if not startup.industry or not startup.stage or not startup.region:
         raise HTTPException(status_code=400, detail="Недостаточно данных для подбора инвесторов")
 
-    investor_result = await db.execute(
-        select(User).where(
-            User.role == "investor",
-            User.industry.op("&&")(cast(startup.industry, ARRAY(TEXT))),
-            User.investment_stage.op("&&")(cast(startup.stage, ARRAY(TEXT))),
-            User.region.op("&&")(cast(startup.region, ARRAY(TEXT))),
-            User.min_check >= startup.min_check
-        )
-    )
+    if matching_engine.ready:
+        matching_investors = matching_engine.match_investors(startup)
+    else:
+        query = matched_investors_query(startup.id) if MATCH_SOURCE == "table" else matching_investors_query(startup)
+        investor_result = await db.execute(query)
+        matching_investors = investor_result.scalars().all()
 
-    matching_investors = investor_result.scalars().all()
+    if top_k is None:
+        return {
+            "message": "Найденные инвесторы",
+            "investors": [investor_match_item(i) for i in matching_investors]
+        }
+
+    # ✅ Ранжированный режим: только K лучших по релевантности
+    weights = MatchWeights(overlap=w_overlap, check_fit=w_check)
+    ranked = top_investors(startup, matching_investors, top_k, weights)
 
     return {
         "message": "Найденные инвесторы",
-        "investors": [
-            {
-                "id": i.id,
-                "industry": i.industry,
-                "investment_stage": i.investment_stage,
-                "region": i.region,
-                "min_check": i.min_check
-            }
-            for i in matching_investors
-        ]
+        "total": len(matching_investors),
+        "investors": [{**investor_match_item(i), "score": round(score, 4)} for score, i in ranked]
     }
 
 # ✅ 11. Скоринг по pitch deck (analysis_results)
 
+PITCH_SCORE_COLUMNS = (
+    AnalysisResult.startup_score,
+    AnalysisResult.usp_score,
+    AnalysisResult.market_score,
+    AnalysisResult.business_model_score,
+    AnalysisResult.team_score,
+    AnalysisResult.finance_score,
+)
+
+def pitch_score_item(row) -> dict:
+    def value(score):
+        return float(score) if score is not None else None
+
+    return {
+        "total": value(row.startup_score),
+        "usp": value(row.usp_score),
+        "market": value(row.market_score),
+        "business_model": value(row.business_model_score),
+        "team": value(row.team_score),
+        "finance": value(row.finance_score),
+    }
+
 @router.get("/batch/pitch-scores", summary="Получить скоринги для нескольких стартапов", tags=["Startups"], response_model=StartupScoreBatchResponse)
 async def get_batch_pitch_scores(
     ids: str = Query(..., description="Список startup_id через запятую"),
@@ -467,46 +733,34 @@ async def get_batch_pitch_scores(
     if not ids_list:
         raise HTTPException(status_code=400, detail="Список идентификаторов пуст")
 
-    # Дальше обычная логика
-    subquery = (
-        select(
-            AnalysisResult.startup_id,
-            func.max(AnalysisResult.created_at).label("max_created")
-        )
-        .where(AnalysisResult.startup_id.in_(ids_list))
-        .group_by(AnalysisResult.startup_id)
-        .subquery()
-    )
-
-    query = (
-        select(
-            AnalysisResult.startup_id,
-            AnalysisResult.startup_score,
-            AnalysisResult.usp_score,
-            AnalysisResult.market_score,
-            AnalysisResult.business_model_score,
-            AnalysisResult.team_score,
-            AnalysisResult.finance_score,
-        )
-        .join(subquery, (AnalysisResult.startup_id == subquery.c.startup_id) & (AnalysisResult.created_at == subquery.c.max_created))
-    )
+    # Последний анализ каждого стартапа (LATERAL по индексу, без повторного прохода по истории)
+    query = latest_analysis_query(dict.fromkeys(ids_list), *PITCH_SCORE_COLUMNS)
 
     results = await db.execute(query)
 
-    scores = {
-        str(row.startup_id): {
-            "total": float(row.startup_score) if row.startup_score is not None else None,
-            "usp": float(row.usp_score) if row.usp_score is not None else None,
-            "market": float(row.market_score) if row.market_score is not None else None,
-            "business_model": float(row.business_model_score) if row.business_model_score is not None else None,
-            "team": float(row.team_score) if row.team_score is not None else None,
-            "finance": float(row.finance_score) if row.finance_score is not None else None,
-        }
-        for row in results.all()
-    }
+    scores = {str(row.startup_id): pitch_score_item(row) for row in results.all()}
 
     return scores
 
+# ✅ 11.1 Скоринги пачкой: ids в теле запроса, ответ — NDJSON по мере выборки
+@router.post("/batch/pitch-scores", summary="Получить скоринги для большого числа стартапов (NDJSON)", tags=["Startups"])
+async def stream_batch_pitch_scores(request: StartupScoreBatchRequest):
+    ids_list = list(dict.fromkeys(request.ids))
+    if len(ids_list) > PITCH_SCORES_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"Не больше {PITCH_SCORES_MAX_IDS} идентификаторов за запрос")
+
+    async def rows():
+        # Своя сессия: зависимость get_db закрывается до начала отправки тела
+        async with AsyncSessionLocal() as db:
+            for start in range(0, len(ids_list), PITCH_SCORES_CHUNK_SIZE):
+                result = await db.execute(latest_analysis_query(ids_list[start:start + PITCH_SCORES_CHUNK_SIZE], *PITCH_SCORE_COLUMNS))
+                yield "".join(
+                    json.dumps({"startup_id": str(row.startup_id), **pitch_score_item(row)}) + "\n"
+                    for row in result
+                )
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
 """
 @router.get("/batch/pitch-scores", summary="Получить скоринги для нескольких стартапов", tags=["Startups"], response_model=StartupScoreBatchResponse)
 async def get_batch_pitch_scores(
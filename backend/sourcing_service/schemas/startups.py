@@ -1,6 +1,11 @@
-from pydantic import BaseModel, Field, field_validator, RootModel
+from pydantic import BaseModel, RootModel
 from typing import List, Optional, Dict
 from uuid import UUID
+# ✅ 0.1–0.5 Схемы запросов общие с api_gateway (shared.schemas)
+from shared.schemas import (
+    InvestorProfileUpdate, FounderProfileUpdate, StartupFilterRequest,
+    Answer, FillTemplateRequest, StartupScoreBatchRequest,
+    DueDiligenceBatchRequest,)
 
 
 # ✅ 0.0 Модель ответа стартапа
@@ -19,53 +24,6 @@ class StartupResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
-# ✅ 0.1 Профиль инвестора
-class InvestorProfileUpdate(BaseModel):
-    investor_type: Optional[List[str]] = []
-    investment_stage: Optional[List[str]] = []
-    industry: Optional[List[str]] = []
-    region: Optional[List[str]] = []
-    min_check: Optional[float] = 0
-
-
-# ✅ 0.2 Профиль фаундера
-class FounderProfileUpdate(BaseModel):
-    name: Optional[str] = None
-    description: Optional[str] = None
-    stage: List[str] = Field(default_factory=list)
-    industry: List[str] = Field(default_factory=list)
-    region: List[str] = Field(default_factory=list)
-    min_check: float = 20
-
-
-# ✅ 0.3 Фильтрация стартапов
-class StartupFilterRequest(BaseModel):
-    industry: Optional[List[str]] = None
-    stage: Optional[List[str]] = None
-    region: Optional[List[str]] = None
-    min_check: Optional[float] = None
-
-
-# ✅ 0.4 Ответ анкеты скоринга
-class Answer(BaseModel):
-    category_id: int
-    question_id: int
-    score: int = Field(..., ge=0, le=3, description="Score должен быть в диапазоне 0-3")
-
-
-# ✅ 0.5 Запрос на заполнение шаблона оценки
-class FillTemplateRequest(BaseModel):
-    startup_id: UUID
-    answers: List[Answer]
-
-    @field_validator("startup_id", mode="before")
-    @classmethod
-    def convert_uuid(cls, value):
-        if isinstance(value, UUID):
-            return str(value)
-        return value
-
-
 # ✅ 0.6 Детальный скоринг
 class StartupScoreDetails(BaseModel):
     total: float
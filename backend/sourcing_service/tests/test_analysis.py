@@ -0,0 +1,105 @@
+import sys
+import os
+
+# ✅ Добавляем `backend` в PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import math
+import subprocess
+import pytest
+from sourcing_service import analysis
+from sourcing_service.analysis import (
+    STARTUP_CATEGORIES, all_candidate_labels, fold_category_scores, split_into_windows, reduce_scores,)
+
+# 🔹 Детерминированные «логиты entailment» для каждой метки
+FAKE_LOGITS = {label: (len(label) % 7) * 0.37 - 1.0 for label in all_candidate_labels()}
+
+
+class FakePipeline:
+    """Имитация zero-shot pipeline: softmax по логитам entailment внутри набора меток"""
+
+    def __call__(self, text, candidate_labels):
+        exps = [math.exp(FAKE_LOGITS[label]) for label in candidate_labels]
+        total = sum(exps)
+        return {"labels": candidate_labels, "scores": [value / total for value in exps]}
+
+
+def test_all_candidate_labels_covers_every_category():
+    labels = all_candidate_labels()
+    assert len(labels) == len(set(labels))
+    for keywords in STARTUP_CATEGORIES.values():
+        assert set(keywords) <= set(labels)
+
+
+def test_fold_category_scores_matches_per_category_softmax():
+    pipeline = FakePipeline()
+    scores = fold_category_scores(FAKE_LOGITS)
+
+    for category, keywords in STARTUP_CATEGORIES.items():
+        expected = round(max(pipeline("deck", keywords)["scores"]) * 20, 2)
+        assert scores[category] == expected
+
+
+@pytest.mark.asyncio
+async def test_single_pass_and_per_category_modes_agree(monkeypatch):
+    monkeypatch.setattr(analysis, "get_nlp_model", lambda: FakePipeline())
+    monkeypatch.setattr(analysis, "entailment_logits", lambda model, text, labels: {label: FAKE_LOGITS[label] for label in labels})
+
+    monkeypatch.setattr(analysis, "SCORING_MODE", "per_category")
+    per_category = await analysis.score_categories_async("deck text")
+
+    monkeypatch.setattr(analysis, "SCORING_MODE", "single_pass")
+    single_pass = await analysis.score_categories_async("deck text")
+
+    assert single_pass == per_category
+
+
+def test_transformers_is_imported_lazily():
+    backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+    code = "import sys, sourcing_service.analysis; print('transformers' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=backend_dir, capture_output=True, text=True, check=True)
+
+    assert output.stdout.strip() == "False"
+    assert analysis.is_model_loaded() is False
+
+
+def test_windows_respect_word_limit_and_overlap():
+    text = " ".join(f"Sentence number {number} here." for number in range(10))
+    windows = split_into_windows(text, max_words=8, overlap=1)
+
+    assert all(len(window.split()) <= 8 for window in windows)
+    assert windows[0].endswith("number 1 here.")
+    assert windows[1].startswith("Sentence number 1 here.")
+    assert windows[-1].endswith("number 9 here.")
+
+
+def test_duplicate_windows_are_dropped():
+    text = "Confidential deck.\n" * 5
+    assert split_into_windows(text, max_words=2, overlap=0) == ["Confidential deck."]
+
+
+def test_reducers():
+    values = [2.0, 10.0, 6.0, 4.0]
+    assert reduce_scores(values, "max") == 10.0
+    assert reduce_scores(values, "mean") == 5.5
+    assert reduce_scores(values, "topk_mean", top_k=2) == 8.0
+
+
+@pytest.mark.asyncio
+async def test_chunked_mode_scores_content_past_the_first_window(monkeypatch):
+    """Сильный сигнал в последнем окне должен попасть в итог при reducer=max"""
+    def fake_batch(model, pairs, batch_size):
+        return [3.0 if "revenue" in premise and label == "revenue model" else 0.0 for premise, label in pairs]
+
+    monkeypatch.setattr(analysis, "get_nlp_model", lambda: None)
+    monkeypatch.setattr(analysis, "entailment_logits_batch", fake_batch)
+    monkeypatch.setattr(analysis, "SCORING_MODE", "chunked")
+    monkeypatch.setattr(analysis, "CHUNK_MAX_WORDS", 10)
+    monkeypatch.setattr(analysis, "CHUNK_REDUCER", "max")
+
+    filler = " ".join(f"Slide {number} talks about the product." for number in range(40))
+    scores = await analysis.score_categories_async(filler + " Our revenue comes from subscriptions.")
+
+    flat = round(1 / 3 * 20, 2)
+    assert scores["Business Model"] > flat
+    assert scores["Team"] == flat
@@ -0,0 +1,51 @@
+import sys
+import os
+
+# ✅ Добавляем `backend` в PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from sourcing_service import analysis
+from sourcing_service.cache import AnalysisCache, analysis_cache_key
+
+SCORES = {"USP": 12.5, "Market": 8.0}
+
+
+def test_hits_and_misses_are_counted():
+    cache = AnalysisCache(max_entries=10, max_bytes=10_000)
+    cache.put("a", "text", SCORES)
+
+    assert cache.get("a").scores == SCORES
+    assert cache.get("b") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = AnalysisCache(max_entries=2, max_bytes=10_000)
+    cache.put("a", "text", SCORES)
+    cache.put("b", "text", SCORES)
+    cache.get("a")
+    cache.put("c", "text", SCORES)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_total_size_stays_within_byte_limit():
+    cache = AnalysisCache(max_entries=100, max_bytes=1_000)
+    for number in range(10):
+        cache.put(str(number), "x" * 300, SCORES)
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 1_000
+    assert cache.get("9") is not None
+    assert cache.get("0") is None
+
+
+def test_key_changes_with_scoring_config(monkeypatch):
+    key = analysis_cache_key("abc")
+    monkeypatch.setattr(analysis, "SCORING_MODE", "per_category")
+
+    assert analysis_cache_key("abc") != key
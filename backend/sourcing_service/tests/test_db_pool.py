@@ -0,0 +1,40 @@
+import sys
+import os
+from unittest.mock import MagicMock
+
+# ✅ Добавляем `backend` в PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.util import greenlet_spawn
+from shared.db import MeteredAsyncPool, create_engine, engine_stats
+
+
+def test_engine_uses_metered_pool_without_echo():
+    engine = create_engine("postgresql+asyncpg://u:p@localhost/db", pool_size=3, max_overflow=1)
+
+    assert engine.echo is False
+    assert isinstance(engine.sync_engine.pool, MeteredAsyncPool)
+    stats = engine_stats(engine)
+    assert stats["size"] == 3 and stats["max_overflow"] == 1
+    assert stats["checkouts"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_counts_checkouts_and_timeouts():
+    pool = MeteredAsyncPool(lambda: MagicMock(), pool_size=1, max_overflow=0, timeout=0.05)
+
+    def exhaust():
+        first = pool.connect()
+        with pytest.raises(PoolTimeoutError):
+            pool.connect()
+        first.close()
+
+    await greenlet_spawn(exhaust)
+
+    stats = pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["max_wait_ms"] >= 50
+    assert stats["checked_out"] == 0
@@ -0,0 +1,31 @@
+import sys
+import os
+import uuid
+from types import SimpleNamespace
+
+# ✅ Добавляем `backend` в PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from fastapi.routing import APIRoute
+from sourcing_service.routes.startups import router, due_diligence_payload
+
+
+def test_payload_matches_due_diligence_schema():
+    startup = SimpleNamespace(
+        id=uuid.uuid4(), name="Acme", industry=["fintech", "ai"], stage=["seed"], region=None, min_check=None,
+    )
+    payload = due_diligence_payload(startup)
+
+    assert payload == {
+        "startup_id": str(startup.id),
+        "company_name": "Acme",
+        "industry": "fintech, ai",
+        "stage": "seed",
+        "region": "",
+        "min_check": 0.0,
+    }
+
+
+def test_batch_route_is_declared_before_single_select():
+    paths = [route.path for route in router.routes if isinstance(route, APIRoute) and "POST" in route.methods]
+    assert paths.index("/select/batch") < paths.index("/select/{startup_id}")
@@ -0,0 +1,63 @@
+import sys
+import os
+
+# ✅ Добавляем `backend` в PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import fitz  # PyMuPDF
+import pytest
+from sourcing_service import extraction
+from sourcing_service.extraction import DocumentTooLarge, extract_text
+
+
+@pytest.fixture(scope="module", autouse=True)
+def executor():
+    yield
+    extraction.shutdown_executor()
+
+
+@pytest.fixture
+def pdf_deck(tmp_path):
+    """PDF из 7 страниц с номером страницы в тексте"""
+    path = tmp_path / "deck.pdf"
+    doc = fitz.open()
+    for number in range(7):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"slide {number}")
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+@pytest.mark.asyncio
+async def test_pdf_pages_are_extracted_in_order_across_tasks(monkeypatch, pdf_deck):
+    monkeypatch.setattr(extraction, "EXTRACTION_PAGES_PER_TASK", 3)
+
+    text = await extract_text(pdf_deck, "pdf")
+
+    positions = [text.index(f"slide {number}") for number in range(7)]
+    assert positions == sorted(positions)
+
+
+@pytest.mark.asyncio
+async def test_pdf_is_capped_at_max_pages(monkeypatch, pdf_deck):
+    monkeypatch.setattr(extraction, "EXTRACTION_PAGES_PER_TASK", 2)
+    monkeypatch.setattr(extraction, "EXTRACTION_MAX_PAGES", 4)
+
+    text = await extract_text(pdf_deck, "pdf")
+
+    assert "slide 3" in text
+    assert "slide 4" not in text
+
+
+@pytest.mark.asyncio
+async def test_oversized_document_is_rejected(monkeypatch, pdf_deck):
+    monkeypatch.setattr(extraction, "EXTRACTION_MAX_BYTES", 10)
+
+    with pytest.raises(DocumentTooLarge):
+        await extract_text(pdf_deck, "pdf")
+
+
+@pytest.mark.asyncio
+async def test_unsupported_type_returns_empty_text(pdf_deck):
+    assert await extract_text(pdf_deck, "docx") == ""
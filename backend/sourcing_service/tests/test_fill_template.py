@@ -0,0 +1,26 @@
+import sys
+import os
+import uuid
+
+# ✅ Добавляем `backend` в PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from sqlalchemy.dialects import postgresql
+from shared.schemas import Answer
+from sourcing_service.routes.startups import score_upsert_statement
+
+
+def test_upsert_is_single_statement_with_last_answer_winning():
+    answers = [
+        Answer(category_id=1, question_id=1, score=1),
+        Answer(category_id=1, question_id=2, score=2),
+        Answer(category_id=1, question_id=1, score=3),
+    ]
+    compiled = score_upsert_statement(uuid.uuid4(), answers).compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+
+    assert "ON CONFLICT (startup_id, category_id, question_id) DO UPDATE SET score = excluded.score" in sql
+    assert "RETURNING" in sql
+    # Две строки VALUES: повтор вопроса (1, 1) схлопнут
+    assert "score_m1" in compiled.params and "score_m2" not in compiled.params
+    assert compiled.params["score_m0"] == 3
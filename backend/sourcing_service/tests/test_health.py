@@ -0,0 +1,66 @@
+import sys
+import os
+import json
+
+# ✅ Добавляем `backend` в PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import pytest
+from sourcing_service import main
+
+
+def body(response) -> dict:
+    return json.loads(response.body)
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(main, "warmup_state", {"attempts": 0, "error": None})
+    monkeypatch.setattr(main, "is_model_loaded", lambda: False)
+
+
+@pytest.mark.asyncio
+async def test_ready_without_warmup(monkeypatch):
+    monkeypatch.setattr(main, "MODEL_WARMUP", False)
+    response = await main.readiness()
+
+    assert response.status_code == 200
+    assert body(response)["status"] == "ready"
+
+
+@pytest.mark.asyncio
+async def test_failed_warmup_is_reported_and_retried(monkeypatch):
+    monkeypatch.setattr(main, "MODEL_WARMUP", True)
+    attempts = []
+
+    async def flaky_warm_up():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("weights not found")
+
+    monkeypatch.setattr(main, "warm_up_model_async", flaky_warm_up)
+
+    assert await main.warm_up() is False
+    response = await main.readiness()
+    assert response.status_code == 503
+    assert body(response)["status"] == "error"
+    assert body(response)["warmup_error"] == "RuntimeError: weights not found"
+
+    monkeypatch.setattr(main, "MODEL_WARMUP_RETRY_INTERVAL", 0)
+    await main.retry_warm_up()
+    monkeypatch.setattr(main, "is_model_loaded", lambda: True)
+
+    response = await main.readiness()
+    assert response.status_code == 200
+    assert body(response)["warmup_error"] is None
+    assert body(response)["warmup_attempts"] == 2
+
+
+def test_stats_endpoints_require_admin():
+    from auth_service.routes.auth import require_admin
+    from sourcing_service.routes import startups
+
+    stats_routes = [route for route in startups.router.routes if "stats" in route.path]
+    assert len(stats_routes) == 4
+    for route in stats_routes:
+        assert require_admin in [dependency.dependency for dependency in route.dependencies]
@@ -0,0 +1,44 @@
+import sys
+import os
+
+# ✅ Добавляем `backend` в PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import pytest
+from sourcing_service import analysis
+from sourcing_service.inference import calibrate, load_backend
+
+
+class FakeModel:
+    """Модель-заглушка: одинаковый логит для всех меток плюс сдвиг для одной из них"""
+
+    def __init__(self, boost: float):
+        self.boost = boost
+
+    def logits(self, labels):
+        return {label: (self.boost if label == "revenue model" else 0.0) for label in labels}
+
+
+@pytest.fixture(autouse=True)
+def fake_entailment(monkeypatch):
+    monkeypatch.setattr(analysis, "entailment_logits", lambda model, text, labels: model.logits(labels))
+
+
+def test_identical_backend_passes_calibration():
+    report = calibrate(FakeModel(1.0), FakeModel(1.0), samples=["deck"])
+
+    assert report["passed"] is True
+    assert set(report["max_diff"].values()) == {0.0}
+
+
+def test_drifting_backend_fails_calibration():
+    report = calibrate(FakeModel(1.0), FakeModel(3.0), samples=["deck"], tolerance=0.5)
+
+    assert report["passed"] is False
+    assert report["max_diff"]["Business Model"] > 0.5
+    assert report["max_diff"]["Team"] == 0.0
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        load_backend("tensorrt", "facebook/bart-large-mnli")
@@ -0,0 +1,187 @@
+import sys
+import os
+
+# ✅ Добавляем `backend` в PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import uuid
+import asyncio
+import pytest
+from sourcing_service import jobs
+from sourcing_service.cache import AnalysisCache
+from sourcing_service.jobs import AnalysisJob, AnalysisJobQueue, AnalysisQueueFull, JOB_DONE, JOB_FAILED
+
+
+class FakeSession:
+    """Сессия-заглушка: запоминает добавленные строки"""
+    added = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def add(self, row):
+        self.added.append(row)
+
+    async def commit(self):
+        pass
+
+
+def make_job() -> AnalysisJob:
+    return AnalysisJob(startup_id=uuid.uuid4(), founder_id=uuid.uuid4(), file_path="deck.pdf", file_type="pdf")
+
+
+async def wait_finished(job: AnalysisJob):
+    while job.status not in (JOB_DONE, JOB_FAILED):
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_job_runs_in_background_and_saves_result(monkeypatch):
+    async def fake_extract(file_path, file_type):
+        return "deck text"
+
+    async def fake_score(text):
+        return {"USP": 10.0, "Market": 10.0, "Business Model": 10.0, "Team": 10.0, "Finance": 10.0}
+
+    FakeSession.added = []
+    monkeypatch.setattr(jobs, "extract_text", fake_extract)
+    monkeypatch.setattr(jobs, "score_categories_async", fake_score)
+    monkeypatch.setattr(jobs, "AsyncSessionLocal", FakeSession)
+
+    queue = AnalysisJobQueue(workers=1, maxsize=4)
+    await queue.start()
+    job = await queue.submit(make_job())
+    await asyncio.wait_for(wait_finished(job), timeout=2)
+    await queue.stop()
+
+    assert job.status == JOB_DONE
+    assert job.to_dict()["progress"] == 100
+    assert job.result["startup_score"] == 1000.0
+    assert len(FakeSession.added) == 1
+    assert FakeSession.added[0].startup_id == job.startup_id
+    assert FakeSession.added[0].inference_backend == "transformers"
+
+
+@pytest.mark.asyncio
+async def test_empty_deck_marks_job_failed(monkeypatch):
+    async def fake_extract(file_path, file_type):
+        return ""
+
+    monkeypatch.setattr(jobs, "extract_text", fake_extract)
+
+    queue = AnalysisJobQueue(workers=1, maxsize=4)
+    await queue.start()
+    job = await queue.submit(make_job())
+    await asyncio.wait_for(wait_finished(job), timeout=2)
+    await queue.stop()
+
+    assert job.status == JOB_FAILED
+    assert job.error == "Unsupported or empty file"
+
+
+@pytest.mark.asyncio
+async def test_submit_rejects_when_queue_is_full():
+    queue = AnalysisJobQueue(workers=0, maxsize=1)
+    await queue.start()
+    await queue.submit(make_job())
+
+    with pytest.raises(AnalysisQueueFull):
+        await queue.submit(make_job())
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_repeated_upload_is_served_from_cache(monkeypatch):
+    calls = []
+
+    async def fake_extract(file_path, file_type):
+        calls.append(file_path)
+        return "deck text"
+
+    async def fake_score(text):
+        return {"USP": 5.0, "Market": 5.0, "Business Model": 5.0, "Team": 5.0, "Finance": 5.0}
+
+    monkeypatch.setattr(jobs, "extract_text", fake_extract)
+    monkeypatch.setattr(jobs, "score_categories_async", fake_score)
+    monkeypatch.setattr(jobs, "AsyncSessionLocal", FakeSession)
+    monkeypatch.setattr(jobs, "analysis_cache", AnalysisCache())
+
+    queue = AnalysisJobQueue(workers=1, maxsize=4)
+    await queue.start()
+    first = await queue.submit(AnalysisJob(startup_id=uuid.uuid4(), founder_id=uuid.uuid4(), file_path="a.pdf", file_type="pdf", content_hash="same"))
+    await asyncio.wait_for(wait_finished(first), timeout=2)
+    second = await queue.submit(AnalysisJob(startup_id=uuid.uuid4(), founder_id=uuid.uuid4(), file_path="b.pdf", file_type="pdf", content_hash="same"))
+    await asyncio.wait_for(wait_finished(second), timeout=2)
+    await queue.stop()
+
+    assert calls == ["a.pdf"]
+    assert (first.cache_hit, second.cache_hit) == (False, True)
+    assert second.result == first.result
+
+
+class FakeRedis:
+    """Общее хранилище двух «воркеров» вместо Redis"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+
+@pytest.mark.asyncio
+async def test_status_is_visible_from_another_worker(monkeypatch):
+    async def fake_extract_text(file_path, file_type):
+        return "pitch deck text"
+
+    async def fake_score(text):
+        return {"USP": 10.0, "Market": 12.0, "Business Model": 8.0, "Team": 15.0, "Finance": 5.0}
+
+    monkeypatch.setattr(jobs, "extract_text", fake_extract_text)
+    monkeypatch.setattr(jobs, "score_categories_async", fake_score)
+    monkeypatch.setattr(jobs, "AsyncSessionLocal", FakeSession)
+
+    shared = FakeRedis()
+    uploading, other = AnalysisJobQueue(workers=1), AnalysisJobQueue(workers=0)
+    uploading._redis = other._redis = shared
+
+    await uploading.start()
+    job = await uploading.submit(make_job())
+    await asyncio.wait_for(uploading._queue.join(), timeout=5)
+    await uploading.stop()
+
+    seen = await other.get(job.id)
+    assert seen.status == JOB_DONE
+    assert seen.founder_id == job.founder_id
+    assert seen.to_dict() == job.to_dict()
+    assert await other.get("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_refuses_multiple_workers(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    with pytest.raises(RuntimeError):
+        await AnalysisJobQueue(workers=0, backend="memory").start()
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_refuses_uvicorn_workers_option(monkeypatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.setattr(sys, "argv", ["uvicorn", "sourcing_service.main:app", "--workers", "4"])
+    with pytest.raises(RuntimeError):
+        await AnalysisJobQueue(workers=0, backend="memory").start()
+
+
+@pytest.mark.asyncio
+async def test_requested_redis_without_package_fails_at_start(monkeypatch):
+    monkeypatch.setitem(sys.modules, "redis", None)
+    monkeypatch.setitem(sys.modules, "redis.asyncio", None)
+    queue = AnalysisJobQueue(workers=0, backend="redis")
+    with pytest.raises(RuntimeError):
+        await queue.start()
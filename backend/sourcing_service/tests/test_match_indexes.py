@@ -0,0 +1,85 @@
+import sys
+import os
+import uuid
+from types import SimpleNamespace
+
+# ✅ Добавляем `backend` в PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+from sourcing_service.database import Base
+from sourcing_service.models import AnalysisResult, Startup, User
+from sourcing_service.routes.startups import filter_startups_query, latest_analysis_query, matching_startups_query, matching_investors_query
+from sourcing_service.schemas.startups import StartupFilterRequest
+
+# ✅ Планы проверяются на тестовой БД: TEST_DATABASE_URL=postgresql+asyncpg://.../venture_app_test
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL не задан")
+
+STARTUP_INDEXES = {"ix_startups_industry_gin", "ix_startups_stage_gin", "ix_startups_region_gin", "ix_startups_min_check"}
+USER_INDEXES = {"ix_users_industry_gin", "ix_users_investment_stage_gin", "ix_users_region_gin", "ix_users_investor_min_check"}
+
+
+async def explain(query) -> str:
+    engine = create_async_engine(TEST_DATABASE_URL)
+    try:
+        async with engine.begin() as conn:
+            tables = [User.__table__, Startup.__table__, AnalysisResult.__table__]
+            await conn.run_sync(Base.metadata.create_all, tables=tables)
+            # Таблицы могли быть созданы раньше без индексов
+            for table in tables:
+                for index in table.indexes:
+                    await conn.run_sync(index.create, checkfirst=True)
+
+            # На пустой таблице seq scan всегда дешевле — запрещаем его, чтобы проверить применимость индексов
+            await conn.execute(text("SET LOCAL enable_seqscan = off"))
+            sql = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+            result = await conn.execute(text(f"EXPLAIN {sql}"))
+            plan = "\n".join(row[0] for row in result)
+            await conn.rollback()
+            return plan
+    finally:
+        await engine.dispose()
+
+
+def used_indexes(plan: str, candidates: set[str]) -> set[str]:
+    return {name for name in candidates if name in plan}
+
+
+@pytest.mark.asyncio
+async def test_matching_startups_uses_indexes():
+    investor = SimpleNamespace(industry=["fintech"], investment_stage=["seed"], region=["EU"], min_check=500.0)
+    plan = await explain(matching_startups_query(investor))
+
+    assert "Seq Scan" not in plan
+    assert used_indexes(plan, STARTUP_INDEXES), plan
+
+
+@pytest.mark.asyncio
+async def test_matching_investors_uses_indexes():
+    startup = SimpleNamespace(industry=["fintech"], stage=["seed"], region=["EU"], min_check=100.0)
+    plan = await explain(matching_investors_query(startup))
+
+    assert "Seq Scan" not in plan
+    assert used_indexes(plan, USER_INDEXES), plan
+
+
+@pytest.mark.asyncio
+async def test_filter_by_region_uses_gin_index():
+    # Раньше region приводился к text[] и индекс по varchar[] не применялся
+    plan = await explain(filter_startups_query(StartupFilterRequest(region=["EU"])))
+
+    assert "Seq Scan" not in plan
+    assert "ix_startups_region_gin" in plan, plan
+
+
+@pytest.mark.asyncio
+async def test_latest_analysis_reads_index_per_startup():
+    plan = await explain(latest_analysis_query([uuid.uuid4(), uuid.uuid4()], AnalysisResult.startup_score))
+
+    assert "ix_analysis_results_startup_id_created_at" in plan, plan
+    assert "Limit" in plan and "HashAggregate" not in plan, plan
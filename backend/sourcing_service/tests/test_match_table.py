@@ -0,0 +1,50 @@
+import sys
+import os
+import uuid
+
+# ✅ Добавляем `backend` в PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sourcing_service.match_table import _insert_pairs, _pairs_query, recompute_for_investor
+from sourcing_service.models import Startup
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_pairs_query_uses_overlap_filters():
+    sql = compile_sql(_pairs_query())
+
+    assert "users.industry && startups.industry" in sql
+    assert "users.investment_stage && startups.stage" in sql
+    assert "users.region && startups.region" in sql
+    assert "users.min_check >= startups.min_check" in sql
+
+
+def test_founder_recompute_is_single_insert_select():
+    sql = compile_sql(_insert_pairs(_pairs_query().where(Startup.founder_id == uuid.uuid4())))
+
+    assert sql.startswith("INSERT INTO investor_startup_matches (investor_id, startup_id, startup_created_at) SELECT")
+    assert "startups.founder_id =" in sql
+    assert sql.endswith("ON CONFLICT DO NOTHING")
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(compile_sql(statement))
+        return type("Result", (), {"rowcount": 0})()
+
+
+@pytest.mark.asyncio
+async def test_recompute_takes_lock_before_touching_table():
+    db = RecordingSession()
+    await recompute_for_investor(db, uuid.uuid4())
+
+    assert "pg_advisory_xact_lock" in db.statements[0]
+    assert db.statements[1].startswith("DELETE FROM investor_startup_matches")
@@ -0,0 +1,207 @@
+import sys
+import os
+import uuid
+import random
+from collections import namedtuple
+
+# ✅ Добавляем `backend` в PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import pytest
+from sourcing_service.matching import (
+    InvestorRecord, MatchingEngine, MatchWeights, StartupRecord, iter_slots, mask_from_slots, top_investors, top_startups,
+)
+
+INDUSTRIES = ["fintech", "healthtech", "edtech", "ai", "climate"]
+STAGES = ["pre-seed", "seed", "series-a"]
+REGIONS = ["EU", "US", "MENA", "APAC"]
+
+
+def make_startup(industry, stage, region, min_check, founder_id=None) -> StartupRecord:
+    return StartupRecord(
+        id=uuid.uuid4(), founder_id=founder_id or uuid.uuid4(), name="Startup",
+        industry=industry, stage=stage, region=region, min_check=min_check,
+    )
+
+
+def make_investor(industry, stage, region, min_check) -> InvestorRecord:
+    return InvestorRecord(
+        id=uuid.uuid4(), investor_type=["VC"], industry=industry,
+        investment_stage=stage, region=region, min_check=min_check,
+    )
+
+
+def overlaps(a, b) -> bool:
+    return bool(set(a or ()) & set(b or ()))
+
+
+def sample(rng, values):
+    return rng.sample(values, rng.randint(1, 2))
+
+
+@pytest.mark.parametrize("bulk", [False, True], ids=["incremental", "bulk_load"])
+def test_matches_equal_sql_semantics_on_random_data(bulk):
+    rng = random.Random(7)
+    engine = MatchingEngine()
+    startups = [
+        make_startup(sample(rng, INDUSTRIES), sample(rng, STAGES), sample(rng, REGIONS), rng.choice([50, 100, 250, 500]))
+        for _ in range(300)
+    ]
+    investors = [
+        make_investor(sample(rng, INDUSTRIES), sample(rng, STAGES), sample(rng, REGIONS), rng.choice([None, 100, 300, 1000]))
+        for _ in range(100)
+    ]
+    if bulk:
+        engine.load(startups, investors)
+    else:
+        for startup in startups:
+            engine.upsert_startup(startup)
+        for investor in investors:
+            engine.upsert_investor(investor)
+
+    for investor in investors:
+        expected = {
+            s.id for s in startups
+            if overlaps(s.industry, investor.industry) and overlaps(s.stage, investor.investment_stage)
+            and overlaps(s.region, investor.region) and investor.min_check is not None and s.min_check <= investor.min_check
+        }
+        assert {s.id for s in engine.match_startups(investor)} == expected
+
+    for startup in startups[:50]:
+        expected = {
+            i.id for i in investors
+            if overlaps(i.industry, startup.industry) and overlaps(i.investment_stage, startup.stage)
+            and overlaps(i.region, startup.region) and i.min_check is not None and i.min_check >= startup.min_check
+        }
+        assert {i.id for i in engine.match_investors(startup)} == expected
+
+
+def test_bitset_helpers_roundtrip():
+    slots = [0, 7, 8, 63, 64, 1000, 4095]
+    mask = mask_from_slots(slots, 4096)
+
+    assert mask == sum(1 << slot for slot in slots)
+    assert list(iter_slots(mask)) == slots
+    assert list(iter_slots(0)) == []
+
+
+def test_updates_after_bulk_load():
+    engine = MatchingEngine()
+    investor = make_investor(["ai"], ["seed"], ["EU"], 500)
+    loaded = make_startup(["ai"], ["seed"], ["EU"], 100)
+    engine.load([loaded], [investor])
+
+    added = make_startup(["ai"], ["seed"], ["EU"], 200)
+    engine.upsert_startup(added)
+    engine.remove_startup(loaded.id)
+
+    assert [s.id for s in engine.match_startups(investor)] == [added.id]
+    assert engine.startup_for_founder(loaded.founder_id) is None
+
+
+def test_incremental_update_and_removal():
+    engine = MatchingEngine()
+    investor = make_investor(["ai"], ["seed"], ["EU"], 500)
+    startup = make_startup(["ai"], ["seed"], ["EU"], 100)
+    engine.upsert_investor(investor)
+    engine.upsert_startup(startup)
+    engine.set_startup_score(startup.id, 14.5)
+
+    assert [s.id for s in engine.match_startups(investor)] == [startup.id]
+
+    # Профиль стартапа изменился — старые значения больше не матчатся, скоринг сохраняется
+    moved = make_startup(["climate"], ["seed"], ["EU"], 100, founder_id=startup.founder_id)
+    moved.id = startup.id
+    engine.upsert_startup(moved)
+    assert engine.match_startups(investor) == []
+    assert engine.startup_for_founder(startup.founder_id).startup_score == 14.5
+    assert "ai" not in engine.startups.postings["industry"]
+
+    engine.remove_startup(startup.id)
+    assert engine.startup_for_founder(startup.founder_id) is None
+    assert len(engine.startups) == 0
+
+
+StartupRow = namedtuple("StartupRow", "id founder_id name industry stage region min_check created_at startup_score")
+InvestorRow = namedtuple("InvestorRow", "id investor_type industry investment_stage region min_check created_at")
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Возвращает строки стартапов, затем инвесторов; между запросами вызывает on_query"""
+
+    def __init__(self, startup_rows, investor_rows, on_query=None):
+        self.results = [startup_rows, investor_rows]
+        self.on_query = on_query
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        if self.on_query:
+            self.on_query()
+        return FakeResult(self.results.pop(0))
+
+
+@pytest.mark.asyncio
+async def test_rebuild_replays_updates_made_while_loading():
+    engine = MatchingEngine()
+    startup_id, founder_id, investor_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    late = make_investor(["ai"], ["seed"], ["EU"], 1000)
+
+    def concurrent_write():
+        if late.id not in engine.investors.slots:
+            engine.upsert_investor(late)
+
+    session = FakeSession(
+        [StartupRow(startup_id, founder_id, "Acme", ["ai"], ["seed"], ["EU"], 200.0, None, 12.0)],
+        [InvestorRow(investor_id, ["VC"], ["ai"], ["seed"], ["EU"], 500.0, None)],
+        on_query=concurrent_write,
+    )
+    await engine.rebuild(session_factory=session)
+
+    assert engine.ready
+    assert engine.startup_for_founder(founder_id).startup_score == 12.0
+    assert {i.id for i in engine.match_investors(engine.startups.get(startup_id))} == {investor_id, late.id}
+
+
+def test_top_startups_ranks_by_weighted_relevance():
+    investor = make_investor(["ai", "fintech"], ["seed"], ["EU"], 1000)
+    exact = make_startup(["ai", "fintech"], ["seed"], ["EU"], 1000)
+    partial = make_startup(["ai"], ["seed"], ["EU"], 100)
+    scored = make_startup(["ai"], ["seed"], ["EU"], 100)
+    scored.startup_score = 2000.0
+
+    ranked = top_startups(investor, [partial, scored, exact], 2, MatchWeights())
+    assert [s.id for _, s in ranked] == [exact.id, scored.id]
+
+    # Без веса скоринга выигрывает полное совпадение по атрибутам и чеку
+    ranked = top_startups(investor, [partial, scored, exact], 1, MatchWeights(startup_score=0))
+    assert [s.id for _, s in ranked] == [exact.id]
+
+    # Скоринги из БД (SQL-режим) передаются отдельно
+    ranked = top_startups(investor, [partial, exact], 1, MatchWeights(overlap=0, check_fit=0), scores={partial.id: 500.0})
+    assert ranked[0][1].id == partial.id
+
+
+def test_top_investors_prefers_closest_check():
+    startup = make_startup(["ai"], ["seed"], ["EU"], 100)
+    close = make_investor(["ai"], ["seed"], ["EU"], 120)
+    far = make_investor(["ai"], ["seed"], ["EU"], 10000)
+
+    ranked = top_investors(startup, [far, close], 5, MatchWeights())
+    assert [i.id for _, i in ranked] == [close.id, far.id]
+    assert ranked[0][0] > ranked[1][0]
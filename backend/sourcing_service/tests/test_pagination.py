@@ -0,0 +1,65 @@
+import sys
+import os
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# ✅ Добавляем `backend` в PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+import pytest
+from fastapi import HTTPException
+from sourcing_service.pagination import decode_cursor, encode_cursor, page_records
+
+
+def make_records(count: int) -> list:
+    start = datetime(2026, 1, 1)
+    # Пары записей с одинаковым created_at — порядок добирается по id
+    return [SimpleNamespace(id=uuid.uuid4(), created_at=start + timedelta(minutes=i // 2)) for i in range(count)]
+
+
+def test_cursor_roundtrip():
+    record_id = uuid.uuid4()
+    created_at = datetime(2026, 3, 4, 5, 6, 7, 890)
+
+    assert decode_cursor(encode_cursor(created_at, record_id)) == (created_at, record_id)
+    assert decode_cursor(encode_cursor(None, record_id)) == (None, record_id)
+
+
+def test_invalid_cursor_is_bad_request():
+    with pytest.raises(HTTPException) as error:
+        decode_cursor("not-a-cursor")
+    assert error.value.status_code == 400
+
+
+def test_pages_cover_all_records_once_in_keyset_order():
+    records = make_records(25)
+    expected = sorted(records, key=lambda r: (r.created_at, str(r.id)), reverse=True)
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = page_records(records, cursor, 10)
+        assert len(page) <= 10
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    assert [r.id for r in seen] == [r.id for r in expected]
+
+
+def test_last_full_page_has_no_cursor():
+    page, cursor = page_records(make_records(10), None, 10)
+    assert len(page) == 10
+    assert cursor is None
+
+
+def test_missing_created_at_sorts_first_like_postgres_desc():
+    records = make_records(6)
+    undated = SimpleNamespace(id=uuid.uuid4(), created_at=None)
+
+    page, cursor = page_records(records + [undated], None, 3)
+    assert page[0] is undated
+
+    rest, _ = page_records(records + [undated], cursor, 10)
+    assert len(page) + len(rest) == 7
+    assert undated not in rest
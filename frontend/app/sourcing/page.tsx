@@ -7,7 +7,7 @@ import Pipeline from "@/components/sourcing/Pipeline";
 import SearchFilters from "@/components/sourcing/SearchFilters";
 import FilterBar from "@/components/sourcing/FilterBar";
 import StartupList from "@/components/sourcing/StartupList";
-import { fetchMatchedStartups, sendToDueDiligence, getInvestorProfile } from "@/utils/api";
+import { fetchMatchedStartups, sendToDueDiligence, getInvestorProfile, MatchedStartupsPage } from "@/utils/api";
 import { fetchUserProfile } from "@/utils/auth";
 import { Startup } from "@/types/startup";
 
@@ -17,6 +17,10 @@ export default function SourcingPage() {
   const [filteredStartups, setFilteredStartups] = useState<Startup[]>([]);
   const [isEditing, setIsEditing] = useState(false);
   const [profileLoaded, setProfileLoaded] = useState(false);
+  const [investorId, setInvestorId] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  const [listFilters, setListFilters] = useState<any>({});
 
   const searchParams = useSearchParams();
   const router = useRouter();
@@ -37,11 +41,11 @@ export default function SourcingPage() {
 
         setProfileLoaded(true);
 
-        const startups = await fetchMatchedStartups(user_id);
-        console.log("📦 Стартапов получено:", startups.length);
+        const page = await fetchMatchedStartups(user_id);
+        console.log("📦 Стартапов получено:", page.startups.length);
 
-        setAllStartups(startups);
-        setFilteredStartups(startups);
+        setInvestorId(user_id);
+        showFirstPage(page);
       } catch (err) {
         console.warn("⚠️ Не удалось загрузить профиль или стартапы", err);
       }
@@ -55,9 +59,16 @@ export default function SourcingPage() {
     }
   }, [searchParams]);
 
-  const handleSearchApply = async (startups: Startup[]) => {
-    setAllStartups(startups);
-    setFilteredStartups(startups);
+  // ✅ Первая страница совпадений; остальные подгружаются кнопкой в StartupList
+  const showFirstPage = (page: MatchedStartupsPage) => {
+    setAllStartups(page.startups);
+    setFilteredStartups(applyListFilters(page.startups, listFilters));
+    setNextCursor(page.next_cursor);
+  };
+
+  const handleSearchApply = async (page: MatchedStartupsPage) => {
+    setInvestorId(localStorage.getItem("user_id"));
+    showFirstPage(page);
     setProfileLoaded(true);
     setIsEditing(false);
 
@@ -65,8 +76,8 @@ export default function SourcingPage() {
     router.push("/sourcing");
   };
 
-  const handleListFilterChange = (filters: any) => {
-    const filtered = allStartups.filter((s) => {
+  const applyListFilters = (startups: Startup[], filters: any) =>
+    startups.filter((s) => {
       const check = parseFloat(filters.checkSize?.replace(/[^\d]/g, "")) || 0;
       return (
         (!filters.stage || s.stage.includes(filters.stage)) &&
@@ -75,7 +86,26 @@ export default function SourcingPage() {
         (!filters.checkSize || s.min_check <= check)
       );
     });
-    setFilteredStartups(filtered);
+
+  const handleListFilterChange = (filters: any) => {
+    setListFilters(filters);
+    setFilteredStartups(applyListFilters(allStartups, filters));
+  };
+
+  const handleLoadMore = async () => {
+    if (!investorId || !nextCursor || isLoadingMore) return;
+    try {
+      setIsLoadingMore(true);
+      const page = await fetchMatchedStartups(investorId, nextCursor);
+      const startups = [...allStartups, ...page.startups];
+      setAllStartups(startups);
+      setFilteredStartups(applyListFilters(startups, listFilters));
+      setNextCursor(page.next_cursor);
+    } catch (err) {
+      console.warn("⚠️ Не удалось загрузить следующую страницу стартапов", err);
+    } finally {
+      setIsLoadingMore(false);
+    }
   };
 
   const handleSendToDD = async (startupId: string) => {
@@ -100,11 +130,17 @@ export default function SourcingPage() {
       {profileLoaded && !isEditing && (
         <>
           <FilterBar onFilterChange={handleListFilterChange} />
-          <StartupList startups={filteredStartups} onSendToDD={handleSendToDD} />
+          <StartupList
+            startups={filteredStartups}
+            onSendToDD={handleSendToDD}
+            hasMore={nextCursor !== null}
+            isLoadingMore={isLoadingMore}
+            onLoadMore={handleLoadMore}
+          />
         </>
       )}
 
-      {filteredStartups.length === 0 && profileLoaded && !isEditing && (
+      {filteredStartups.length === 0 && nextCursor === null && profileLoaded && !isEditing && (
         <p className="text-gray-500 text-center mt-4">Нет подходящих стартапов по текущим критериям.</p>
       )}
     </div>
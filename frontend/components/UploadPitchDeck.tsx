@@ -1,6 +1,26 @@
 "use client";
 import React, { useState } from "react";
 
+const POLL_INTERVAL_MS = 2000;
+
+// Ожидание завершения фонового анализа питч-дека
+const waitForAnalysis = async (jobId: string, token: string | null) => {
+  while (true) {
+    const res = await fetch(`/api/startups/founders/upload/jobs/${jobId}`, {
+      headers: {
+        Authorization: `Bearer ${token || ""}`,
+      },
+    });
+    if (!res.ok) throw new Error("Ошибка получения статуса анализа");
+
+    const job = await res.json();
+    if (job.status === "done") return job;
+    if (job.status === "failed") throw new Error(job.error || "Ошибка анализа");
+
+    await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+  }
+};
+
 const UploadPitchDeck = () => {
   const [file, setFile] = useState<File | null>(null);
   const [isUploading, setIsUploading] = useState(false);
@@ -38,7 +58,10 @@ const UploadPitchDeck = () => {
 
       if (!res.ok) throw new Error("Ошибка загрузки");
 
-      const result = await res.json();
+      const { job_id } = await res.json();
+      setMessage("⏳ Pitch Deck uploaded, analysis in progress...");
+
+      const result = await waitForAnalysis(job_id, token);
       setMessage("✅ Pitch Deck uploaded and processed successfully.");
       console.log("Результат:", result);
       setFile(null); // сброс формы
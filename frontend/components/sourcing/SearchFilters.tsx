@@ -1,10 +1,10 @@
 "use client";
 import React, { useState } from "react";
-import { saveInvestorProfile, fetchMatchedStartups} from "@/utils/api";
+import { saveInvestorProfile, fetchMatchedStartups, MatchedStartupsPage } from "@/utils/api";
 import { useRouter } from "next/navigation";
 
 interface SearchFiltersProps {
-  onApplyFilters: (startups: any[]) => void;
+  onApplyFilters: (page: MatchedStartupsPage) => void;
   onHideFilters: () => void; // ✅ Новый пропс для скрытия фильтров
 }
 
@@ -50,8 +50,8 @@ export default function SearchFilters({ onApplyFilters, onHideFilters }: SearchF
       const investorId = localStorage.getItem("user_id");
       if (!investorId) throw new Error("Investor ID не найден в localStorage");
 
-      const startups = await fetchMatchedStartups(investorId);
-      onApplyFilters(startups);
+      const page = await fetchMatchedStartups(investorId);
+      onApplyFilters(page);
 
       //setIsSubmitted(true);
     } catch (err) {
@@ -1,50 +1,81 @@
 "use client";
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import { useRouter } from "next/navigation";
 import { Startup } from "@/types/startup";
 
 interface StartupListProps {
   startups: Startup[];
   onSendToDD: (startupId: string) => void;
+  hasMore?: boolean;
+  isLoadingMore?: boolean;
+  onLoadMore?: () => void;
 }
 
-export default function StartupList({ startups, onSendToDD }: StartupListProps) {
+export default function StartupList({ startups, onSendToDD, hasMore = false, isLoadingMore = false, onLoadMore }: StartupListProps) {
   const router = useRouter();
   const [scores, setScores] = useState<Record<string, number>>({});
+  // Скоринг уже запрошенных стартапов не перезапрашиваем при подгрузке страниц и фильтрации
+  const requestedScores = useRef<Set<string>>(new Set());
 
   useEffect(() => {
+    const ids = startups.map((s) => s.id).filter((id) => !requestedScores.current.has(id));
+
     const fetchScores = async () => {
-      const ids = startups.map((s) => s.id).join(",");
+      ids.forEach((id) => requestedScores.current.add(id));
       try {
-        const res = await fetch(`/api/startups/batch/pitch-scores?ids=${ids}`);
+        // POST + NDJSON: сотни id не упираются в длину URL, строка на стартап
+        const res = await fetch(`/api/startups/batch/pitch-scores`, {
+          method: "POST",
+          headers: { "Content-Type": "application/json" },
+          body: JSON.stringify({ ids }),
+        });
         if (!res.ok) throw new Error("Ошибка загрузки скоринга");
   
-        const data: Record<string, any> = await res.json();
+        const text = await res.text();
   
         const processed: Record<string, number> = {};
-        for (const [id, raw] of Object.entries(data)) {
-          const scoreObj = raw as { total?: number } | null;
+        for (const line of text.split("\n")) {
+          if (!line.trim()) continue;
+          const scoreObj = JSON.parse(line) as { startup_id: string; total?: number | null };
   
-          if (scoreObj && typeof scoreObj.total === "number") {
-            processed[id] = Math.round(scoreObj.total); // или использовать .toFixed(1)
+          if (typeof scoreObj.total === "number") {
+            processed[scoreObj.startup_id] = Math.round(scoreObj.total); // или использовать .toFixed(1)
           } else {
-            processed[id] = 0; // Fallback на случай отсутствия данных
+            processed[scoreObj.startup_id] = 0; // Fallback на случай отсутствия данных
           }
         }
   
-        setScores(processed);
+        setScores((prev) => ({ ...prev, ...processed }));
       } catch (err) {
+        ids.forEach((id) => requestedScores.current.delete(id));
         console.error("⚠️ Ошибка получения скорингов:", err);
       }
     };
   
-    if (startups.length > 0) {
+    if (ids.length > 0) {
       fetchScores();
     }
   }, [startups]);
 
+  const loadMoreButton = hasMore && onLoadMore && (
+    <div className="flex justify-center mt-4">
+      <button
+        onClick={onLoadMore}
+        disabled={isLoadingMore}
+        className="bg-gray-200 hover:bg-gray-300 text-black px-4 py-1.5 rounded text-sm disabled:opacity-50"
+      >
+        {isLoadingMore ? "Загрузка..." : "Показать ещё"}
+      </button>
+    </div>
+  );
+
   if (startups.length === 0) {
-    return <p className="text-gray-500 mt-4">Стартапы не найдены.</p>;
+    return (
+      <>
+        <p className="text-gray-500 mt-4">Стартапы не найдены.</p>
+        {loadMoreButton}
+      </>
+    );
   }
 
   return (
@@ -92,6 +123,7 @@ export default function StartupList({ startups, onSendToDD }: StartupListProps)
           ))}
         </tbody>
       </table>
+      {loadMoreButton}
     </div>
   );
 }
\ No newline at end of file
@@ -51,11 +51,15 @@ export async function saveInvestorProfile(filters: {
   });
 }
 
-// ✅ Получение подходящих стартапов по investor_id
-export async function fetchMatchedStartups(investorId: string) {
-  return apiFetch<{ startups: Startup[] }>(`/api/startups/matches/me`).then(
-    (res) => res.startups
-  );
+// ✅ Страница подходящих стартапов (keyset): следующая запрашивается по next_cursor по требованию
+export interface MatchedStartupsPage {
+  startups: Startup[];
+  next_cursor: string | null;
+}
+
+export async function fetchMatchedStartups(investorId: string, cursor?: string | null) {
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+  return apiFetch<MatchedStartupsPage>(`/api/startups/matches/me${query}`);
 }
 
 // 🔹 Отправка стартапа в Due Diligence
@@ -64,6 +68,20 @@ export async function sendToDueDiligence(startupId: string) {
     method: "POST",
   });
 }
+
+// 🔹 Пакетная отправка стартапов в Due Diligence: один запрос, итог по каждому id
+export async function sendToDueDiligenceBatch(startupIds: string[]) {
+  return apiFetch<{
+    message: string;
+    inserted: number;
+    already_exists: number;
+    not_found: number;
+    results: { startup_id: string; status: "inserted" | "already_exists" | "not_found" | "invalid" }[];
+  }>(`/api/startups/select/batch`, {
+    method: "POST",
+    body: JSON.stringify({ startup_ids: startupIds }),
+  });
+}
 // ✅ Получение сохранённого профиля инвестора
 export async function getInvestorProfile(investorId: string) {
   return apiFetch<{